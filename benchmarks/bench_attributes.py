@@ -0,0 +1,95 @@
+# Copyright (C) 2017 The Free Software Foundation, Inc.
+#
+# This file is part of mailmanclient.
+#
+# mailmanclient is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation, version 3 of the License.
+#
+# mailmanclient is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
+# or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public
+# License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with mailmanclient.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Time the attribute access of REST objects.
+
+Usage: python benchmarks/bench_attributes.py
+
+`Member` uses the property descriptors created by `RESTMeta`.  `OldMember`
+reproduces the previous lookups, through `__getattr__` and `__setattr__`
+with linear scans of the property tuples, for comparison.
+"""
+
+from __future__ import absolute_import, print_function, unicode_literals
+
+import timeit
+
+from mailmanclient import Member
+from mailmanclient.restbase.base import RESTObject
+
+
+class OldMember(RESTObject):
+
+    _properties = Member._properties
+    _writable_properties = Member._writable_properties
+    _property_attributes = False
+
+    def _get(self, key):
+        if key in self._properties:
+            return self.rest_data.get(key)
+        raise KeyError(key)
+
+    def __getattr__(self, name):
+        try:
+            return self._get(name)
+        except KeyError:
+            raise AttributeError(name)
+
+    def __setattr__(self, name, value):
+        if name not in self._properties:
+            return RESTObject.__setattr__(self, name, value)
+        if (name in self._read_only_properties or (
+                self._writable_properties is not None
+                and name not in self._writable_properties)):
+            raise ValueError('value is read-only')
+        if name in self.rest_data and self.rest_data[name] == value:
+            return
+        self._changed_rest_data[name] = value
+
+
+DATA = {
+    'delivery_mode': 'regular',
+    'email': 'anna@example.com',
+    'list_id': 'ant.example.com',
+    'moderation_action': 'defer',
+    'role': 'member',
+    'self_link': 'http://localhost:9001/3.1/members/1',
+    }
+
+
+def read(member):
+    return (member.delivery_mode, member.email, member.list_id,
+            member.moderation_action, member.role, member.self_link)
+
+
+def write(member):
+    member.moderation_action = 'hold'
+    member._url = 'http://localhost:9001/3.1/members/1'
+
+
+def main():
+    number = 100000
+    for cls in (OldMember, Member):
+        member = cls(None, DATA['self_link'], dict(DATA))
+        for name, func in (('6 reads', read), ('2 writes', write)):
+            elapsed = min(timeit.repeat(
+                lambda: func(member), number=number, repeat=3))
+            print('{0:>10} {1:>9}: {2:>6.0f} ns'.format(
+                cls.__name__, name, elapsed / number * 1e9))
+
+
+if __name__ == '__main__':
+    main()
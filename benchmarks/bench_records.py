@@ -0,0 +1,90 @@
+# Copyright (C) 2017 The Free Software Foundation, Inc.
+#
+# This file is part of mailmanclient.
+#
+# mailmanclient is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation, version 3 of the License.
+#
+# mailmanclient is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
+# or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public
+# License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with mailmanclient.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Measure the memory used per member by REST objects and by records.
+
+Usage: python benchmarks/bench_records.py [number of members]
+
+The roster is decoded from JSON as the connection would, then turned into
+`Member` objects as `MailingList.members` does, or into compact records as
+`MailingList.iter_members(compact=True)` does.  The memory still allocated
+once the roster is built is measured with tracemalloc (Python 3.4+).
+"""
+
+from __future__ import absolute_import, print_function, unicode_literals
+
+import json
+import sys
+import tracemalloc
+
+from mailmanclient import Member
+from mailmanclient.restbase.records import iter_records
+
+
+def make_roster(count):
+    entries = []
+    for i in range(count):
+        entries.append({
+            'address': 'http://localhost:9001/3.1/addresses/'
+                       'member{0}@example.com'.format(i),
+            'delivery_mode': 'regular',
+            'email': 'member{0}@example.com'.format(i),
+            'http_etag': '"{0:040x}"'.format(i),
+            'list_id': 'ant.example.com',
+            'member_id': '{0:032x}'.format(i),
+            'moderation_action': 'defer',
+            'role': 'member',
+            'self_link': 'http://localhost:9001/3.1/members/'
+                         '{0:032x}'.format(i),
+            'user': 'http://localhost:9001/3.1/users/{0:032x}'.format(i),
+            })
+    return json.dumps({
+        'entries': entries, 'start': 0, 'total_size': count}).encode('utf-8')
+
+
+def build_objects(content):
+    entries = json.loads(content.decode('utf-8'))['entries']
+    return [Member(None, entry['self_link'], entry) for entry in entries]
+
+
+def build_records(content):
+    entries = json.loads(content.decode('utf-8'))['entries']
+    return list(iter_records(Member, entries))
+
+
+def measure(build, content):
+    tracemalloc.start()
+    try:
+        result = build(content)
+        size = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return size, len(result)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    content = make_roster(count)
+    print('{0} members, {1} bytes of JSON'.format(count, len(content)))
+    for name, build in (('Member objects', build_objects),
+                        ('MemberRecord records', build_records)):
+        size, built = measure(build, content)
+        print('{0:>22}: {1:>6.0f} bytes per member'.format(
+            name, size / float(built)))
+
+
+if __name__ == '__main__':
+    main()
@@ -45,7 +45,13 @@ setup(
         'Topic :: Internet :: WWW/HTTP ',
     ],
     install_requires=[
+        'futures; python_version < "3"',
         'httplib2',
         'six',
         ],
+    extras_require={
+        'aiohttp': ['aiohttp'],
+        'numpy': ['numpy'],
+        'requests': ['requests'],
+        },
     )
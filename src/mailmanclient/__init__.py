@@ -24,20 +24,28 @@ import six
 
 from mailmanclient.client import Client
 from mailmanclient.constants import __version__
+from mailmanclient.restbase.bulk import BulkResult
+from mailmanclient.restbase.cache import (
+    CacheBackend, MemoryBackend, ResponseCache, SQLiteBackend)
 from mailmanclient.restbase.connection import MailmanConnectionError
+from mailmanclient.restbase.transport import (
+    HttpTransport, RequestsTransport, Transport, WSGITransport)
 from mailmanclient.restobjects.address import Address, Addresses
 from mailmanclient.restobjects.ban import Bans, BannedAddress
 from mailmanclient.restobjects.configuration import Configuration
 from mailmanclient.restobjects.domain import Domain
-from mailmanclient.restobjects.header_match import HeaderMatch, HeaderMatches
-from mailmanclient.restobjects.held_message import HeldMessage
+from mailmanclient.restobjects.header_match import (
+    HeaderMatch, HeaderMatches, HeaderMatchesPlan)
+from mailmanclient.restobjects.held_message import (
+    HeldMessage, HeldMessageSummary)
 from mailmanclient.restobjects.archivers import ListArchivers
-from mailmanclient.restobjects.mailinglist import MailingList
+from mailmanclient.restobjects.mailinglist import MailingList, SyncPlan
 from mailmanclient.restobjects.member import Member
 from mailmanclient.restobjects.preferences import Preferences, PreferencesMixin
 from mailmanclient.restobjects.queue import Queue
 from mailmanclient.restobjects.settings import Settings
 from mailmanclient.restobjects.user import User
+from mailmanclient.snapshot import Snapshot
 
 
 __metaclass__ = type
@@ -46,21 +54,34 @@ __all__ = [
     'Addresses',
     'Bans',
     'BannedAddress',
+    'BulkResult',
+    'CacheBackend',
     'Client',
     'Configuration',
     'Domain'
     'HeaderMatch',
     'HeaderMatches',
+    'HeaderMatchesPlan',
     'HeldMessage',
+    'HeldMessageSummary',
+    'HttpTransport',
     'ListArchivers',
     'MailingList',
+    'MemoryBackend',
     'MailmanConnectionError',
     'Member',
     'Preferences',
     'PreferencesMixin',
     'Queue',
+    'RequestsTransport',
+    'ResponseCache',
+    'SQLiteBackend',
     'Settings',
+    'Snapshot',
+    'SyncPlan',
+    'Transport',
     'User',
+    'WSGITransport',
     '__version__',
 ]
 
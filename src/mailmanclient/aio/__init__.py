@@ -0,0 +1,44 @@
+# Copyright (C) 2017 The Free Software Foundation, Inc.
+#
+# This file is part of mailmanclient.
+#
+# mailmanclient is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation, version 3 of the License.
+#
+# mailmanclient is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
+# or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public
+# License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with mailmanclient.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Asyncio version of the client.
+
+This package requires Python 3.5 or later.
+"""
+
+from mailmanclient.aio.client import AsyncClient
+from mailmanclient.aio.connection import (
+    AiohttpTransport, AsyncConnection, AsyncTransport, ThreadedTransport)
+from mailmanclient.aio.page import AsyncPage
+from mailmanclient.aio.restobjects import (
+    AsyncAddress, AsyncDomain, AsyncMailingList, AsyncMember, AsyncSettings,
+    AsyncUser)
+
+
+__all__ = [
+    'AiohttpTransport',
+    'AsyncAddress',
+    'AsyncClient',
+    'AsyncConnection',
+    'AsyncDomain',
+    'AsyncMailingList',
+    'AsyncMember',
+    'AsyncPage',
+    'AsyncSettings',
+    'AsyncTransport',
+    'AsyncUser',
+    'ThreadedTransport',
+]
@@ -0,0 +1,171 @@
+# Copyright (C) 2017 The Free Software Foundation, Inc.
+#
+# This file is part of mailmanclient.
+#
+# mailmanclient is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation, version 3 of the License.
+#
+# mailmanclient is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
+# or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public
+# License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with mailmanclient.  If not, see <http://www.gnu.org/licenses/>.
+
+from collections.abc import Mapping
+
+from mailmanclient.restbase.base import RESTMeta
+
+__all__ = [
+    'AsyncRESTBase',
+    'AsyncRESTDict',
+    'AsyncRESTObject',
+]
+
+
+class AsyncRESTBase(metaclass=RESTMeta):
+    """
+    Base class for data coming from the REST API, asynchronous version.
+
+    The class attributes have the same meaning as in
+    :class:`mailmanclient.restbase.base.RESTBase`.  Since attribute access
+    can't wait for the network, the data must be loaded with `fetch()` before
+    it is read, unless it was given to the constructor.
+
+    Like in the synchronous version, the entity tag returned by the API is
+    kept: fetching the object again sends an `If-None-Match` request, and
+    `save()` sends it in an `If-Match` header.
+    """
+
+    _properties = None
+    _writable_properties = None
+    _read_only_properties = ['self_link']
+    _property_attributes = False
+
+    def __init__(self, connection, url, data=None):
+        """
+        :param connection: An API connection object.
+        :type connection: AsyncConnection.
+        :param url: The url of the API endpoint.
+        :type url: str.
+        :param data: The initial data to use.
+        :type data: dict.
+        """
+        self._connection = connection
+        self._url = url
+        self._rest_data = data
+        self._changed_rest_data = {}
+        self._etag = None
+        if isinstance(data, dict):
+            self._etag = data.get('http_etag')
+
+    def __repr__(self):
+        return '<{0} at {1}>'.format(self.__class__.__name__, self._url)
+
+    @property
+    def rest_data(self):
+        if self._rest_data is None:
+            raise ValueError(
+                '{0} has not been fetched, await its fetch() method '
+                'first'.format(self.__class__.__name__))
+        return self._rest_data
+
+    async def fetch(self):
+        """Get data from the API and cache it.
+
+        :return: The object itself.
+        """
+        headers = None
+        if self._etag is not None and self._rest_data is not None:
+            headers = {'If-None-Match': self._etag}
+        response, content = await self._connection.call(
+            self._url, headers=headers)
+        if response.status != 304:
+            self._etag = response.get('etag')
+            if isinstance(content, dict) and 'http_etag' in content:
+                self._etag = content.pop('http_etag')
+            self._rest_data = content
+        self._changed_rest_data = {}
+        return self
+
+    def _get(self, key):
+        if self._property_set is not None:
+            # Some REST key/values may not be returned by Mailman if the value
+            # is None.
+            if key in self._property_set:
+                return self.rest_data.get(key)
+            raise KeyError(key)
+        else:
+            return self.rest_data[key]
+
+    def _set(self, key, value):
+        if (key in self._read_only_set or (
+                self._writable_set is not None
+                and key not in self._writable_set)):
+            raise ValueError('value is read-only')
+        if key in self.rest_data and self.rest_data[key] == value:
+            return  # Nothing to do
+        self._changed_rest_data[key] = value
+
+    async def save(self):
+        """Send the changed values and fetch the updated data."""
+        headers = None
+        if self._etag is not None:
+            headers = {'If-Match': self._etag}
+        await self._connection.call(
+            self._url, self._changed_rest_data, method='PATCH',
+            headers=headers)
+        # The resource changed, the old ETag must not be used to revalidate
+        # it.
+        self._etag = None
+        return await self.fetch()
+
+
+class AsyncRESTObject(AsyncRESTBase):
+    """Base class for REST data that behaves like an object with attributes."""
+
+    _property_attributes = True
+
+    def __getattr__(self, name):
+        try:
+            return self._get(name)
+        except KeyError:
+            # Transform the KeyError into the more appropriate AttributeError
+            raise AttributeError(
+                "'{0}' object has no attribute '{1}'".format(
+                    self.__class__.__name__, name))
+
+    async def delete(self):
+        await self._connection.call(self._url, method='DELETE')
+        self._rest_data = None
+
+
+class AsyncRESTDict(AsyncRESTBase, Mapping):
+    """Base class for REST data that behaves like a dictionary.
+
+    Changes are recorded with item assignment and sent with `save()`.
+    """
+
+    def __repr__(self):
+        return repr(self.rest_data)
+
+    def __getitem__(self, key):
+        return self._get(key)
+
+    def __setitem__(self, key, value):
+        self._set(key, value)
+
+    def __iter__(self):
+        for key in self.rest_data:
+            if (self._property_set is not None and
+                    key not in self._property_set):
+                continue
+            yield key
+
+    def __len__(self):
+        return len(self.rest_data)
+
+    def get(self, key, default=None):
+        return self.rest_data.get(key, default)
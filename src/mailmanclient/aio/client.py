@@ -0,0 +1,157 @@
+# Copyright (C) 2017 The Free Software Foundation, Inc.
+#
+# This file is part of mailmanclient.
+#
+# mailmanclient is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation, version 3 of the License.
+#
+# mailmanclient is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
+# or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public
+# License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with mailmanclient.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Asynchronous client code."""
+
+from operator import itemgetter
+
+from mailmanclient.aio.connection import AsyncConnection
+from mailmanclient.aio.page import AsyncPage
+from mailmanclient.aio.restobjects import (
+    AsyncAddress, AsyncDomain, AsyncMailingList, AsyncMember, AsyncUser,
+    _get_entries)
+
+__all__ = [
+    'AsyncClient'
+]
+
+
+class AsyncClient:
+    """Access the Mailman REST API root with asyncio.
+
+    All the methods accessing the API are coroutines.  The number of
+    simultaneous requests is bounded by the connection, so many calls can
+    safely be gathered at once::
+
+        lists = await client.get_lists()
+        settings = await asyncio.gather(
+            *[mlist.get_settings() for mlist in lists])
+    """
+
+    def __init__(self, baseurl, name=None, password=None, **kwargs):
+        """Initialize client access to the REST API.
+
+        :param baseurl: The base url to access the Mailman 3 REST API.
+        :param name: The Basic Auth user name.  If given, the `password` must
+            also be given.
+        :param password: The Basic Auth password.  If given the `name` must
+            also be given.
+        :param kwargs: Additional connection options such as
+            `max_concurrency`, see :class:`AsyncConnection`.
+        """
+        self._connection = AsyncConnection(baseurl, name, password, **kwargs)
+
+    def __repr__(self):
+        return '<AsyncClient ({0.name}:{0.password}) {0.baseurl}>'.format(
+            self._connection)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def close(self):
+        """Release the connections to the server."""
+        await self._connection.close()
+
+    async def get_system(self):
+        response, content = await self._connection.call('system/versions')
+        return content
+
+    async def get_lists(self, advertised=None):
+        url = 'lists'
+        if advertised:
+            url += '?advertised=true'
+        return await _get_entries(self._connection, url, AsyncMailingList)
+
+    async def get_list_page(self, count=50, page=1, advertised=None):
+        url = 'lists'
+        if advertised:
+            url += '?advertised=true'
+        return await AsyncPage(
+            self._connection, url, AsyncMailingList, count, page).fetch()
+
+    async def get_list(self, fqdn_listname):
+        response, content = await self._connection.call(
+            'lists/{0}'.format(fqdn_listname))
+        return AsyncMailingList(self._connection, content['self_link'],
+                                content)
+
+    async def delete_list(self, fqdn_listname):
+        await self._connection.call(
+            'lists/{0}'.format(fqdn_listname), None, 'DELETE')
+
+    async def get_domains(self):
+        response, content = await self._connection.call('domains')
+        return [AsyncDomain(self._connection, entry['self_link'], entry)
+                for entry in sorted(content.get('entries', []),
+                                    key=itemgetter('mail_host'))]
+
+    async def get_domain(self, mail_host):
+        response, content = await self._connection.call(
+            'domains/{0}'.format(mail_host))
+        return AsyncDomain(self._connection, content['self_link'], content)
+
+    async def create_domain(self, mail_host, description=None, owner=None):
+        data = dict(mail_host=mail_host)
+        if description is not None:
+            data['description'] = description
+        if owner is not None:
+            data['owner'] = owner
+        response, content = await self._connection.call('domains', data)
+        return await AsyncDomain(
+            self._connection, response['location']).fetch()
+
+    async def delete_domain(self, mail_host):
+        await self._connection.call(
+            'domains/{0}'.format(mail_host), None, 'DELETE')
+
+    async def get_members(self):
+        return await _get_entries(self._connection, 'members', AsyncMember)
+
+    async def get_member_page(self, count=50, page=1):
+        return await AsyncPage(
+            self._connection, 'members', AsyncMember, count, page).fetch()
+
+    async def get_member(self, fqdn_listname, subscriber_address):
+        mlist = await self.get_list(fqdn_listname)
+        return await mlist.get_member(subscriber_address)
+
+    async def get_users(self):
+        return await _get_entries(
+            self._connection, 'users', AsyncUser, sort_key='self_link')
+
+    async def get_user_page(self, count=50, page=1):
+        return await AsyncPage(
+            self._connection, 'users', AsyncUser, count, page).fetch()
+
+    async def get_user(self, address):
+        response, content = await self._connection.call(
+            'users/{0}'.format(address))
+        return AsyncUser(self._connection, content['self_link'], content)
+
+    async def create_user(self, email, password, display_name=''):
+        response, content = await self._connection.call(
+            'users', dict(email=email,
+                          password=password,
+                          display_name=display_name))
+        return await AsyncUser(self._connection, response['location']).fetch()
+
+    async def get_address(self, address):
+        response, content = await self._connection.call(
+            'addresses/{0}'.format(address))
+        return AsyncAddress(self._connection, content['self_link'], content)
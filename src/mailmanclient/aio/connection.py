@@ -0,0 +1,193 @@
+# Copyright (C) 2017 The Free Software Foundation, Inc.
+#
+# This file is part of mailmanclient.
+#
+# mailmanclient is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation, version 3 of the License.
+#
+# mailmanclient is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
+# or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public
+# License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with mailmanclient.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Asynchronous connection and transports."""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from six.moves.urllib_error import HTTPError
+
+from httplib2 import Response
+
+from mailmanclient.constants import (
+    DEFAULT_MAX_CONCURRENCY, DEFAULT_POOL_IDLE_TIMEOUT, DEFAULT_POOL_SIZE)
+from mailmanclient.restbase.connection import (
+    Connection, MailmanConnectionError)
+from mailmanclient.restbase.transport import HttpTransport
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+__all__ = [
+    'AiohttpTransport',
+    'AsyncConnection',
+    'AsyncTransport',
+    'ThreadedTransport',
+]
+
+
+class AsyncTransport:
+    """Base class for the transports used by an `AsyncConnection`.
+
+    This is the awaitable counterpart of
+    :class:`mailmanclient.restbase.transport.Transport`.
+    """
+
+    async def request(self, url, method='GET', body=None, headers=None):
+        """Send a request.
+
+        :return: A `(response, content)` tuple, see `Transport.request()`.
+        """
+        raise NotImplementedError
+
+    async def close(self):
+        """Release the resources held by the transport."""
+
+
+class ThreadedTransport(AsyncTransport):
+    """Run a synchronous transport in a pool of threads.
+
+    With the default `HttpTransport`, each thread checks out its own
+    persistent connection from the pool.
+    """
+
+    def __init__(self, transport, max_workers=DEFAULT_POOL_SIZE):
+        """
+        :param transport: The synchronous transport to use.
+        :type transport: Transport.
+        :param max_workers: The number of threads.
+        :type max_workers: int.
+        """
+        self.transport = transport
+        self._executor = ThreadPoolExecutor(max_workers)
+
+    async def request(self, url, method='GET', body=None, headers=None):
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(
+            self._executor, self.transport.request, url, method, body,
+            headers)
+
+    async def close(self):
+        self._executor.shutdown(wait=False)
+        self.transport.close()
+
+
+class AiohttpTransport(AsyncTransport):
+    """Transport using an aiohttp session and its connection pool.
+
+    This requires the `aiohttp` package to be installed.
+    """
+
+    def __init__(self, pool_size=DEFAULT_POOL_SIZE, timeout=None):
+        """
+        :param pool_size: The maximum number of connections per host.
+        :param timeout: The total timeout of a request, in seconds.
+        """
+        if aiohttp is None:
+            raise ImportError(
+                'The aiohttp package is required by AiohttpTransport')
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self._session = None
+
+    def _get_session(self):
+        # The session must be created from within the event loop.
+        if self._session is None:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit_per_host=self.pool_size),
+                timeout=aiohttp.ClientTimeout(total=self.timeout))
+        return self._session
+
+    async def request(self, url, method='GET', body=None, headers=None):
+        try:
+            async with self._get_session().request(
+                    method, url, data=body, headers=headers,
+                    allow_redirects=False) as result:
+                content = await result.read()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as error:
+            raise IOError(str(error))
+        info = dict(result.headers)
+        info['status'] = result.status
+        response = Response(info)
+        response.reason = result.reason
+        return response, content
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+class AsyncConnection(Connection):
+    """An asynchronous connection to the REST API.
+
+    At most `max_concurrency` requests are in flight at any time, further
+    calls wait for one of them to complete.
+    """
+
+    def __init__(self, baseurl, name=None, password=None, transport=None,
+                 pool_size=DEFAULT_POOL_SIZE,
+                 idle_timeout=DEFAULT_POOL_IDLE_TIMEOUT, timeout=None,
+                 max_concurrency=DEFAULT_MAX_CONCURRENCY):
+        """
+        :param transport: The :class:`AsyncTransport` used to send the
+            requests.  Defaults to an `HttpTransport` run in a
+            :class:`ThreadedTransport`.
+        :param max_concurrency: The maximum number of simultaneous requests.
+
+        The other parameters are the same as :class:`Connection`'s.
+        """
+        if transport is None:
+            transport = ThreadedTransport(
+                HttpTransport(pool_size, idle_timeout, timeout), pool_size)
+        super(AsyncConnection, self).__init__(
+            baseurl, name, password, transport=transport)
+        self.max_concurrency = max_concurrency
+        self._semaphore = None
+
+    async def call(self, path, data=None, method=None, headers=None):
+        """Make a call to the Mailman REST API.
+
+        See :meth:`Connection.call`.
+        """
+        if self._semaphore is None:
+            # Created lazily to bind it to the running event loop.
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        url, method, body, headers = self._prepare(
+            path, data, method, headers)
+        try:
+            async with self._semaphore:
+                response, content = await self.transport.request(
+                    url, method, body, headers)
+            return self._process(url, response, content)
+        except HTTPError:
+            raise
+        except IOError:
+            raise MailmanConnectionError('Could not connect to Mailman API')
+
+    def stream(self, path, data=None, method=None, headers=None):
+        """Not supported, the asynchronous transports don't stream.
+
+        :raises TypeError: always, await :meth:`call` instead.
+        """
+        raise TypeError(
+            '{0} does not support streaming, await call() '
+            'instead'.format(self.__class__.__name__))
+
+    async def close(self):
+        await self.transport.close()
@@ -0,0 +1,63 @@
+# Copyright (C) 2017 The Free Software Foundation, Inc.
+#
+# This file is part of mailmanclient.
+#
+# mailmanclient is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation, version 3 of the License.
+#
+# mailmanclient is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
+# or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public
+# License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with mailmanclient.  If not, see <http://www.gnu.org/licenses/>.
+
+from mailmanclient.constants import DEFAULT_PAGE_ITEM_COUNT
+from mailmanclient.restbase.page import Page
+
+__all__ = [
+    'AsyncPage'
+]
+
+
+class AsyncPage(Page):
+    """A page of results, asynchronous version.
+
+    The page is empty until `fetch()` is awaited, and `next()` and
+    `previous()` are coroutines returning fetched pages.
+    """
+
+    def __init__(self, connection, path, model, count=DEFAULT_PAGE_ITEM_COUNT,
+                 page=1):
+        self._connection = connection
+        self._path = path
+        self._count = count
+        self._page = page
+        self._model = model
+        self._entries = []
+        self.total_size = 0
+
+    async def fetch(self):
+        """Get the page entries from the API.
+
+        :return: The page itself.
+        """
+        response, content = await self._connection.call(self._build_url())
+        self.total_size = content['total_size']
+        self._entries = [
+            self._model(self._connection, entry['self_link'], entry)
+            for entry in content.get('entries', [])]
+        return self
+
+    async def next(self):
+        return await self.__class__(
+            self._connection, self._path, self._model, self._count,
+            self._page + 1).fetch()
+
+    async def previous(self):
+        if self.has_previous:
+            return await self.__class__(
+                self._connection, self._path, self._model, self._count,
+                self._page - 1).fetch()
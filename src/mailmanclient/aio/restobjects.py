@@ -0,0 +1,231 @@
+# Copyright (C) 2017 The Free Software Foundation, Inc.
+#
+# This file is part of mailmanclient.
+#
+# mailmanclient is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation, version 3 of the License.
+#
+# mailmanclient is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
+# or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public
+# License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with mailmanclient.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Asynchronous versions of the REST objects."""
+
+import asyncio
+from operator import itemgetter
+from six.moves.urllib_error import HTTPError
+
+from mailmanclient.aio.base import AsyncRESTDict, AsyncRESTObject
+from mailmanclient.aio.page import AsyncPage
+from mailmanclient.restobjects.address import Address
+from mailmanclient.restobjects.domain import Domain
+from mailmanclient.restobjects.mailinglist import MailingList
+from mailmanclient.restobjects.member import Member
+from mailmanclient.restobjects.settings import Settings
+from mailmanclient.restobjects.user import User
+
+__all__ = [
+    'AsyncAddress',
+    'AsyncDomain',
+    'AsyncMailingList',
+    'AsyncMember',
+    'AsyncSettings',
+    'AsyncUser',
+]
+
+
+async def _get_entries(connection, url, model, data=None, sort_key=None):
+    response, content = await connection.call(url, data)
+    entries = content.get('entries', [])
+    if sort_key is not None:
+        entries = sorted(entries, key=itemgetter(sort_key))
+    return [model(connection, entry['self_link'], entry)
+            for entry in entries]
+
+
+class AsyncSettings(AsyncRESTDict):
+
+    _read_only_properties = Settings._read_only_properties
+
+
+class AsyncAddress(AsyncRESTObject):
+
+    _properties = Address._properties
+
+    def __repr__(self):
+        return '<AsyncAddress "{0}">'.format(self.email)
+
+    async def get_user(self):
+        if 'user' not in self.rest_data:
+            return None
+        return await AsyncUser(
+            self._connection, self.rest_data['user']).fetch()
+
+
+class AsyncMember(AsyncRESTObject):
+
+    _properties = Member._properties
+    _writable_properties = Member._writable_properties
+
+    def __repr__(self):
+        return '<AsyncMember "{0}" on "{1}">'.format(self.email, self.list_id)
+
+    async def get_address(self):
+        return await AsyncAddress(
+            self._connection, self.rest_data['address']).fetch()
+
+    async def get_user(self):
+        return await AsyncUser(
+            self._connection, self.rest_data['user']).fetch()
+
+    async def unsubscribe(self):
+        """Unsubscribe the member from a mailing list."""
+        await self.delete()
+
+
+class AsyncUser(AsyncRESTObject):
+
+    _properties = User._properties
+    _writable_properties = User._writable_properties
+
+    def __repr__(self):
+        return '<AsyncUser "{0}" ({1})>'.format(
+            self.display_name, self.user_id)
+
+    async def get_addresses(self):
+        return await _get_entries(
+            self._connection, 'users/{0}/addresses'.format(self.user_id),
+            AsyncAddress)
+
+    async def get_subscriptions(self):
+        """Get the memberships of all the user's addresses.
+
+        The lookups for each address are run concurrently.
+        """
+        addresses = await self.get_addresses()
+        results = await asyncio.gather(*[
+            _get_entries(self._connection, 'members/find', AsyncMember,
+                         data={'subscriber': address.email})
+            for address in addresses])
+        return [member for members in results for member in members]
+
+
+class AsyncMailingList(AsyncRESTObject):
+
+    _properties = MailingList._properties
+
+    def __repr__(self):
+        return '<AsyncList "{0}">'.format(self.fqdn_listname)
+
+    async def _get_roster(self, role):
+        url = 'lists/{0}/roster/{1}'.format(self.fqdn_listname, role)
+        response, content = await self._connection.call(url)
+        return [item['email'] for item in content.get('entries', [])]
+
+    async def get_owners(self):
+        return await self._get_roster('owner')
+
+    async def get_moderators(self):
+        return await self._get_roster('moderator')
+
+    async def get_members(self):
+        url = 'lists/{0}/roster/member'.format(self.fqdn_listname)
+        return await _get_entries(
+            self._connection, url, AsyncMember, sort_key='address')
+
+    async def get_member_page(self, count=50, page=1):
+        url = 'lists/{0}/roster/member'.format(self.fqdn_listname)
+        return await AsyncPage(
+            self._connection, url, AsyncMember, count, page).fetch()
+
+    async def get_member(self, email):
+        """Get a membership.
+
+        :param email: The email address of the member for this list.
+        :return: A member proxy object.
+        """
+        path = 'lists/{0}/member/{1}'.format(self.list_id, email)
+        try:
+            response, content = await self._connection.call(path)
+        except HTTPError:
+            raise ValueError('%s is not a member address of %s' %
+                             (email, self.fqdn_listname))
+        return AsyncMember(self._connection, content['self_link'], content)
+
+    async def get_settings(self):
+        return await AsyncSettings(
+            self._connection,
+            'lists/{0}/config'.format(self.fqdn_listname)).fetch()
+
+    async def subscribe(self, address, display_name=None, pre_verified=False,
+                        pre_confirmed=False, pre_approved=False):
+        """Subscribe an email address to a mailing list.
+
+        See :meth:`MailingList.subscribe`.
+        """
+        data = dict(
+            list_id=self.list_id,
+            subscriber=address,
+            display_name=display_name,
+        )
+        if pre_verified:
+            data['pre_verified'] = True
+        if pre_confirmed:
+            data['pre_confirmed'] = True
+        if pre_approved:
+            data['pre_approved'] = True
+        response, content = await self._connection.call('members', data)
+        if response.status == 202:
+            return content
+        return await AsyncMember(
+            self._connection, response['location']).fetch()
+
+    async def unsubscribe(self, email):
+        """Unsubscribe an email address from a mailing list.
+
+        :param email: The address to unsubscribe.
+        """
+        path = 'lists/{0}/member/{1}'.format(self.list_id, email)
+        try:
+            await self._connection.call(path, method='DELETE')
+        except HTTPError:
+            raise ValueError('%s is not a member address of %s' %
+                             (email, self.fqdn_listname))
+
+
+class AsyncDomain(AsyncRESTObject):
+
+    _properties = Domain._properties
+
+    def __repr__(self):
+        return '<AsyncDomain "{0}">'.format(self.mail_host)
+
+    async def get_owners(self):
+        response, content = await self._connection.call(
+            self._url + '/owners')
+        return content.get('entries', [])
+
+    async def get_lists(self, advertised=None):
+        url = 'domains/{0}/lists'.format(self.mail_host)
+        if advertised:
+            url += '?advertised=true'
+        return await _get_entries(self._connection, url, AsyncMailingList)
+
+    async def get_list_page(self, count=50, page=1, advertised=None):
+        url = 'domains/{0}/lists'.format(self.mail_host)
+        if advertised:
+            url += '?advertised=true'
+        return await AsyncPage(
+            self._connection, url, AsyncMailingList, count, page).fetch()
+
+    async def create_list(self, list_name):
+        fqdn_listname = '{0}@{1}'.format(list_name, self.mail_host)
+        response, content = await self._connection.call(
+            'lists', dict(fqdn_listname=fqdn_listname))
+        return await AsyncMailingList(
+            self._connection, response['location']).fetch()
@@ -21,7 +21,8 @@ from __future__ import absolute_import, unicode_literals
 import warnings
 from operator import itemgetter
 
-from mailmanclient.constants import (MISSING)
+from mailmanclient.constants import (
+    DEFAULT_MAX_CONCURRENCY, DEFAULT_PAGE_ITEM_COUNT, MISSING)
 from mailmanclient.restobjects.address import Address
 from mailmanclient.restobjects.ban import Bans, BannedAddress
 from mailmanclient.restobjects.configuration import Configuration
@@ -31,8 +32,11 @@ from mailmanclient.restobjects.member import Member
 from mailmanclient.restobjects.preferences import Preferences
 from mailmanclient.restobjects.queue import Queue
 from mailmanclient.restobjects.user import User
+from mailmanclient.restbase.bulk import prefetch
+from mailmanclient.restbase.columns import load_columns
 from mailmanclient.restbase.connection import Connection
-from mailmanclient.restbase.page import Page
+from mailmanclient.restbase.page import Page, iter_entries
+from mailmanclient.snapshot import Snapshot
 
 __metaclass__ = type
 __all__ = [
@@ -47,7 +51,7 @@ __all__ = [
 class Client:
     """Access the Mailman REST API root."""
 
-    def __init__(self, baseurl, name=None, password=None):
+    def __init__(self, baseurl, name=None, password=None, **kwargs):
         """Initialize client access to the REST API.
 
         :param baseurl: The base url to access the Mailman 3 REST API.
@@ -55,13 +59,45 @@ class Client:
             also be given.
         :param password: The Basic Auth password.  If given the `name` must
             also be given.
+        :param kwargs: Additional connection options such as `pool_size`, see
+            :class:`Connection`.
         """
-        self._connection = Connection(baseurl, name, password)
+        self._connection = Connection(baseurl, name, password, **kwargs)
 
     def __repr__(self):
         return '<Client ({0.name}:{0.password}) {0.baseurl}>'.format(
             self._connection)
 
+    def prefetch(self, objects, attrs=(),
+                 max_workers=DEFAULT_MAX_CONCURRENCY):
+        """Load the REST data of many objects concurrently.
+
+        For instance, to load the settings of all the lists at once::
+
+            client.prefetch(client.lists, attrs=['settings'])
+
+        :param objects: The REST objects to load.
+        :param attrs: Names of attributes to load as well on each object.
+        :param max_workers: The maximum number of simultaneous requests.
+        :return: The list of objects.
+        """
+        return prefetch(objects, attrs, max_workers)
+
+    def snapshot(self, path=None, refresh=True):
+        """Take a local snapshot of the site, for read-heavy workloads.
+
+        :param path: The path of an SQLite database file to store the
+            snapshot in, see :class:`Snapshot`.
+        :param refresh: Download the site.  Set it to False to use the
+            snapshot stored in `path` as is.
+        :type refresh: bool
+        :return: A :class:`Snapshot`.
+        """
+        snapshot = Snapshot(self._connection, path)
+        if refresh:
+            snapshot.refresh()
+        return snapshot
+
     @property
     def system(self):
         return self._connection.call('system/versions')[1]
@@ -115,6 +151,15 @@ class Client:
             url += '?advertised=true'
         return Page(self._connection, url, MailingList, count, page)
 
+    def iter_lists(self, page_size=DEFAULT_PAGE_ITEM_COUNT, advertised=None,
+                   read_ahead=0, compact=False):
+        """Iterate over the mailing lists, fetching them page by page."""
+        url = 'lists'
+        if advertised:
+            url += '?advertised=true'
+        return iter_entries(self._connection, url, MailingList, page_size,
+                            read_ahead, compact)
+
     @property
     def domains(self):
         response, content = self._connection.call('domains')
@@ -138,6 +183,26 @@ class Client:
     def get_member_page(self, count=50, page=1):
         return Page(self._connection, 'members', Member, count, page)
 
+    def iter_members(self, page_size=DEFAULT_PAGE_ITEM_COUNT, read_ahead=0,
+                     compact=False):
+        """Iterate over the members, fetching them page by page."""
+        return iter_entries(self._connection, 'members', Member, page_size,
+                            read_ahead, compact)
+
+    def get_member_columns(self, fields=None, page_size=None, read_ahead=0):
+        """Load the members of all the lists as a column-oriented table.
+
+        :param fields: The columns to load, defaults to the members'
+            properties.
+        :param page_size: The number of members per request, or None to
+            stream them in a single request.
+        :param read_ahead: The number of pages to fetch in advance.
+        :return: A :class:`Columns` table where `delivery_mode`, `list_id`,
+            `moderation_action` and `role` are categorical.
+        """
+        return load_columns(self._connection, 'members', Member, fields,
+                            page_size, read_ahead)
+
     @property
     def users(self):
         response, content = self._connection.call('users')
@@ -150,6 +215,12 @@ class Client:
     def get_user_page(self, count=50, page=1):
         return Page(self._connection, 'users', User, count, page)
 
+    def iter_users(self, page_size=DEFAULT_PAGE_ITEM_COUNT, read_ahead=0,
+                   compact=False):
+        """Iterate over the users, fetching them page by page."""
+        return iter_entries(self._connection, 'users', User, page_size,
+                            read_ahead, compact)
+
     def create_domain(self, mail_host, base_url=MISSING,
                       description=None, owner=None):
         if base_url is not MISSING:
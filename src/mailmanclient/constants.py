@@ -18,4 +18,19 @@
 __version__ = '3.1.2a1'
 
 DEFAULT_PAGE_ITEM_COUNT = 50
+# Maximum number of persistent HTTP connections kept open per host.
+DEFAULT_POOL_SIZE = 10
+# Number of seconds after which an idle pooled connection is closed.
+DEFAULT_POOL_IDLE_TIMEOUT = 60
+# Maximum number of responses kept by the response cache.
+DEFAULT_CACHE_SIZE = 1000
+# Default number of seconds a response is cached.
+DEFAULT_CACHE_TTL = 60
+# Maximum number of simultaneous requests sent by concurrent operations and
+# by the asynchronous client.
+DEFAULT_MAX_CONCURRENCY = 10
+# Number of bytes read at a time from streamed responses.
+DEFAULT_STREAM_CHUNK_SIZE = 64 * 1024
+# Maximum number of held message bodies kept for the held message summaries.
+DEFAULT_HELD_BODY_CACHE_SIZE = 50
 MISSING = object()
@@ -14,8 +14,11 @@
 # You should have received a copy of the GNU Lesser General Public License
 # along with mailmanclient.  If not, see <http://www.gnu.org/licenses/>.
 
+import threading
+
 import six
 
+from abc import ABCMeta
 from collections import MutableMapping, Sequence
 
 __metaclass__ = type
@@ -23,10 +26,58 @@ __all__ = [
     'RESTBase',
     'RESTDict',
     'RESTList',
-    'RESTObject'
+    'RESTMeta',
+    'RESTObject',
+    'RESTProperty',
 ]
 
 
+class RESTProperty:
+    """An attribute reading and writing a property of the REST data."""
+
+    __slots__ = ('name',)
+
+    def __init__(self, name):
+        self.name = name
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        # Some REST key/values may not be returned by Mailman if the value is
+        # None.
+        return instance.rest_data.get(self.name)
+
+    def __set__(self, instance, value):
+        instance._set(self.name, value)
+
+
+class RESTMeta(ABCMeta):
+    """Precompute the property lookups of the REST classes.
+
+    The property lists are turned into frozensets for constant time lookups,
+    and the classes with `_property_attributes` get a :class:`RESTProperty`
+    descriptor per property, so that reading or writing a property does not
+    go through `__getattr__` or `__setattr__`.  Attributes defined by the
+    class or its bases are left alone.
+    """
+
+    def __init__(cls, name, bases, namespace):
+        super(RESTMeta, cls).__init__(name, bases, namespace)
+        properties = cls._properties
+        cls._property_set = (
+            None if properties is None else frozenset(properties))
+        cls._writable_set = (
+            None if cls._writable_properties is None
+            else frozenset(cls._writable_properties))
+        cls._read_only_set = frozenset(cls._read_only_properties)
+        if cls._property_attributes and properties is not None:
+            for prop in properties:
+                existing = getattr(cls, prop, None)
+                if existing is None:
+                    setattr(cls, prop, RESTProperty(prop))
+
+
+@six.add_metaclass(RESTMeta)
 class RESTBase:
     """
     Base class for data coming from the REST API.
@@ -45,12 +96,22 @@ class RESTBase:
       (defaults to `self_link` only).
     :cvar _autosave: automatically send a `PATCH` request to the API when a
         value is changed. Otherwise, the `save()` method must be called.
+    :cvar _categorical_properties: the properties which only take a few
+      distinct values, stored as codes in column-oriented tables.
+
+    The entity tag returned by the API is kept along with the data.  When the
+    cache is reset, the previous data is revalidated with an `If-None-Match`
+    request and reused if it has not changed, and `save()` sends it in an
+    `If-Match` header so that concurrent modifications are detected.
     """
 
     _properties = None
     _writable_properties = None
     _read_only_properties = ['self_link']
     _autosave = False
+    _categorical_properties = ()
+    # Whether the properties are exposed as attributes, see RESTMeta.
+    _property_attributes = False
 
     def __init__(self, connection, url, data=None):
         """
@@ -65,6 +126,11 @@ class RESTBase:
         self._url = url
         self._rest_data = data
         self._changed_rest_data = {}
+        self._etag = None
+        if isinstance(data, dict):
+            self._etag = data.get('http_etag')
+        # The data from before the last cache reset, to be revalidated.
+        self._stale_rest_data = None
 
     def __repr__(self):
         return '<{0} at {1}>'.format(self.__class__.__name__, self._url)
@@ -73,26 +139,39 @@ class RESTBase:
     def rest_data(self):
         """Get data from API and cache it (only once per instance)."""
         if self._rest_data is None:
-            response, content = self._connection.call(self._url)
-            if isinstance(content, dict) and 'http_etag' in content:
-                del content['http_etag']  # We don't care about etags.
-            self._rest_data = content
+            headers = None
+            if self._etag is not None and self._stale_rest_data is not None:
+                headers = {'If-None-Match': self._etag}
+            response, content = self._connection.call(
+                self._url, headers=headers)
+            if response.status == 304:
+                self._rest_data = self._stale_rest_data
+            else:
+                self._etag = response.get('etag')
+                if isinstance(content, dict) and 'http_etag' in content:
+                    self._etag = content.pop('http_etag')
+                self._rest_data = self._parse(content)
+            self._stale_rest_data = None
         return self._rest_data
 
+    def _parse(self, content):
+        """Turn the response content into the cached data."""
+        return content
+
     def _get(self, key):
-        if self._properties is not None:
+        if self._property_set is not None:
             # Some REST key/values may not be returned by Mailman if the value
             # is None.
-            if key in self._properties:
+            if key in self._property_set:
                 return self.rest_data.get(key)
             raise KeyError(key)
         else:
             return self.rest_data[key]
 
     def _set(self, key, value):
-        if (key in self._read_only_properties or (
-                self._writable_properties is not None
-                and key not in self._writable_properties)):
+        if (key in self._read_only_set or (
+                self._writable_set is not None
+                and key not in self._writable_set)):
             raise ValueError('value is read-only')
         # Don't check that the key is in _properties, the accepted values for
         # write may be different from the returned values (eg: User.password
@@ -105,16 +184,31 @@ class RESTBase:
 
     def _reset_cache(self):
         self._changed_rest_data = {}
+        if self._rest_data is not None:
+            self._stale_rest_data = self._rest_data
         self._rest_data = None
 
     def save(self):
+        headers = None
+        if self._etag is not None:
+            headers = {'If-Match': self._etag}
         response, content = self._connection.call(
-            self._url, self._changed_rest_data, method='PATCH')
+            self._url, self._changed_rest_data, method='PATCH',
+            headers=headers)
         self._reset_cache()
+        # The resource changed: the old ETag and data must not be used to
+        # revalidate it, or as a precondition of the next save.
+        self._etag = response.get('etag')
+        self._stale_rest_data = None
 
 
 class RESTObject(RESTBase):
-    """Base class for REST data that behaves like an object with attributes."""
+    """Base class for REST data that behaves like an object with attributes.
+
+    The properties are attributes, see :class:`RESTMeta`.
+    """
+
+    _property_attributes = True
 
     def __getattr__(self, name):
         try:
@@ -125,14 +219,6 @@ class RESTObject(RESTBase):
                 "'{0}' object has no attribute '{1}'".format(
                     self.__class__.__name__, name))
 
-    def __setattr__(self, name, value):
-        # RESTObject must list REST-specific properties or we won't be able to
-        # store the _connection, _url, etc.
-        assert self._properties is not None
-        if name not in self._properties:
-            return super(RESTObject, self).__setattr__(name, value)
-        return self._set(name, value)
-
     def delete(self):
         self._connection.call(self._url, method='DELETE')
         self._reset_cache()
@@ -158,7 +244,8 @@ class RESTDict(RESTBase, MutableMapping):
 
     def __iter__(self):
         for key in self.rest_data:
-            if self._properties is not None and key not in self._properties:
+            if (self._property_set is not None and
+                    key not in self._property_set):
                 continue
             yield key
 
@@ -187,19 +274,148 @@ class RESTList(RESTBase, Sequence):
 
     The `_factory` attribute is a callable that will be applied on each
     returned member of the list.
+
+    Mutations through the list update its cached entries, once loaded,
+    instead of discarding them.  With `revalidate` set, the entries are
+    also reloaded in a background thread after each mutation.
+
+    Subclasses defining `_index_key`, a function returning the key of an
+    entry, can look the entries up by key with `_find()`.
     """
 
     _factory = lambda x: x  # flake8: noqa
 
-    @property
-    def rest_data(self):
-        if self._rest_data is None:
+    _index_key = None
+    # Key -> entry, built from the cached entries on the first lookup.
+    _key_index = None
+
+    # Reload the entries in the background after a local update.
+    revalidate = False
+
+    # Incremented on each change of the cached entries.
+    _cache_version = 0
+
+    def __init__(self, connection, url, data=None):
+        super(RESTList, self).__init__(connection, url, data)
+        # Serializes the updates of the cached entries, and of the data
+        # derived from them, with the revalidations.
+        self._cache_lock = threading.Lock()
+
+    def _parse(self, content):
+        return content.get('entries', [])
+
+    def _reset_cache(self):
+        with self._cache_lock:
+            super(RESTList, self)._reset_cache()
+            self._cache_version += 1
+            self._cache_updated()
+
+    def _cache_updated(self):
+        """Called when the cached entries are replaced or reset.
+
+        Subclasses keeping data derived from the entries reset it here.
+        """
+        self._key_index = None
+
+    def _find(self, key):
+        """Return the entry with a key, or None.
+
+        The entries are loaded if they are not already.
+        """
+        index = self._key_index
+        if index is None:
+            index = self._derive(lambda entries: dict(
+                (self._index_key(entry), entry) for entry in entries),
+                '_key_index')
+        return index.get(key)
+
+    def _derive(self, build, name):
+        """Build data derived from the cached entries.
+
+        The data is built and stored in the `name` attribute while holding
+        the cache lock, so that it always matches the cached entries.  It
+        is not stored if the entries were reset meanwhile.
+
+        :param build: A function building the data from a list of entries.
+        :param name: The attribute storing the derived data, reset to None
+            in `_cache_updated()`.
+        :return: The derived data.
+        """
+        entries = self.rest_data
+        with self._cache_lock:
+            derived = getattr(self, name)
+            if derived is not None:
+                return derived
+            if self._rest_data is None:
+                return build(entries)
+            derived = build(self._rest_data)
+            setattr(self, name, derived)
+        return derived
+
+    def _cache_insert(self, entries):
+        """Add new entries to the cached data, if loaded.
+
+        :param entries: The dictionaries of the new entries, as the API
+            would return them.
+        :return: True if the cached data was updated.
+        """
+        entries = list(entries)
+        with self._cache_lock:
+            if self._rest_data is None:
+                return False
+            self._rest_data.extend(entries)
+            if self._key_index is not None:
+                for entry in entries:
+                    self._key_index[self._index_key(entry)] = entry
+            self._cache_changed()
+        return True
+
+    def _cache_remove(self, match):
+        """Remove entries from the cached data, if loaded.
+
+        :param match: A function returning True for the entries to remove.
+        :return: The list of removed entries.
+        """
+        with self._cache_lock:
+            if self._rest_data is None:
+                return []
+            kept, removed = [], []
+            for entry in self._rest_data:
+                (removed if match(entry) else kept).append(entry)
+            self._rest_data = kept
+            if self._key_index is not None:
+                for entry in removed:
+                    self._key_index.pop(self._index_key(entry), None)
+            self._cache_changed()
+        return removed
+
+    def _cache_changed(self):
+        # The entries changed locally: the ETag of the collection is stale,
+        # and running revalidations would return older entries.
+        self._etag = None
+        self._stale_rest_data = None
+        self._cache_version += 1
+        if self.revalidate:
+            thread = threading.Thread(
+                target=self._revalidate, args=(self._cache_version,))
+            thread.daemon = True
+            self._revalidation = thread
+            thread.start()
+
+    def _revalidate(self, version):
+        try:
             response, content = self._connection.call(self._url)
-            if 'entries' not in content:
-                self._rest_data = []
-            else:
-                self._rest_data = content['entries']
-        return self._rest_data
+        except Exception:
+            # Keep the local entries, the next reset will reload them.
+            return
+        with self._cache_lock:
+            if version != self._cache_version:
+                return
+            self._etag = response.get('etag')
+            if isinstance(content, dict) and 'http_etag' in content:
+                self._etag = content.pop('http_etag')
+            self._rest_data = self._parse(content)
+            self._cache_updated()
 
     def __repr__(self):
         return repr(self.rest_data)
@@ -211,8 +427,9 @@ class RESTList(RESTBase, Sequence):
         return self._factory(self.rest_data[key])
 
     def __delitem__(self, key):
-        self[key].delete()
-        self._reset_cache()
+        entry = self.rest_data[key]
+        self._factory(entry).delete()
+        self._cache_remove(lambda data: data is entry)
 
     def __len__(self):
         return len(self.rest_data)
@@ -221,6 +438,17 @@ class RESTList(RESTBase, Sequence):
         for entry in self.rest_data:
             yield self._factory(entry)
 
+    def stream(self):
+        """Iterate over the entries as they are read from the API.
+
+        Unlike iterating over the list, the entries are not loaded and
+        cached beforehand: each call sends a new request and decodes the
+        response incrementally.
+        """
+        response, entries = self._connection.stream(self._url)
+        for entry in entries:
+            yield self._factory(entry)
+
     def clear(self):
         self._connection.call(self._url, method='DELETE')
-        self._reset_cache()
\ No newline at end of file
+        self._cache_remove(lambda data: True)
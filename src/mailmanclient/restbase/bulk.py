@@ -0,0 +1,183 @@
+# Copyright (C) 2017 The Free Software Foundation, Inc.
+#
+# This file is part of mailmanclient.
+#
+# mailmanclient is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation, version 3 of the License.
+#
+# mailmanclient is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
+# or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public
+# License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with mailmanclient.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Helpers to run many REST calls concurrently."""
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from mailmanclient.constants import DEFAULT_MAX_CONCURRENCY
+from mailmanclient.restbase.base import RESTBase
+
+__metaclass__ = type
+__all__ = [
+    'BulkResult',
+    'Pending',
+    'bulk_apply',
+    'prefetch',
+    'run_concurrently',
+]
+
+
+class BulkResult:
+    """The outcome of a bulk operation, item by item.
+
+    The operation goes on when an item fails, the failures are reported
+    here instead of being raised.
+
+    :ivar succeeded: `(item, result)` pairs of the completed items.
+    :ivar pending: `(item, token)` pairs of the items waiting for a
+        confirmation or an approval.
+    :ivar failed: `(item, exception)` pairs of the failed items.
+    """
+
+    def __init__(self):
+        self.succeeded = []
+        self.pending = []
+        self.failed = []
+
+    def __repr__(self):
+        return '<BulkResult: {0} succeeded, {1} pending, {2} failed>'.format(
+            len(self.succeeded), len(self.pending), len(self.failed))
+
+    @property
+    def ok(self):
+        """True if no item failed."""
+        return not self.failed
+
+    @property
+    def failure_codes(self):
+        """The HTTP status code of each failed item.
+
+        :return: A dictionary from the failed items to their HTTP status
+            codes, or to None when the failure is not an HTTP error.
+        """
+        return dict((item, getattr(error, 'code', None))
+                    for item, error in self.failed)
+
+
+def run_concurrently(func, items, max_workers=DEFAULT_MAX_CONCURRENCY,
+                     return_exceptions=False, progress=None):
+    """Call `func` on each item using a pool of threads.
+
+    The connection is thread-safe, so `func` can make REST calls.
+
+    :param func: The function to call with each item.
+    :param items: An iterable of items.
+    :param max_workers: The maximum number of simultaneous calls.
+    :type max_workers: int.
+    :param return_exceptions: If True, the exceptions raised by `func` are
+        returned in place of the results.  Otherwise the first exception is
+        raised once all the calls are done.
+    :type return_exceptions: bool.
+    :param progress: A function called with each item and its result, or
+        its exception, as soon as the call is done.  It is called from the
+        calling thread, in the order of completion.
+    :return: The list of results, in the order of `items`.
+    """
+    items = list(items)
+    if not items:
+        return []
+    with ThreadPoolExecutor(min(max_workers, len(items))) as executor:
+        futures = [executor.submit(func, item) for item in items]
+        if progress is not None:
+            item_of = dict(zip(futures, items))
+            try:
+                for future in as_completed(futures):
+                    error = future.exception()
+                    progress(item_of[future],
+                             future.result() if error is None else error)
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+    results = []
+    for future in futures:
+        error = future.exception()
+        if error is None:
+            results.append(future.result())
+        elif return_exceptions:
+            results.append(error)
+        else:
+            raise error
+    return results
+
+
+class Pending:
+    """The result of an item waiting for a confirmation or an approval.
+
+    The functions given to :func:`bulk_apply` return it for such items.
+
+    :ivar token: The token of the request.
+    """
+
+    def __init__(self, token):
+        self.token = token
+
+
+def bulk_apply(func, items, max_workers=DEFAULT_MAX_CONCURRENCY, key=None,
+               progress=None):
+    """Call `func` on each item concurrently, and collect the outcomes.
+
+    The items for which `func` raises an exception fail, the others
+    succeed with the result of `func`, or are pending if it returns a
+    :class:`Pending` instance.
+
+    :param func: The function to call with each item.
+    :param items: An iterable of items.
+    :param max_workers: The maximum number of simultaneous calls.
+    :type max_workers: int.
+    :param key: A function returning the key of an item in the result.  By
+        default, the items are the keys.
+    :param progress: See :func:`run_concurrently`.
+    :return: A :class:`BulkResult`, in the order of `items`.
+    """
+    items = list(items)
+    outcomes = run_concurrently(
+        func, items, max_workers, return_exceptions=True, progress=progress)
+    result = BulkResult()
+    for item, outcome in zip(items, outcomes):
+        if key is not None:
+            item = key(item)
+        if isinstance(outcome, Exception):
+            result.failed.append((item, outcome))
+        elif isinstance(outcome, Pending):
+            result.pending.append((item, outcome.token))
+        else:
+            result.succeeded.append((item, outcome))
+    return result
+
+
+def prefetch(objects, attrs=(), max_workers=DEFAULT_MAX_CONCURRENCY):
+    """Load the REST data of many objects concurrently.
+
+    :param objects: The `RESTObject` or `RESTDict` instances to load.
+    :param attrs: Names of attributes to load as well on each object.  When
+        an attribute is itself a REST object, such as `MailingList.settings`,
+        its data is loaded too.
+    :param max_workers: The maximum number of simultaneous requests.
+    :return: The list of objects.
+    """
+    objects = list(objects)
+
+    def fetch(obj):
+        obj.rest_data
+        for attr in attrs:
+            value = getattr(obj, attr)
+            if isinstance(value, RESTBase):
+                value.rest_data
+
+    run_concurrently(fetch, objects, max_workers)
+    return objects
@@ -0,0 +1,332 @@
+# Copyright (C) 2017 The Free Software Foundation, Inc.
+#
+# This file is part of mailmanclient.
+#
+# mailmanclient is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation, version 3 of the License.
+#
+# mailmanclient is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
+# or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public
+# License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with mailmanclient.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Client-side cache of the REST API responses."""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+import six
+
+from mailmanclient.constants import DEFAULT_CACHE_SIZE, DEFAULT_CACHE_TTL
+
+__metaclass__ = type
+__all__ = [
+    'CacheBackend',
+    'MemoryBackend',
+    'ResponseCache',
+    'SQLiteBackend',
+]
+
+
+# When a resource of the key type is changed, the cached resources of these
+# types may be out of date as well.  For instance subscribing an address
+# changes the list's member count and roster, and may create a user.
+DEPENDENT_RESOURCES = {
+    'addresses': ('members', 'users'),
+    'domains': ('lists',),
+    'lists': ('domains', 'members'),
+    'members': ('addresses', 'lists', 'users'),
+    'users': ('addresses', 'members'),
+}
+
+
+class CacheBackend:
+    """The storage used by a `ResponseCache`.
+
+    Keys are text strings and values are bytes.  This is the usual protocol
+    of key-value stores, so an adapter for memcached or Redis only needs to
+    forward these three methods to a client, for instance::
+
+        class RedisBackend(CacheBackend):
+            def __init__(self, redis):
+                self.redis = redis
+            def get(self, key):
+                return self.redis.get(key)
+            def set(self, key, value, ttl=None):
+                self.redis.set(key, value, ex=ttl)
+            def delete(self, key):
+                self.redis.delete(key)
+
+    Such a backend shares the cached responses between processes.
+    """
+
+    def get(self, key):
+        """Get a value, or None if it is missing or expired."""
+        raise NotImplementedError
+
+    def set(self, key, value, ttl=None):
+        """Store a value.
+
+        :param ttl: Number of seconds after which the value expires, or
+            None for no expiry.
+        """
+        raise NotImplementedError
+
+    def delete(self, key):
+        """Remove a value if it exists."""
+        raise NotImplementedError
+
+
+class MemoryBackend(CacheBackend):
+    """In-process storage with LRU eviction."""
+
+    def __init__(self, max_size=DEFAULT_CACHE_SIZE):
+        """
+        :param max_size: The maximum number of values.  The least recently
+            used value is evicted when it is reached.
+        """
+        self.max_size = max_size
+        self.evictions = 0
+        self._lock = threading.Lock()
+        # key -> (expiry time or None, value)
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires is not None and expires <= time.time():
+                return None
+            self._entries[key] = entry
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires = None if ttl is None else time.time() + ttl
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (expires, value)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SQLiteBackend(CacheBackend):
+    """Storage in an SQLite database file, which processes can share."""
+
+    def __init__(self, path, max_size=DEFAULT_CACHE_SIZE, timeout=5):
+        """
+        :param path: The path of the database file.
+        :param max_size: The maximum number of values.  The values closest
+            to expiry are evicted when it is exceeded.
+        :param timeout: Number of seconds to wait for a locked database.
+        """
+        self.path = path
+        self.max_size = max_size
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(
+            path, timeout=timeout, check_same_thread=False,
+            isolation_level=None)
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS cache ('
+            'key TEXT PRIMARY KEY, value BLOB, expires REAL)')
+
+    def get(self, key):
+        with self._lock:
+            row = self._db.execute(
+                'SELECT value FROM cache WHERE key = ? AND '
+                '(expires IS NULL OR expires > ?)',
+                (key, time.time())).fetchone()
+        if row is None:
+            return None
+        return bytes(row[0])
+
+    def set(self, key, value, ttl=None):
+        expires = None if ttl is None else time.time() + ttl
+        with self._lock:
+            self._db.execute(
+                'INSERT OR REPLACE INTO cache (key, value, expires) '
+                'VALUES (?, ?, ?)', (key, sqlite3.Binary(value), expires))
+            size = self._db.execute('SELECT COUNT(*) FROM cache').fetchone()
+            if size[0] > self.max_size:
+                cursor = self._db.execute(
+                    'DELETE FROM cache WHERE expires <= ?', (time.time(),))
+                excess = size[0] - cursor.rowcount - self.max_size
+                if excess > 0:
+                    self._db.execute(
+                        'DELETE FROM cache WHERE key IN (SELECT key FROM '
+                        'cache WHERE expires IS NOT NULL ORDER BY expires '
+                        'LIMIT ?)', (excess,))
+                    self.evictions += excess
+
+    def delete(self, key):
+        with self._lock:
+            self._db.execute('DELETE FROM cache WHERE key = ?', (key,))
+
+    def clear(self):
+        with self._lock:
+            self._db.execute('DELETE FROM cache')
+
+    def close(self):
+        self._db.close()
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute(
+                'SELECT COUNT(*) FROM cache').fetchone()[0]
+
+
+class ResponseCache:
+    """A cache of GET responses with per resource type TTLs.
+
+    Responses are cached per resource type, which is the first component of
+    their path (`lists`, `users`, `domains`...).  A `POST`, `PATCH` or
+    `DELETE` request through the connection invalidates all the cached
+    responses of the resource type it changes, and of the dependent types.
+    Searches sent as a `POST`, such as `members/find`, invalidate nothing.
+
+    The responses are stored in a :class:`CacheBackend`, in memory by
+    default.  Invalidation only needs the `get`/`set`/`delete` protocol: each
+    resource type has a generation token stored in the backend, which is part
+    of the keys of its responses and is replaced to invalidate them.
+    """
+
+    key_prefix = 'mailmanclient:'
+
+    def __init__(self, max_size=DEFAULT_CACHE_SIZE, ttl=DEFAULT_CACHE_TTL,
+                 ttls=None, backend=None):
+        """
+        :param max_size: The maximum number of cached values of the default
+            :class:`MemoryBackend`.
+        :type max_size: int.
+        :param ttl: The default number of seconds a response is cached.
+        :type ttl: int.
+        :param ttls: Per resource type number of seconds, for instance
+            `{'lists': 300, 'members': 0}`.  A TTL of 0 disables caching.
+        :type ttls: dict.
+        :param backend: The storage to use instead of the default one.
+        :type backend: CacheBackend.
+        """
+        if backend is None:
+            backend = MemoryBackend(max_size)
+        self.backend = backend
+        self.ttl = ttl
+        self.ttls = ttls or {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get_ttl(self, resource):
+        return self.ttls.get(resource, self.ttl)
+
+    def _generation_key(self, resource):
+        return '{0}generation:{1}'.format(self.key_prefix, resource)
+
+    def _generation(self, resource):
+        key = self._generation_key(resource)
+        generation = self.backend.get(key)
+        if generation is None:
+            # Never reuse a generation the backend may have evicted.
+            generation = uuid.uuid4().hex.encode('ascii')
+            self.backend.set(key, generation)
+        return generation.decode('ascii')
+
+    def generation(self, resource):
+        """The current generation token of a resource type.
+
+        Take it before sending a request and pass it to :meth:`set`, so that
+        a response racing with an invalidation is not cached as current.
+        """
+        return self._generation(resource)
+
+    def _entry_key(self, key, resource, generation=None):
+        if generation is None:
+            generation = self._generation(resource)
+        digest = hashlib.sha1(json.dumps(list(key)).encode('utf-8'))
+        return '{0}{1}:{2}:{3}'.format(
+            self.key_prefix, resource, generation, digest.hexdigest())
+
+    def get(self, key, resource, generation=None):
+        """Get a cached response.
+
+        :param key: The cache key, built from the URL and the credentials.
+        :param resource: The resource type.
+        :param generation: The generation to read, see :meth:`generation`.
+            Defaults to the current one.
+        :return: A `(response info, content)` tuple or None on a miss.
+        """
+        value = self.backend.get(self._entry_key(key, resource, generation))
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        info, content = json.loads(value.decode('utf-8'))
+        return info, content.encode('utf-8')
+
+    def set(self, key, resource, info, content, generation=None):
+        """Cache a response.
+
+        :param info: The response status and headers, as a dictionary.
+        :param content: The response body.
+        :param generation: The generation taken before the request was
+            sent.  If the resource type was invalidated since, the response
+            may predate the change and is not cached.  Should the
+            invalidation happen right after this check, the response is
+            still stored under the old generation, which is never read.
+        """
+        ttl = self.get_ttl(resource)
+        if not ttl:
+            return
+        if generation is None:
+            generation = self._generation(resource)
+        elif generation != self._generation(resource):
+            return
+        if isinstance(content, six.binary_type):
+            content = content.decode('utf-8')
+        value = json.dumps([info, content]).encode('utf-8')
+        self.backend.set(
+            self._entry_key(key, resource, generation), value, ttl)
+
+    def invalidate(self, resource):
+        """Invalidate the cached responses affected by a change.
+
+        :param resource: The type of the changed resource.
+        """
+        self.invalidations += 1
+        for name in (resource,) + DEPENDENT_RESOURCES.get(resource, ()):
+            self.backend.delete(self._generation_key(name))
+
+    def clear(self):
+        self.backend.clear()
+
+    def __len__(self):
+        return len(self.backend)
+
+    @property
+    def stats(self):
+        """The hit, miss, eviction and invalidation counters."""
+        return dict(hits=self.hits, misses=self.misses,
+                    evictions=getattr(self.backend, 'evictions', None),
+                    invalidations=self.invalidations)
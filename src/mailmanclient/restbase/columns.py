@@ -0,0 +1,217 @@
+# Copyright (C) 2017 The Free Software Foundation, Inc.
+#
+# This file is part of mailmanclient.
+#
+# mailmanclient is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation, version 3 of the License.
+#
+# mailmanclient is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
+# or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public
+# License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with mailmanclient.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Column-oriented tables of REST entries, for analytics."""
+
+from array import array
+from collections import Counter
+
+from mailmanclient.restbase.page import iter_entries
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+__metaclass__ = type
+__all__ = [
+    'Columns',
+    'load_columns',
+]
+
+
+# The type of the arrays of categorical codes, a C int.
+CODE_TYPE = 'i'
+
+
+class Columns:
+    """A table of REST entries stored column by column.
+
+    Each field is a column.  The values of the categorical fields, which
+    only take a few distinct values such as a member's role, are stored as
+    an array of integer codes indexing the column's categories.  The other
+    fields are stored as lists of values.
+
+    Counting the rows per category works on the codes only, and is
+    vectorized when NumPy is installed.
+    """
+
+    def __init__(self, fields, categorical=()):
+        """
+        :param fields: The names of the columns.
+        :param categorical: The names of the categorical columns, among
+            `fields`.
+        """
+        self.fields = tuple(fields)
+        self.categorical = frozenset(categorical)
+        self._values = {}
+        self._codes = {}
+        self._categories = {}
+        # Categorical column -> {value: code}
+        self._code_of = {}
+        for name in self.fields:
+            if name in self.categorical:
+                self._codes[name] = array(CODE_TYPE)
+                self._categories[name] = []
+                self._code_of[name] = {}
+            else:
+                self._values[name] = []
+        self._size = 0
+
+    def append(self, entry):
+        """Add a row.
+
+        :param entry: A dictionary from the API.  Missing fields are None.
+        """
+        for name in self.fields:
+            value = entry.get(name)
+            if name in self.categorical:
+                code_of = self._code_of[name]
+                code = code_of.get(value)
+                if code is None:
+                    code = code_of[value] = len(code_of)
+                    self._categories[name].append(value)
+                self._codes[name].append(code)
+            else:
+                self._values[name].append(value)
+        self._size += 1
+
+    def extend(self, entries):
+        for entry in entries:
+            self.append(entry)
+
+    def __len__(self):
+        return self._size
+
+    def __repr__(self):
+        return '<Columns {0} rows: {1}>'.format(
+            self._size, ', '.join(self.fields))
+
+    def categories(self, name):
+        """The distinct values of a categorical column, in code order."""
+        return list(self._categories[name])
+
+    def codes(self, name):
+        """The array of codes of a categorical column."""
+        return self._codes[name]
+
+    def column(self, name):
+        """The values of a column, as a list."""
+        if name in self.categorical:
+            categories = self._categories[name]
+            return [categories[code] for code in self._codes[name]]
+        return list(self._values[name])
+
+    def count(self, *names):
+        """Count the rows per category of one or more categorical columns.
+
+        :return: A dictionary from a value, or a tuple of values when
+            several columns are given, to its number of rows.  Combinations
+            without any row are left out.
+        """
+        if not names:
+            raise ValueError('At least one column is required')
+        for name in names:
+            if name not in self.categorical:
+                raise ValueError('{0} is not categorical'.format(name))
+        # Combine the codes of the columns into a single code.
+        sizes = [len(self._categories[name]) for name in names]
+        if numpy is not None:
+            combined = numpy.zeros(self._size, dtype=numpy.int64)
+            for name, size in zip(names, sizes):
+                combined *= size
+                combined += self.to_numpy_codes(name)
+            counts = numpy.bincount(combined)
+            found = numpy.nonzero(counts)[0]
+            counted = zip(found.tolist(), counts[found].tolist())
+        else:
+            combined = self._codes[names[0]]
+            for name, size in zip(names[1:], sizes[1:]):
+                combined = [code * size + other for code, other in zip(
+                    combined, self._codes[name])]
+            counted = Counter(combined).items()
+        result = {}
+        for code, number in counted:
+            values = []
+            for name, size in reversed(list(zip(names, sizes))):
+                code, index = divmod(code, size)
+                values.append(self._categories[name][index])
+            values.reverse()
+            key = values[0] if len(names) == 1 else tuple(values)
+            result[key] = number
+        return result
+
+    def to_dict(self):
+        """Return the columns as a dictionary of lists of values."""
+        return dict((name, self.column(name)) for name in self.fields)
+
+    def to_numpy_codes(self, name):
+        """The codes of a categorical column as a NumPy array.
+
+        The array is a copy: a view of the codes would prevent adding rows
+        while it is alive.
+        """
+        if numpy is None:
+            raise ImportError('The numpy package is required')
+        return numpy.array(self._codes[name], dtype=numpy.intc)
+
+    def to_numpy(self):
+        """Return the columns as a dictionary of NumPy arrays.
+
+        Categorical columns are given as their integer codes, see
+        `categories()` for the matching values.  The other columns are
+        object arrays.
+        """
+        if numpy is None:
+            raise ImportError('The numpy package is required')
+        result = {}
+        for name in self.fields:
+            if name in self.categorical:
+                result[name] = self.to_numpy_codes(name)
+            else:
+                result[name] = numpy.array(self._values[name], dtype=object)
+        return result
+
+
+def _entry(connection, url, data):
+    # Keep the entries as dictionaries instead of building REST objects.
+    return data
+
+
+def load_columns(connection, path, model, fields=None, page_size=None,
+                 read_ahead=0):
+    """Load a collection into a :class:`Columns` table.
+
+    The entries are added to the table as they are decoded and no REST
+    object is created.
+
+    :param connection: The connection to the REST API.
+    :param path: The path of the collection.
+    :param model: The `RESTObject` subclass of the entries.  Its
+        `_categorical_properties` are stored as categorical columns.
+    :param fields: The columns to load, defaults to the model's properties.
+    :param page_size: The number of entries per request, or None to stream
+        the whole collection in one request.
+    :param read_ahead: The number of pages to fetch in advance.
+    """
+    if fields is None:
+        fields = model._properties
+    categorical = [
+        name for name in model._categorical_properties if name in fields]
+    columns = Columns(fields, categorical)
+    columns.extend(iter_entries(connection, path, _entry, page_size,
+                                read_ahead))
+    return columns
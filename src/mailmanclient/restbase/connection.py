@@ -19,9 +19,12 @@ from six.moves.urllib_error import HTTPError
 from six.moves.urllib_parse import urljoin, urlencode
 
 import six
-from httplib2 import Http
+from httplib2 import Response
 
-from mailmanclient.constants import __version__
+from mailmanclient.constants import (
+    __version__, DEFAULT_POOL_IDLE_TIMEOUT, DEFAULT_POOL_SIZE)
+from mailmanclient.restbase.stream import EntriesStream
+from mailmanclient.restbase.transport import HttpTransport
 
 __metaclass__ = type
 __all__ = [
@@ -37,7 +40,14 @@ class MailmanConnectionError(Exception):
 class Connection:
     """A connection to the REST client."""
 
-    def __init__(self, baseurl, name=None, password=None):
+    # The paths which are queried with a POST but change nothing, so that
+    # they do not invalidate the cached responses.
+    QUERY_PATHS = frozenset(['members/find'])
+
+    def __init__(self, baseurl, name=None, password=None, transport=None,
+                 pool_size=DEFAULT_POOL_SIZE,
+                 idle_timeout=DEFAULT_POOL_IDLE_TIMEOUT, timeout=None,
+                 cache=None):
         """Initialize a connection to the REST API.
 
         :param baseurl: The base url to access the Mailman 3 REST API.
@@ -45,6 +55,16 @@ class Connection:
             also be given.
         :param password: The Basic Auth password.  If given the `name` must
             also be given.
+        :param transport: The :class:`Transport` used to send the requests.
+            Defaults to an :class:`HttpTransport` built from the following
+            parameters.
+        :param pool_size: The maximum number of persistent HTTP connections
+            to keep open to the server.
+        :param idle_timeout: Number of seconds after which an unused
+            persistent connection is closed.
+        :param timeout: The socket timeout, in seconds.
+        :param cache: A :class:`ResponseCache` to cache the responses to
+            `GET` requests in, or None to disable caching.
         """
         if baseurl[-1] != '/':
             baseurl += '/'
@@ -60,25 +80,22 @@ class Connection:
         else:
             auth = '{0}:{1}'.format(name, password)
             self.basic_auth = b64encode(auth.encode('utf-8')).decode('utf-8')
+        if transport is None:
+            transport = HttpTransport(pool_size, idle_timeout, timeout)
+        self.transport = transport
+        self.cache = cache
 
-    def call(self, path, data=None, method=None):
-        """Make a call to the Mailman REST API.
+    def _prepare(self, path, data=None, method=None, headers=None):
+        """Build the request for a call to the REST API.
 
-        :param path: The url path to the resource.
-        :type path: str
-        :param data: Data to send, implies POST (default) or PUT.
-        :type data: dict
-        :param method: The HTTP method to call.  Defaults to GET when `data`
-            is None or POST if `data` is given.
-        :type method: str
-        :return: The response content, which will be None, a dictionary, or a
-            list depending on the actual JSON type returned.
-        :rtype: None, list, dict
-        :raises HTTPError: when a non-2xx status code is returned.
+        :return: A `(url, method, body, headers)` tuple.
         """
+        extra_headers = headers
         headers = {
             'User-Agent': 'GNU Mailman REST client v{0}'.format(__version__),
             }
+        if extra_headers:
+            headers.update(extra_headers)
         data_str = None
         if data is not None:
             for k, v in data.items():
@@ -95,19 +112,126 @@ class Connection:
         if self.basic_auth:
             headers['Authorization'] = 'Basic ' + self.basic_auth
         url = urljoin(self.baseurl, path)
+        return url, method, data_str, headers
+
+    def _process(self, url, response, content):
+        """Check the response status and decode its JSON content."""
+        # Conditional requests get a 304 when the resource has not changed.
+        if response.status == 304:
+            return response, None
+        # If we did not get a 2xx status code, make this look like a
+        # urllib2 exception, for backward compatibility.
+        if response.status // 100 != 2:
+            raise HTTPError(url, response.status, content, response, None)
+        if len(content) == 0:
+            return response, None
+        # XXX Work around for http://bugs.python.org/issue10038
+        if isinstance(content, six.binary_type):
+            content = content.decode('utf-8')
+        return response, json.loads(content)
+
+    def _path(self, url):
+        """The url path relative to the base url, without the query."""
+        if not url.startswith(self.baseurl):
+            return None
+        return url[len(self.baseurl):].split('?')[0]
+
+    def _resource_type(self, url):
+        """The first component of the url path, e.g. `lists`."""
+        path = self._path(url)
+        if path is None:
+            return None
+        return path.split('/')[0]
+
+    def _request(self, url, method, body, headers, cacheable):
+        """Send the request through the cache, if any."""
+        if self.cache is None:
+            return self.transport.request(url, method, body, headers)
+        resource = self._resource_type(url)
+        key = (url, self.basic_auth)
+        if method == 'GET':
+            if not cacheable:
+                return self.transport.request(url, method, body, headers)
+            # A write during the request invalidates this generation, and
+            # the response, which may predate the write, is then dropped.
+            generation = self.cache.generation(resource)
+            cached = self.cache.get(key, resource, generation)
+            if cached is not None:
+                info, content = cached
+                return Response(info), content
+            response, content = self.transport.request(
+                url, method, body, headers)
+            if response.status == 200:
+                self.cache.set(key, resource, dict(response), content,
+                               generation)
+            return response, content
+        if self._path(url) in self.QUERY_PATHS:
+            return self.transport.request(url, method, body, headers)
+        try:
+            return self.transport.request(url, method, body, headers)
+        finally:
+            self.cache.invalidate(resource)
+
+    def call(self, path, data=None, method=None, headers=None):
+        """Make a call to the Mailman REST API.
+
+        :param path: The url path to the resource.
+        :type path: str
+        :param data: Data to send, implies POST (default) or PUT.
+        :type data: dict
+        :param method: The HTTP method to call.  Defaults to GET when `data`
+            is None or POST if `data` is given.
+        :type method: str
+        :param headers: Additional request headers, such as `If-None-Match`.
+        :type headers: dict
+        :return: The response content, which will be None, a dictionary, or a
+            list depending on the actual JSON type returned.  The content is
+            None when the response is a 304 to a conditional request.
+        :rtype: None, list, dict
+        :raises HTTPError: when a non-2xx status code (other than 304) is
+            returned.
+        """
+        # Conditional requests are not served from the cache.
+        cacheable = not headers
+        url, method, body, headers = self._prepare(
+            path, data, method, headers)
+        try:
+            response, content = self._request(
+                url, method, body, headers, cacheable)
+            return self._process(url, response, content)
+        except HTTPError:
+            raise
+        except IOError:
+            raise MailmanConnectionError('Could not connect to Mailman API')
+
+    def stream(self, path, data=None, method=None, headers=None):
+        """Make a call returning a collection, and decode it incrementally.
+
+        The parameters are the same as :meth:`call`'s.  The response body is
+        read from the transport as the entries are consumed, so a large
+        collection is never held in memory as a whole.  Streamed responses
+        do not go through the response cache.
+
+        :return: A `(response, entries)` tuple where `entries` is an
+            :class:`EntriesStream` of the decoded entry dictionaries.
+        :raises HTTPError: when a non-2xx status code is returned.
+        """
+        url, method, body, headers = self._prepare(
+            path, data, method, headers)
         try:
-            response, content = Http().request(url, method, data_str, headers)
-            # If we did not get a 2xx status code, make this look like a
-            # urllib2 exception, for backward compatibility.
+            response, chunks = self.transport.stream(
+                url, method, body, headers)
             if response.status // 100 != 2:
-                raise HTTPError(url, response.status, content, response, None)
-            if len(content) == 0:
-                return response, None
-            # XXX Work around for http://bugs.python.org/issue10038
-            if isinstance(content, six.binary_type):
-                content = content.decode('utf-8')
-            return response, json.loads(content)
+                self._process(url, response, b''.join(chunks))
         except HTTPError:
             raise
         except IOError:
             raise MailmanConnectionError('Could not connect to Mailman API')
+        return response, EntriesStream(self._read_stream(chunks))
+
+    def _read_stream(self, chunks):
+        try:
+            for chunk in chunks:
+                yield chunk
+        except IOError:
+            raise MailmanConnectionError('Could not connect to Mailman API')
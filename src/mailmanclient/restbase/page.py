@@ -13,13 +13,19 @@
 #
 # You should have received a copy of the GNU Lesser General Public License
 # along with mailmanclient.  If not, see <http://www.gnu.org/licenses/>.
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
 from six.moves.urllib_parse import urlencode, urlsplit, parse_qs, urlunsplit
 
 from mailmanclient.constants import DEFAULT_PAGE_ITEM_COUNT
+from mailmanclient.restbase.records import RecordFactory
 
 __metaclass__ = type
 __all__ = [
-    'Page'
+    'Page',
+    'iter_entries',
+    'iter_pages',
 ]
 
 
@@ -62,8 +68,9 @@ class Page:
         response, content = self._connection.call(self._build_url())
         self.total_size = content["total_size"]
         for entry in content.get('entries', []):
+            # Some entries, such as the subscription requests, have no link.
             instance = self._model(
-                self._connection, entry['self_link'], entry)
+                self._connection, entry.get('self_link'), entry)
             self._entries.append(instance)
 
     @property
@@ -90,3 +97,80 @@ class Page:
     @property
     def has_next(self):
         return self._count * self._page < self.total_size
+
+
+def iter_pages(connection, path, model, page_size=DEFAULT_PAGE_ITEM_COUNT,
+               read_ahead=0):
+    """Iterate over the pages of a collection.
+
+    Without read-ahead, a page is only requested when the previous one has
+    been iterated over.  With `read_ahead` set to N, the next N pages are
+    fetched by background threads while the caller processes the current
+    one.  The number of pages is known from the `total_size` of the first
+    one, so nothing is requested past the end of the collection.
+
+    :param connection: The connection to the REST API.
+    :param path: The path of the collection.
+    :param model: The class of the page entries.
+    :param page_size: The number of entries requested per page.
+    :type page_size: int.
+    :param read_ahead: The number of pages to fetch in advance.
+    :type read_ahead: int.
+    """
+    page = Page(connection, path, model, page_size)
+    if read_ahead <= 0:
+        while True:
+            yield page
+            if not page.has_next or len(page) == 0:
+                return
+            page = page.next
+    last = -(-page.total_size // page_size)
+    next_nr = 2
+    pending = deque()
+    executor = ThreadPoolExecutor(read_ahead)
+    try:
+        while True:
+            while next_nr <= last and len(pending) < read_ahead:
+                pending.append(executor.submit(
+                    Page, connection, path, model, page_size, next_nr))
+                next_nr += 1
+            yield page
+            if not pending:
+                return
+            page = pending.popleft().result()
+            if len(page) == 0:
+                # The collection shrunk in the meantime.
+                return
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=False)
+
+
+def iter_entries(connection, path, model, page_size=DEFAULT_PAGE_ITEM_COUNT,
+                 read_ahead=0, compact=False):
+    """Iterate over all the entries of a collection, one page at a time.
+
+    Pages are released once iterated over, so the memory used does not
+    depend on the size of the collection.  Entries added or removed during
+    the iteration may be missed or yielded twice.
+
+    With a `page_size` of None, the whole collection is requested at once
+    and streamed instead: entries are decoded as they are read from the
+    response, see :meth:`Connection.stream`.
+
+    With `compact` set, read-only :class:`Record` instances are yielded
+    instead of `model` instances, which use much less memory.
+
+    See :func:`iter_pages` for the other parameters.
+    """
+    if compact:
+        model = RecordFactory(model)
+    if page_size is None:
+        response, entries = connection.stream(path)
+        for entry in entries:
+            yield model(connection, entry.get('self_link'), entry)
+        return
+    for page in iter_pages(connection, path, model, page_size, read_ahead):
+        for entry in page:
+            yield entry
@@ -0,0 +1,163 @@
+# Copyright (C) 2017 The Free Software Foundation, Inc.
+#
+# This file is part of mailmanclient.
+#
+# mailmanclient is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation, version 3 of the License.
+#
+# mailmanclient is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
+# or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public
+# License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with mailmanclient.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Compact read-only records of REST objects, for bulk results."""
+
+import six
+
+__metaclass__ = type
+__all__ = [
+    'Record',
+    'RecordFactory',
+    'iter_records',
+    'record_type',
+]
+
+
+# Maximum number of distinct strings shared between the records built by one
+# RecordFactory.
+MAX_SHARED_VALUES = 1024
+
+_record_types = {}
+
+
+class Record:
+    """A read-only snapshot of a REST object's properties.
+
+    Records are built by :func:`iter_records` and have one slot per property
+    of the model, without the per-instance dictionaries, the raw JSON data
+    or the connection of a full REST object.  Use :meth:`to_object` to get
+    the full object when it needs to be changed.
+    """
+
+    __slots__ = ()
+    _fields = ()
+    _model = None
+
+    def __init__(self, data):
+        for name in self._fields:
+            object.__setattr__(self, name, data.get(name))
+
+    def __setattr__(self, name, value):
+        raise AttributeError(
+            "'{0}' object is read-only".format(self.__class__.__name__))
+
+    def __repr__(self):
+        return '<{0} {1}>'.format(self.__class__.__name__, ', '.join(
+            '{0}={1!r}'.format(name, getattr(self, name))
+            for name in self._fields))
+
+    def __eq__(self, other):
+        if not isinstance(other, self.__class__):
+            return NotImplemented
+        return self._astuple() == other._astuple()
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        if result is NotImplemented:
+            return result
+        return not result
+
+    def __hash__(self):
+        return hash(self._astuple())
+
+    def __reduce__(self):
+        # Record classes are created at runtime, so they are pickled through
+        # their model.
+        return _restore, (self._model, self._astuple())
+
+    def _astuple(self):
+        return tuple(getattr(self, name) for name in self._fields)
+
+    def _asdict(self):
+        """Return the properties as a dictionary."""
+        return dict(zip(self._fields, self._astuple()))
+
+    def to_object(self, connection):
+        """Get the full REST object this record is a snapshot of.
+
+        :param connection: The connection the object will use.
+        :return: An instance of the model, which loads its data lazily.
+        """
+        return self._model(connection, self.self_link)
+
+
+def record_type(model):
+    """Get the record class of a REST object class.
+
+    The record class is created on first use, with a slot for each of the
+    model's `_properties`.
+
+    :param model: A `RESTObject` subclass, such as `Member`.
+    """
+    try:
+        return _record_types[model]
+    except KeyError:
+        pass
+    fields = tuple(model._properties)
+    cls = type(str('{0}Record'.format(model.__name__)), (Record,), {
+        '__slots__': fields,
+        '_fields': fields,
+        '_model': model,
+        })
+    return _record_types.setdefault(model, cls)
+
+
+def _restore(model, values):
+    return record_type(model)(dict(zip(model._properties, values)))
+
+
+class RecordFactory:
+    """Build the records of a model from entry dictionaries.
+
+    Equal strings, such as the list id or the role of members, are shared
+    between the records built by a factory instead of being kept once per
+    record.  A factory is called like a model class, so it can be used
+    wherever one is expected, for instance by a `Page`.
+    """
+
+    def __init__(self, model):
+        """
+        :param model: A `RESTObject` subclass, such as `Member`.
+        """
+        self.record_class = record_type(model)
+        self._shared = {}
+
+    def _share(self, value):
+        if not isinstance(value, six.text_type):
+            return value
+        existing = self._shared.get(value)
+        if existing is not None:
+            return existing
+        if len(self._shared) < MAX_SHARED_VALUES:
+            self._shared[value] = value
+        return value
+
+    def __call__(self, connection, url, data):
+        return self.record_class(dict(
+            (name, self._share(data.get(name)))
+            for name in self.record_class._fields))
+
+
+def iter_records(model, entries):
+    """Turn entry dictionaries from the API into records.
+
+    :param model: The `RESTObject` subclass of the entries.
+    :param entries: An iterable of entry dictionaries.
+    """
+    factory = RecordFactory(model)
+    for entry in entries:
+        yield factory(None, entry.get('self_link'), entry)
@@ -0,0 +1,138 @@
+# Copyright (C) 2017 The Free Software Foundation, Inc.
+#
+# This file is part of mailmanclient.
+#
+# mailmanclient is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation, version 3 of the License.
+#
+# mailmanclient is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
+# or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public
+# License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with mailmanclient.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Incremental decoding of the JSON collections returned by the API."""
+
+import codecs
+import json
+
+__metaclass__ = type
+__all__ = [
+    'EntriesStream',
+]
+
+
+WHITESPACE = ' \t\n\r'
+
+
+class EntriesStream:
+    """Decode a JSON collection from chunks of bytes, one entry at a time.
+
+    The REST API returns collections as a JSON object holding the `entries`
+    array and a few other members such as `total_size`.  Iterating over this
+    stream yields the entries as soon as they are decoded, so only the
+    current chunk and entry are held in memory.  The other members of the
+    object are stored in the `fields` dictionary as they are decoded; the
+    members which come after the `entries` array are only available once the
+    iteration is over.
+
+    The stream can only be iterated over once.
+    """
+
+    def __init__(self, chunks, encoding='utf-8'):
+        """
+        :param chunks: An iterable of bytes, such as the body of a streamed
+            response.
+        :param encoding: The encoding of the body.
+        """
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder(encoding)()
+        self._json = json.JSONDecoder()
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+        self._started = False
+        self.fields = {}
+
+    def _fill(self):
+        """Decode the next chunk into the buffer.
+
+        :return: False if the end of the data was reached.
+        """
+        if self._eof:
+            return False
+        try:
+            chunk = next(self._chunks)
+        except StopIteration:
+            self._eof = True
+            text = self._decoder.decode(b'', final=True)
+        else:
+            text = self._decoder.decode(chunk)
+        # Drop what has already been decoded.
+        self._buffer = self._buffer[self._pos:] + text
+        self._pos = 0
+        return True
+
+    def _peek(self):
+        """Skip whitespace and return the next character."""
+        while True:
+            while (self._pos < len(self._buffer) and
+                    self._buffer[self._pos] in WHITESPACE):
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                raise ValueError('Unexpected end of JSON data')
+
+    def _expect(self, *chars):
+        """Consume the next non-whitespace character, one of `chars`."""
+        char = self._peek()
+        if char not in chars:
+            raise ValueError('Expecting {0} at position {1}: {2!r}'.format(
+                ' or '.join(repr(c) for c in chars), self._pos, char))
+        self._pos += 1
+        return char
+
+    def _value(self):
+        """Decode the next JSON value."""
+        self._peek()
+        while True:
+            try:
+                value, end = self._json.raw_decode(self._buffer, self._pos)
+            except ValueError:
+                if not self._fill():
+                    raise
+                continue
+            # A number at the end of the buffer may continue in the next
+            # chunk.
+            if end == len(self._buffer) and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    def __iter__(self):
+        if self._started:
+            raise RuntimeError('The stream was already iterated over')
+        self._started = True
+        self._expect('{')
+        if self._peek() == '}':
+            return
+        while True:
+            key = self._value()
+            self._expect(':')
+            if key == 'entries':
+                self._expect('[')
+                if self._peek() == ']':
+                    self._pos += 1
+                else:
+                    while True:
+                        yield self._value()
+                        if self._expect(',', ']') == ']':
+                            break
+            else:
+                self.fields[key] = self._value()
+            if self._expect(',', '}') == '}':
+                return
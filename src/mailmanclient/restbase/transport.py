@@ -0,0 +1,394 @@
+# Copyright (C) 2017 The Free Software Foundation, Inc.
+#
+# This file is part of mailmanclient.
+#
+# mailmanclient is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation, version 3 of the License.
+#
+# mailmanclient is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
+# or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public
+# License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with mailmanclient.  If not, see <http://www.gnu.org/licenses/>.
+
+"""HTTP transports used by the connection to talk to the REST API."""
+
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from functools import partial
+from io import BytesIO
+from itertools import chain
+from six.moves import http_client
+from six.moves.urllib_parse import unquote, urlsplit
+
+import six
+from httplib2 import Http, Response
+
+from mailmanclient.constants import (
+    DEFAULT_POOL_IDLE_TIMEOUT, DEFAULT_POOL_SIZE, DEFAULT_STREAM_CHUNK_SIZE)
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+except ImportError:
+    requests = None
+
+__metaclass__ = type
+__all__ = [
+    'HttpPool',
+    'HttpTransport',
+    'RequestsTransport',
+    'Transport',
+    'WSGITransport',
+]
+
+
+class Transport:
+    """Base class for the transports a `Connection` sends its requests with.
+
+    A transport takes a complete HTTP request and returns the response status,
+    headers and body.  Network errors must be raised as `IOError` (or a
+    subclass), which the connection turns into a `MailmanConnectionError`.
+    """
+
+    def request(self, url, method='GET', body=None, headers=None):
+        """Send a request.
+
+        :param url: The absolute URL to request.
+        :type url: str
+        :param method: The HTTP method.
+        :type method: str
+        :param body: The encoded request body, if any.
+        :type body: str
+        :param headers: The request headers.
+        :type headers: dict
+        :return: A `(response, content)` tuple where `response` is an
+            `httplib2.Response` holding the status and the (lowercased)
+            headers, and `content` is the body as bytes.
+        """
+        raise NotImplementedError
+
+    def stream(self, url, method='GET', body=None, headers=None):
+        """Send a request without reading the whole response body.
+
+        The parameters are the same as `request()`'s.  The default
+        implementation reads the whole body, subclasses stream it from the
+        socket.
+
+        :return: A `(response, chunks)` tuple where `chunks` is an iterator
+            over the body as bytes.  It must be exhausted or closed to
+            release the connection.
+        """
+        response, content = self.request(url, method, body, headers)
+        return response, iter([content])
+
+    def close(self):
+        """Release the resources held by the transport."""
+
+
+def _closing(chunks, close):
+    """Iterate over the chunks of a body, then call `close`."""
+    try:
+        for chunk in chunks:
+            yield chunk
+    finally:
+        close()
+
+
+class HttpPool:
+    """A thread-safe pool of persistent HTTP connections.
+
+    Each pooled `Http` object keeps its socket open between requests, so
+    subsequent calls to the same host skip the TCP (and TLS) handshake.  A
+    pooled object is only ever used by one thread at a time: when all the
+    connections to a host are checked out, further checkouts wait until one
+    is returned.
+    """
+
+    def __init__(self, max_size=DEFAULT_POOL_SIZE,
+                 idle_timeout=DEFAULT_POOL_IDLE_TIMEOUT, timeout=None):
+        """
+        :param max_size: The maximum number of connections per host.
+        :type max_size: int.
+        :param idle_timeout: Number of seconds after which an unused
+            connection is closed, or None to keep idle connections forever.
+        :type idle_timeout: int.
+        :param timeout: The socket timeout passed to `Http`.
+        :type timeout: int.
+        """
+        if max_size < 1:
+            raise ValueError('`max_size` must be at least 1')
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self._lock = threading.Condition()
+        # host -> list of (Http, time it was returned), most recent last.
+        self._idle = {}
+        # host -> number of connections currently checked out.
+        self._in_use = {}
+
+    def _host(self, url):
+        parts = urlsplit(url)
+        return '{0}://{1}'.format(parts.scheme, parts.netloc)
+
+    def _close(self, http):
+        for conn in list(http.connections.values()):
+            conn.close()
+        http.connections.clear()
+
+    def _evict(self, now):
+        # Must be called with the lock held.
+        if self.idle_timeout is None:
+            return
+        for host, idle in self._idle.items():
+            while idle and now - idle[0][1] > self.idle_timeout:
+                http, last_used = idle.pop(0)
+                self._close(http)
+
+    def checkout(self, url):
+        """Get a connection to the host of `url`, waiting if none is free.
+
+        :param url: The URL that will be requested.
+        :type url: str.
+        :return: The `Http` object, which must be given back with `checkin()`.
+        """
+        host = self._host(url)
+        with self._lock:
+            while True:
+                self._evict(time.time())
+                idle = self._idle.get(host)
+                if idle:
+                    http = idle.pop()[0]
+                    break
+                if self._in_use.get(host, 0) < self.max_size:
+                    http = Http(timeout=self.timeout)
+                    break
+                self._lock.wait()
+            self._in_use[host] = self._in_use.get(host, 0) + 1
+            return http
+
+    def checkin(self, url, http, discard=False):
+        """Give a connection back to the pool.
+
+        :param url: The URL that was requested.
+        :type url: str.
+        :param http: The `Http` object obtained from `checkout()`.
+        :param discard: Close the connection instead of keeping it, for
+            instance because an error left it in an unknown state.
+        :type discard: bool.
+        """
+        host = self._host(url)
+        with self._lock:
+            self._in_use[host] -= 1
+            if discard:
+                self._close(http)
+            else:
+                self._idle.setdefault(host, []).append((http, time.time()))
+            # The waiters of all the hosts share the condition: wake them
+            # all so that those of this host are among them.
+            self._lock.notify_all()
+
+    @contextmanager
+    def connection(self, url):
+        """Context manager around `checkout()` and `checkin()`.
+
+        The connection is always given back, and discarded when the block
+        is left by any exception, including `KeyboardInterrupt` or
+        `GeneratorExit`.
+        """
+        http = self.checkout(url)
+        discard = True
+        try:
+            yield http
+            discard = False
+        finally:
+            self.checkin(url, http, discard=discard)
+
+    def clear(self):
+        """Close all the idle connections."""
+        with self._lock:
+            for idle in self._idle.values():
+                for http, last_used in idle:
+                    self._close(http)
+            self._idle.clear()
+
+
+class HttpTransport(Transport):
+    """Transport using httplib2 over a pool of persistent connections."""
+
+    def __init__(self, pool_size=DEFAULT_POOL_SIZE,
+                 idle_timeout=DEFAULT_POOL_IDLE_TIMEOUT, timeout=None):
+        """
+        :param pool_size: The maximum number of connections per host.
+        :param idle_timeout: Number of seconds after which an unused
+            connection is closed.
+        :param timeout: The socket timeout, in seconds.
+        """
+        self.pool = HttpPool(pool_size, idle_timeout, timeout)
+
+    def request(self, url, method='GET', body=None, headers=None):
+        with self.pool.connection(url) as http:
+            return http.request(url, method, body, headers)
+
+    def stream(self, url, method='GET', body=None, headers=None):
+        # httplib2 always reads the whole body, so streamed responses go
+        # through a dedicated connection, which is busy until the body has
+        # been read and is therefore not pooled.
+        parts = urlsplit(url)
+        if parts.scheme == 'https':
+            connection_class = http_client.HTTPSConnection
+        else:
+            connection_class = http_client.HTTPConnection
+        conn = connection_class(parts.netloc, timeout=self.pool.timeout)
+        path = parts.path or '/'
+        if parts.query:
+            path += '?' + parts.query
+        try:
+            conn.request(method, path, body, headers or {})
+            result = conn.getresponse()
+        except Exception:
+            conn.close()
+            raise
+        info = dict(result.getheaders())
+        info['status'] = result.status
+        response = Response(info)
+        response.reason = result.reason
+        chunks = iter(partial(result.read, DEFAULT_STREAM_CHUNK_SIZE), b'')
+        return response, _closing(chunks, conn.close)
+
+    def close(self):
+        self.pool.clear()
+
+
+class RequestsTransport(Transport):
+    """Transport using a `requests` session and its urllib3 pool.
+
+    This requires the `requests` package to be installed.
+    """
+
+    def __init__(self, pool_size=DEFAULT_POOL_SIZE, timeout=None,
+                 session=None):
+        """
+        :param pool_size: The maximum number of connections per host.
+        :param timeout: The socket timeout, in seconds.
+        :param session: An existing `requests.Session` to use.
+        """
+        if requests is None:
+            raise ImportError(
+                'The requests package is required by RequestsTransport')
+        self.timeout = timeout
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=1, pool_maxsize=pool_size, pool_block=True)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+        self.session = session
+
+    def request(self, url, method='GET', body=None, headers=None):
+        # requests.RequestException is a subclass of IOError.
+        result = self.session.request(
+            method, url, data=body, headers=headers, timeout=self.timeout,
+            allow_redirects=False)
+        info = dict(result.headers)
+        info['status'] = result.status_code
+        response = Response(info)
+        response.reason = result.reason
+        return response, result.content
+
+    def stream(self, url, method='GET', body=None, headers=None):
+        result = self.session.request(
+            method, url, data=body, headers=headers, timeout=self.timeout,
+            allow_redirects=False, stream=True)
+        info = dict(result.headers)
+        info['status'] = result.status_code
+        response = Response(info)
+        response.reason = result.reason
+        chunks = result.iter_content(DEFAULT_STREAM_CHUNK_SIZE)
+        return response, _closing(chunks, result.close)
+
+    def close(self):
+        self.session.close()
+
+
+class WSGITransport(Transport):
+    """Transport dispatching requests to a WSGI application in-process.
+
+    No socket is opened: the request is turned into a WSGI environment and
+    handed directly to the application, for instance Mailman's REST
+    application or a local fake of it.
+    """
+
+    def __init__(self, app):
+        """
+        :param app: The WSGI application to call.
+        """
+        self.app = app
+
+    def _environ(self, url, method, body, headers):
+        parts = urlsplit(url)
+        if body is None:
+            body = b''
+        elif isinstance(body, six.text_type):
+            body = body.encode('utf-8')
+        port = parts.port or (443 if parts.scheme == 'https' else 80)
+        environ = {
+            'REQUEST_METHOD': method,
+            'SCRIPT_NAME': '',
+            'PATH_INFO': unquote(parts.path),
+            'QUERY_STRING': parts.query,
+            'SERVER_NAME': parts.hostname,
+            'SERVER_PORT': str(port),
+            'SERVER_PROTOCOL': 'HTTP/1.1',
+            'CONTENT_LENGTH': str(len(body)),
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': parts.scheme,
+            'wsgi.input': BytesIO(body),
+            'wsgi.errors': sys.stderr,
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': False,
+            'wsgi.run_once': False,
+            }
+        for name, value in (headers or {}).items():
+            key = name.upper().replace('-', '_')
+            if key == 'CONTENT_TYPE':
+                environ[key] = value
+            elif key != 'CONTENT_LENGTH':
+                environ['HTTP_' + key] = value
+        environ['HTTP_HOST'] = parts.netloc
+        return environ
+
+    def stream(self, url, method='GET', body=None, headers=None):
+        environ = self._environ(url, method, body, headers)
+        started = {}
+        written = []
+
+        def start_response(status, response_headers, exc_info=None):
+            if exc_info is not None and started:
+                six.reraise(*exc_info)
+            started['status'] = status
+            started['headers'] = response_headers
+            return written.append
+
+        result = self.app(environ, start_response)
+        chunks = iter(result)
+        if not started:
+            # The application may only start the response when iterated.
+            first = next(chunks, b'')
+            chunks = chain([first], chunks)
+        status, reason = started['status'].split(' ', 1)
+        info = dict(started['headers'])
+        info['status'] = status
+        response = Response(info)
+        response.reason = reason
+        return response, _closing(
+            chain(written, chunks), getattr(result, 'close', lambda: None))
+
+    def request(self, url, method='GET', body=None, headers=None):
+        response, chunks = self.stream(url, method, body, headers)
+        return response, b''.join(chunks)
@@ -30,17 +30,26 @@ class Addresses(RESTList):
         self._factory = lambda data: Address(
             self._connection, data['self_link'], data)
 
+    @staticmethod
+    def _index_key(data):
+        return data['email'].lower()
+
     def find_by_email(self, email):
-        for address in self:
-            if address.email == email:
-                return address
-        return None
+        """Get an address by email, compared case-insensitively.
+
+        :return: The :class:`Address`, or None if there is none.
+        """
+        data = self._find(email.lower())
+        if data is None:
+            return None
+        return self._factory(data)
 
     def remove(self, email):
         address = self.find_by_email(email)
         if address is not None:
             address.delete()
-            self._reset_cache()
+            self._cache_remove(
+                lambda data: data['email'].lower() == email.lower())
         else:
             raise ValueError('The address {} does not exist'.format(email))
 
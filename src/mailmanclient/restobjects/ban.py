@@ -13,18 +13,37 @@
 #
 # You should have received a copy of the GNU Lesser General Public License
 # along with mailmanclient.  If not, see <http://www.gnu.org/licenses/>.
+import re
+
 from six.moves.urllib_error import HTTPError
+from six.moves.urllib_parse import quote
 
+from mailmanclient.constants import DEFAULT_MAX_CONCURRENCY
 from mailmanclient.restobjects.mailinglist import MailingList
 from mailmanclient.restbase.base import RESTList, RESTObject
+from mailmanclient.restbase.bulk import bulk_apply
 
 __metaclass__ = type
 __all__ = [
     'Bans',
-    'BannedAddress'
+    'BannedAddress',
+    'compile_ban_patterns',
 ]
 
 
+def compile_ban_patterns(entries):
+    """Compile the pattern bans among ban entries.
+
+    Like in Mailman, a ban starting with a caret (^) is a regular
+    expression, and bans the addresses it matches case-insensitively.
+
+    :param entries: The ban entries, as the API returns them.
+    :return: `(entry, regex)` pairs of the pattern bans.
+    """
+    return [(data, re.compile(data['email'], re.IGNORECASE))
+            for data in entries if data['email'].startswith('^')]
+
+
 class Bans(RESTList):
     """
     The list of banned addresses from a mailing-list or from the whole site.
@@ -47,17 +66,43 @@ class Bans(RESTList):
         else:
             return '<Bans on "{0}">'.format(self._mlist.list_id)
 
+    # The compiled regular expressions of the pattern bans, built from the
+    # cached entries on the first check.
+    _patterns = None
+
+    @staticmethod
+    def _index_key(data):
+        return data['email'].lower()
+
+    def _cache_updated(self):
+        super(Bans, self)._cache_updated()
+        self._patterns = None
+
+    def _cache_changed(self):
+        super(Bans, self)._cache_changed()
+        self._patterns = None
+
+    def _is_banned(self, email):
+        # Like Mailman, an address is banned if it is banned by itself or if
+        # it matches a pattern ban (an entry starting with a caret).
+        if self._find(email.lower()) is not None:
+            return True
+        patterns = self._patterns
+        if patterns is None:
+            patterns = self._derive(compile_ban_patterns, '_patterns')
+        return any(regex.match(email) for data, regex in patterns)
+
     def __contains__(self, item):
         # Accept email addresses and BannedAddress restobjects
         if isinstance(item, BannedAddress):
             item = item.email
         if self._rest_data is not None:
-            return item in [data['email'] for data in self._rest_data]
+            return self._is_banned(item)
         else:
             # Avoid getting the whole list just to check membership
             try:
                 response, content = self._connection.call(
-                    '{}/{}'.format(self._url, item))
+                    '{}/{}'.format(self._url, quote(item, safe='@')))
             except HTTPError as e:
                 if e.code == 404:
                     return False
@@ -66,25 +111,114 @@ class Bans(RESTList):
             else:
                 return True
 
+    def contains_many(self, emails):
+        """Check many email addresses at once.
+
+        The banned addresses are loaded with a single request, if they are
+        not already.  The addresses are compared case-insensitively, and
+        the addresses matching a pattern ban are banned too.
+
+        :param emails: The email addresses to check.
+        :return: The set of the given addresses which are banned.
+        """
+        return set(email for email in emails if self._is_banned(email))
+
+    def _new_ban(self, email, self_link):
+        data = {'email': email, 'self_link': self_link}
+        if self._mlist is not None:
+            data['list_id'] = self._mlist.list_id
+        return data
+
     def add(self, email):
         response, content = self._connection.call(self._url, dict(email=email))
-        self._reset_cache()
+        self._cache_insert([self._new_ban(email, response['location'])])
         return BannedAddress(self._connection, response['location'])
 
+    def add_many(self, emails, max_workers=DEFAULT_MAX_CONCURRENCY,
+                 progress=None):
+        """Ban many email addresses concurrently.
+
+        Like with :meth:`add`, an address starting with a caret (^) is a
+        regular expression banning all the addresses it matches.  The
+        cached ban list, if loaded, is updated with the new bans instead
+        of being reloaded.
+
+        :param emails: The email addresses or patterns to ban.
+        :param max_workers: The maximum number of simultaneous requests.
+        :param progress: A function called with each address and its
+            :class:`BannedAddress`, or the exception raised, as soon as it
+            is banned.
+        :return: A :class:`BulkResult` keyed by address, with the
+            :class:`BannedAddress` of the succeeded ones.  Addresses which are
+            already banned fail with a 400 `HTTPError`.
+        """
+        emails = list(emails)
+
+        def ban(email):
+            response, content = self._connection.call(
+                self._url, dict(email=email))
+            return BannedAddress(self._connection, response['location'])
+
+        result = bulk_apply(ban, emails, max_workers, progress=progress)
+        self._cache_insert(
+            self._new_ban(email, ban._url) for email, ban in result.succeeded)
+        return result
+
     def find_by_email(self, email):
-        for ban in self:
-            if ban.email == email:
-                return ban
-        return None
+        data = self._find(email.lower())
+        if data is None:
+            return None
+        return self._factory(data)
 
     def remove(self, email):
         ban = self.find_by_email(email)
         if ban is not None:
             ban.delete()
-            self._reset_cache()
+            self._cache_remove(
+                lambda data: data['email'].lower() == email.lower())
         else:
             raise ValueError('The address {} is not banned'.format(email))
 
+    def remove_many(self, emails=(), pattern=None,
+                    max_workers=DEFAULT_MAX_CONCURRENCY, progress=None):
+        """Lift many bans concurrently.
+
+        The cached ban list, if loaded, is updated instead of being
+        reloaded.
+
+        :param emails: The banned email addresses or patterns.
+        :param pattern: A regular expression: the banned addresses it
+            matches are also removed.  The ban list is loaded to find them.
+        :param max_workers: The maximum number of simultaneous requests.
+        :param progress: A function called with each address and None, or
+            the exception raised, as soon as its ban is lifted.
+        :return: A :class:`BulkResult` keyed by address.  Addresses which are
+            not banned fail with a 404 `HTTPError`.
+        """
+        emails = list(emails)
+        if pattern is not None:
+            regex = re.compile(pattern, re.IGNORECASE)
+            seen = set(email.lower() for email in emails)
+            emails.extend(data['email'] for data in self.rest_data
+                          if regex.search(data['email'])
+                          and data['email'].lower() not in seen)
+        links = {}
+        if self._rest_data is not None:
+            for email in emails:
+                data = self._find(email.lower())
+                if data is not None:
+                    links[email] = data['self_link']
+
+        def unban(email):
+            url = links.get(email, '{0}/{1}'.format(
+                self._url, quote(email, safe='@')))
+            self._connection.call(url, method='DELETE')
+
+        result = bulk_apply(unban, emails, max_workers, progress=progress)
+        removed = set(email.lower() for email, none in result.succeeded)
+        self._cache_remove(lambda data: data['email'].lower() in removed)
+        return result
+
 
 class BannedAddress(RESTObject):
 
@@ -13,15 +13,122 @@
 #
 # You should have received a copy of the GNU Lesser General Public License
 # along with mailmanclient.  If not, see <http://www.gnu.org/licenses/>.
+import re
+from bisect import bisect_left
+
 from mailmanclient.restbase.base import RESTList, RESTObject
+from mailmanclient.restbase.bulk import BulkResult
 
 __metaclass__ = type
 __all__ = [
     'HeaderMatch',
-    'HeaderMatches'
+    'HeaderMatches',
+    'HeaderMatchesPlan',
 ]
 
 
+RULE_FIELDS = ('header', 'pattern', 'action', 'tag')
+
+
+def _rule(rule):
+    # Turn a rule into the dictionary stored by Mailman.
+    if not isinstance(rule, dict):
+        rule = dict(zip(RULE_FIELDS, rule))
+    return dict(header=rule['header'].lower(), pattern=rule['pattern'],
+                action=rule.get('action'), tag=rule.get('tag'))
+
+
+def _key(rule):
+    return tuple(rule[field] for field in RULE_FIELDS)
+
+
+def _check_patterns(rules):
+    """Check the patterns of header match rules before sending them.
+
+    :param rules: The rules, see :meth:`HeaderMatches.sync`.
+    :return: The rules as dictionaries with a lowercase `header`, a
+        `pattern`, an `action` and a `tag`, which may be None.
+    :raises ValueError: if a pattern is not a valid regular expression.
+    """
+    rules = [_rule(rule) for rule in rules]
+    invalid = []
+    for rule in rules:
+        try:
+            re.compile(rule['pattern'])
+        except re.error as error:
+            invalid.append('{0}: {1}'.format(rule['pattern'], error))
+    if invalid:
+        raise ValueError(
+            'Invalid header match patterns: {0}'.format('; '.join(invalid)))
+    return rules
+
+
+def _increasing(values):
+    """Return a longest increasing subsequence of `values`, as a set."""
+    # tails[k] is the index of the smallest value ending an increasing
+    # subsequence of length k + 1, and tail_values[k] this value.
+    tails, tail_values, previous = [], [], []
+    for index, value in enumerate(values):
+        length = bisect_left(tail_values, value)
+        previous.append(tails[length - 1] if length > 0 else None)
+        if length == len(tails):
+            tails.append(index)
+            tail_values.append(value)
+        else:
+            tails[length] = index
+            tail_values[length] = value
+    result = set()
+    index = tails[-1] if tails else None
+    while index is not None:
+        result.add(values[index])
+        index = previous[index]
+    return result
+
+
+class HeaderMatchesPlan:
+    """The changes turning the header matches of a list into new rules.
+
+    The rules are compared by content: the current rules which are not
+    desired are deleted, the missing ones are appended, then the rules
+    which are not in the desired order are moved.
+
+    :ivar delete: The positions of the rules to delete, last first.
+    :ivar create: The rules to append, in order, as dictionaries.
+    :ivar move: `(position, new_position)` pairs of the rules to move, in
+        order, once the deletions and creations are done.
+    :ivar deleted: The :class:`BulkResult` of the deletions, keyed by
+        position, once the plan has been applied.  None before.
+    :ivar created: Likewise for the creations, keyed by the index of the
+        rule in `create`.
+    :ivar moved: Likewise for the moves, keyed by `(position,
+        new_position)` pair.
+    """
+
+    def __init__(self):
+        self.delete = []
+        self.create = []
+        self.move = []
+        self.deleted = None
+        self.created = None
+        self.moved = None
+
+    def __repr__(self):
+        return '<HeaderMatchesPlan: {0} to delete, {1} to create, ' \
+            '{2} to move>'.format(
+                len(self.delete), len(self.create), len(self.move))
+
+    @property
+    def empty(self):
+        """True if the header matches are already the desired rules."""
+        return not (self.delete or self.create or self.move)
+
+    @property
+    def ok(self):
+        """True if the plan was applied without any failure."""
+        return all(result is not None and result.ok for result in (
+            self.deleted, self.created, self.moved))
+
+
 class HeaderMatches(RESTList):
     """
     The list of header matches for a mailing-list.
@@ -53,15 +160,162 @@ class HeaderMatches(RESTList):
         data = dict(header=header, pattern=pattern)
         if action is not None:
             data['action'] = action
-        response, content = self._connection.call(self._url, data)
-        self._reset_cache()
+        response, content = self._connection.call(self._url, dict(data))
+        if self._rest_data is not None:
+            # Mailman stores the header in lower case, and appends the new
+            # header match to the end.
+            entry = dict(data, header=header.lower(),
+                         position=len(self._rest_data),
+                         self_link=response['location'])
+            self._cache_insert([entry])
         return HeaderMatch(self._connection, response['location'])
 
+    def _cache_changed(self):
+        # Mailman identifies the header matches by position: after a
+        # removal, the following cached entries move up, and so do their
+        # links.
+        for position, entry in enumerate(self._rest_data):
+            if entry.get('position') != position:
+                entry['position'] = position
+                entry['self_link'] = '{0}/{1}'.format(
+                    entry['self_link'].rsplit('/', 1)[0], position)
+        super(HeaderMatches, self)._cache_changed()
+
+    def sync(self, rules, dry_run=False):
+        """Turn the header matches into the given rules, in order.
+
+        All the patterns are checked before any request is sent.  The
+        rules are matched by header, pattern, action and tag: the current
+        rules which are not desired are deleted, the missing ones are
+        appended, and the fewest rules possible are then moved to their
+        position.  The rules which are only out of place are moved, not
+        created again.
+
+        The positions change with each request, so the requests are sent
+        one at a time.  The operation is not atomic: it stops at the first
+        failure, leaving the rules partly synchronized, as reported by the
+        plan.  Calling `sync()` again resumes it.
+
+        :param rules: The desired rules.  Each rule is a dictionary with
+            the `header`, the `pattern`, and optionally the `action` and the
+            `tag`, or a `(header, pattern)`, `(header, pattern, action)` or
+            `(header, pattern, action, tag)` tuple.
+        :param dry_run: Only compute the changes, without applying them.
+        :type dry_run: bool
+        :return: The :class:`HeaderMatchesPlan`, with the results of the
+            changes unless this is a dry run.
+        :raises ValueError: if a pattern is not a valid regular expression.
+        """
+        rules = _check_patterns(rules)
+        current = [_rule(entry) for entry in self.rest_data]
+        # Match each desired rule with the first unused current rule with
+        # the same content.
+        unused = {}
+        for position, rule in enumerate(current):
+            unused.setdefault(_key(rule), []).append(position)
+        # The index in `rules` of each kept current rule, by position.
+        kept = {}
+        plan = HeaderMatchesPlan()
+        for index, rule in enumerate(rules):
+            positions = unused.get(_key(rule))
+            if positions:
+                kept[positions.pop(0)] = index
+            else:
+                plan.create.append(rule)
+        plan.delete = [position
+                       for position in range(len(current) - 1, -1, -1)
+                       if position not in kept]
+        # The order of the rules once the extra ones are deleted and the
+        # missing ones appended, as indices in `rules`.
+        order = [kept[position] for position in sorted(kept)]
+        created = set(range(len(rules))) - set(kept.values())
+        order.extend(sorted(created))
+        # Move the rules out of the longest run already in order, each one
+        # right after its predecessor.
+        in_order = _increasing(order)
+        for index in range(len(rules)):
+            if index in in_order:
+                continue
+            position = order.index(index)
+            order.pop(position)
+            new_position = order.index(index - 1) + 1 if index > 0 else 0
+            order.insert(new_position, index)
+            if new_position != position:
+                plan.move.append((position, new_position))
+        if not dry_run:
+            self._apply_plan(plan)
+        return plan
+
+    def _apply_plan(self, plan):
+        plan.deleted = BulkResult()
+        plan.created = BulkResult()
+        plan.moved = BulkResult()
+        try:
+            for position in plan.delete:
+                try:
+                    self._connection.call(
+                        '{0}/{1}'.format(self._url, position),
+                        method='DELETE')
+                except Exception as error:
+                    plan.deleted.failed.append((position, error))
+                    return
+                plan.deleted.succeeded.append((position, None))
+            if not self._append_rules(plan.create, plan.created):
+                return
+            for move in plan.move:
+                position, new_position = move
+                try:
+                    self._connection.call(
+                        '{0}/{1}'.format(self._url, position),
+                        dict(position=new_position), method='PATCH')
+                except Exception as error:
+                    plan.moved.failed.append((move, error))
+                    return
+                plan.moved.succeeded.append((move, None))
+        finally:
+            if not plan.empty:
+                self._reset_cache()
+
+    def replace_all(self, rules):
+        """Replace all the header matches with the given rules.
+
+        Unlike :meth:`sync`, the current rules are deleted at once, without
+        being compared with the new ones, which are then appended in order.
+
+        :param rules: The new rules, see :meth:`sync`.
+        :return: A :class:`BulkResult` of the creations, keyed by the index
+            of the rule.  The creations stop at the first failure.
+        :raises ValueError: if a pattern is not a valid regular expression.
+        """
+        rules = _check_patterns(rules)
+        self.clear()
+        result = BulkResult()
+        self._append_rules(rules, result)
+        self._reset_cache()
+        return result
+
+    def _append_rules(self, rules, result):
+        """Append rules in order, until the first failure.
+
+        :return: True if all the rules were appended.
+        """
+        for index, rule in enumerate(rules):
+            data = dict((key, value) for key, value in rule.items()
+                        if value is not None)
+            try:
+                response, content = self._connection.call(self._url, data)
+            except Exception as error:
+                result.failed.append((index, error))
+                return False
+            result.succeeded.append((index, response['location']))
+        return True
+
 
 class HeaderMatch(RESTObject):
 
-    _properties = ('header', 'pattern', 'position', 'action', 'self_link')
-    _writable_properties = ('header', 'pattern', 'position', 'action')
+    _properties = ('header', 'pattern', 'position', 'action', 'tag',
+                   'self_link')
+    _writable_properties = ('header', 'pattern', 'position', 'action', 'tag')
 
     def __repr__(self):
         return '<HeaderMatch on "{0}">'.format(self.header)
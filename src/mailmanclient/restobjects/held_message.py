@@ -13,16 +13,37 @@
 #
 # You should have received a copy of the GNU Lesser General Public License
 # along with mailmanclient.  If not, see <http://www.gnu.org/licenses/>.
+import threading
+from weakref import WeakKeyDictionary
+
 import six
 
+from mailmanclient.constants import DEFAULT_HELD_BODY_CACHE_SIZE
 from mailmanclient.restbase.base import RESTObject
+from mailmanclient.restbase.cache import MemoryBackend
 
 __metaclass__ = type
 __all__ = [
-    'HeldMessage'
+    'HeldMessage',
+    'HeldMessageSummary',
 ]
 
 
+# The bodies of the held messages per connection.  They are only shared
+# by the summaries using the same credentials.
+_body_caches = WeakKeyDictionary()
+_body_caches_lock = threading.Lock()
+
+
+def _body_cache(connection):
+    with _body_caches_lock:
+        cache = _body_caches.get(connection)
+        if cache is None:
+            cache = _body_caches[connection] = MemoryBackend(
+                DEFAULT_HELD_BODY_CACHE_SIZE)
+        return cache
+
+
 class HeldMessage(RESTObject):
 
     _properties = ('hold_date', 'message_id', 'msg', 'reason', 'request_id',
@@ -60,3 +81,48 @@ class HeldMessage(RESTObject):
     def accept(self):
         """Shortcut for moderate."""
         return self.moderate('accept')
+
+
+class HeldMessageSummary(HeldMessage):
+    """A held message without its body.
+
+    Only the lightweight properties are kept, the raw `msg` is dropped from
+    the REST data.  It is fetched again on first access and kept in
+    `body_cache`, an LRU cache of message bodies shared by the summaries
+    of the same connection.
+
+    This only saves memory: the API has no summary view, so listing the
+    held messages still transfers their full bodies.
+    """
+
+    _properties = ('hold_date', 'message_id', 'reason', 'request_id',
+                   'self_link', 'sender', 'subject', 'type')
+
+    @property
+    def body_cache(self):
+        return _body_cache(self._connection)
+
+    def __init__(self, connection, url, data=None):
+        if data is not None:
+            data = self._summarize(data)
+        super(HeldMessageSummary, self).__init__(connection, url, data)
+
+    def _summarize(self, data):
+        return dict((key, value) for key, value in data.items()
+                    if key in self._property_set or key == 'http_etag')
+
+    def _parse(self, content):
+        # The whole message was fetched anyway, keep its body.
+        if 'msg' in content:
+            self.body_cache.set(self._url, content['msg'])
+        return self._summarize(content)
+
+    @property
+    def msg(self):
+        """The raw held message, fetched on first access."""
+        body = self.body_cache.get(self._url)
+        if body is None:
+            response, content = self._connection.call(self._url)
+            body = content['msg']
+            self.body_cache.set(self._url, body)
+        return body
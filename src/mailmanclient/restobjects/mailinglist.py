@@ -18,20 +18,83 @@ from operator import itemgetter
 from six.moves.urllib_error import HTTPError
 from six.moves.urllib_parse import urlencode
 
+import six
+
 from mailmanclient.restobjects.header_match import HeaderMatches
 from mailmanclient.restobjects.archivers import ListArchivers
 from mailmanclient.restobjects.member import Member
 from mailmanclient.restobjects.settings import Settings
-from mailmanclient.restobjects.held_message import HeldMessage
+from mailmanclient.restobjects.held_message import (
+    HeldMessage, HeldMessageSummary)
 from mailmanclient.restbase.base import RESTObject
-from mailmanclient.restbase.page import Page
+from mailmanclient.restbase.bulk import Pending, bulk_apply
+from mailmanclient.restbase.columns import load_columns
+from mailmanclient.constants import (
+    DEFAULT_MAX_CONCURRENCY, DEFAULT_PAGE_ITEM_COUNT)
+from mailmanclient.restbase.page import Page, iter_entries
 
 __metaclass__ = type
 __all__ = [
-    'MailingList'
+    'MailingList',
+    'SyncPlan',
 ]
 
 
+# The member properties which sync_members() keeps up to date.
+SYNC_PROPERTIES = ('delivery_mode', 'moderation_action')
+
+
+def _subscription_request(entry):
+    return dict(email=entry['email'],
+                token=entry['token'],
+                token_owner=entry['token_owner'],
+                list_id=entry['list_id'],
+                request_date=entry['when'])
+
+
+class SyncPlan:
+    """The changes synchronizing a roster with a desired membership.
+
+    :ivar subscribe: The :meth:`MailingList.subscribe` arguments of the
+        addresses to subscribe, as dictionaries.
+    :ivar unsubscribe: The email addresses to unsubscribe.
+    :ivar update: `(email, changes)` pairs of the members whose properties
+        must change, `changes` being a dictionary of the new values.
+    :ivar subscribed: The :class:`BulkResult` of the subscriptions once the
+        plan has been applied, None before.
+    :ivar unsubscribed: Likewise for the unsubscriptions.
+    :ivar updated: Likewise for the updates, including the properties of
+        the new members.
+    :ivar pending_properties: The properties of the new members whose
+        subscription is pending once the plan has been applied, by email
+        address.  They are not set: the member does not exist until the
+        subscription is confirmed or approved.
+    """
+
+    def __init__(self):
+        self.subscribe = []
+        self.unsubscribe = []
+        self.update = []
+        self.subscribed = None
+        self.unsubscribed = None
+        self.updated = None
+        self.pending_properties = {}
+        # Email -> self link of the members to update.
+        self._links = {}
+        # Email -> properties to set once subscribed.
+        self._new_properties = {}
+
+    def __repr__(self):
+        return '<SyncPlan: {0} to subscribe, {1} to unsubscribe, ' \
+            '{2} to update>'.format(
+                len(self.subscribe), len(self.unsubscribe), len(self.update))
+
+    @property
+    def empty(self):
+        """True if the roster is already in sync."""
+        return not (self.subscribe or self.unsubscribe or self.update)
+
+
 class MailingList(RESTObject):
 
     _properties = ('display_name', 'fqdn_listname', 'list_id', 'list_name',
@@ -88,6 +151,33 @@ class MailingList(RESTObject):
         url = 'lists/{0}/roster/member'.format(self.fqdn_listname)
         return Page(self._connection, url, Member, count, page)
 
+    def iter_members(self, page_size=DEFAULT_PAGE_ITEM_COUNT, read_ahead=0,
+                     compact=False):
+        """Iterate over the members, fetching them page by page."""
+        url = 'lists/{0}/roster/member'.format(self.fqdn_listname)
+        return iter_entries(self._connection, url, Member, page_size,
+                            read_ahead, compact)
+
+    def get_member_columns(self, role='member', fields=None, page_size=None,
+                           read_ahead=0):
+        """Load the roster as a column-oriented table.
+
+        See :meth:`Client.get_member_columns`.
+
+        :param role: The role of the members to load.
+        """
+        url = 'lists/{0}/roster/{1}'.format(self.fqdn_listname, role)
+        return load_columns(self._connection, url, Member, fields, page_size,
+                            read_ahead)
+
+    def iter_nonmembers(self, page_size=DEFAULT_PAGE_ITEM_COUNT, read_ahead=0,
+                        compact=False):
+        """Iterate over the nonmembers, fetching them page by page."""
+        url = 'members/find?{0}'.format(urlencode(
+            {'role': 'nonmember', 'list_id': self.list_id}))
+        return iter_entries(self._connection, url, Member, page_size,
+                            read_ahead, compact)
+
     def find_members(self, address, role='member', page=None, count=50):
         data = {
             'subscriber': address,
@@ -122,9 +212,38 @@ class MailingList(RESTObject):
         return [HeldMessage(self._connection, entry['self_link'], entry)
                 for entry in content['entries']]
 
-    def get_held_page(self, count=50, page=1):
+    @property
+    def held_summaries(self):
+        """Return a list of held messages without their bodies.
+
+        See :class:`HeldMessageSummary`.
+        """
+        return list(self.iter_held(page_size=None, summary=True))
+
+    def get_held_page(self, count=50, page=1, summary=False):
+        """Get a page of held messages.
+
+        :param summary: Return :class:`HeldMessageSummary` objects, which
+            fetch the message bodies on first access.
+        :type summary: bool
+        """
         url = 'lists/{0}/held'.format(self.fqdn_listname)
-        return Page(self._connection, url, HeldMessage, count, page)
+        model = HeldMessageSummary if summary else HeldMessage
+        return Page(self._connection, url, model, count, page)
+
+    def iter_held(self, page_size=DEFAULT_PAGE_ITEM_COUNT, read_ahead=0,
+                  compact=False, summary=False):
+        """Iterate over the held messages, fetching them page by page.
+
+        :param summary: Yield :class:`HeldMessageSummary` objects, which
+            fetch the message bodies on first access.  With `compact`, the
+            records have no `msg` at all.
+        :type summary: bool
+        """
+        url = 'lists/{0}/held'.format(self.fqdn_listname)
+        model = HeldMessageSummary if summary else HeldMessage
+        return iter_entries(self._connection, url, model, page_size,
+                            read_ahead, compact)
 
     def get_held_message(self, held_id):
         url = 'lists/{0}/held/{1}'.format(self.fqdn_listname, held_id)
@@ -138,15 +257,23 @@ class MailingList(RESTObject):
         if 'entries' not in content:
             return []
         else:
-            entries = []
-            for entry in content['entries']:
-                request = dict(email=entry['email'],
-                               token=entry['token'],
-                               token_owner=entry['token_owner'],
-                               list_id=entry['list_id'],
-                               request_date=entry['when'])
-                entries.append(request)
-        return entries
+            return [_subscription_request(entry)
+                    for entry in content['entries']]
+
+    def iter_requests(self, page_size=DEFAULT_PAGE_ITEM_COUNT, read_ahead=0):
+        """Iterate over the subscription requests, page by page.
+
+        The requests are the dicts of :attr:`requests`.
+
+        :param page_size: The number of requests per page, or None to stream
+            all of them in a single response.
+        :param read_ahead: The number of pages to fetch in advance.
+        """
+        url = 'lists/{0}/requests'.format(self.fqdn_listname)
+        return iter_entries(
+            self._connection, url,
+            lambda connection, url, entry: _subscription_request(entry),
+            page_size, read_ahead)
 
     @property
     def archivers(self):
@@ -196,6 +323,65 @@ class MailingList(RESTObject):
             path, dict(action=action), 'POST')
         return response
 
+    def moderate_messages(self, request_ids, action,
+                          max_workers=DEFAULT_MAX_CONCURRENCY, progress=None):
+        """Moderate many held messages concurrently.
+
+        :param request_ids: The ids of the held messages.
+        :param action: Action to perform on the held messages.
+        :type action: String.
+        :param max_workers: The maximum number of simultaneous requests.
+        :param progress: A function called with each request id and None, or
+            the exception raised, as soon as the message is moderated.
+        :return: A :class:`BulkResult` keyed by request id.  Messages which
+            are not held any more fail with a 404 `HTTPError`.
+        """
+        request_ids = list(request_ids)
+        fqdn_listname = self.fqdn_listname
+
+        def moderate(request_id):
+            path = 'lists/{0}/held/{1}'.format(fqdn_listname, request_id)
+            self._connection.call(path, dict(action=action), 'POST')
+
+        return bulk_apply(moderate, request_ids, max_workers,
+                          progress=progress)
+
+    def moderate_held_messages(self, action, sender=None, reason=None,
+                               predicate=None,
+                               max_workers=DEFAULT_MAX_CONCURRENCY,
+                               progress=None):
+        """Moderate the held messages matching some criteria.
+
+        The held messages are all listed first, then the matching ones are
+        moderated concurrently with :meth:`moderate_messages`.
+
+        :param action: Action to perform on the held messages.
+        :type action: String.
+        :param sender: Only moderate the messages from this address.
+        :param reason: Only moderate the messages whose hold reason contains
+            this text.
+        :param predicate: Only moderate the messages for which this function
+            returns True.  It is called with a compact record of each held
+            message, see :meth:`iter_held`.
+        :param max_workers: The maximum number of simultaneous requests.
+        :param progress: See :meth:`moderate_messages`.
+        :return: A :class:`BulkResult` keyed by request id.
+        """
+        if sender is not None:
+            sender = sender.lower()
+        request_ids = []
+        for message in self.iter_held(compact=True):
+            if sender is not None and (
+                    (message.sender or '').lower() != sender):
+                continue
+            if reason is not None and reason not in (message.reason or ''):
+                continue
+            if predicate is not None and not predicate(message):
+                continue
+            request_ids.append(message.request_id)
+        return self.moderate_messages(
+            request_ids, action, max_workers, progress)
+
     def discard_message(self, request_id):
         """Shortcut for moderate_message."""
         return self.moderate_message(request_id, 'discard')
@@ -223,6 +409,28 @@ class MailingList(RESTObject):
         response, content = self._connection.call(path, {'action': action})
         return response
 
+    def moderate_requests(self, tokens, action,
+                          max_workers=DEFAULT_MAX_CONCURRENCY, progress=None):
+        """Moderate many subscription requests concurrently.
+
+        :param tokens: The tokens of the requests.
+        :param action: accept|reject|discard|defer
+        :type action: str.
+        :param max_workers: The maximum number of simultaneous requests.
+        :param progress: A function called with each token and None, or the
+            exception raised, as soon as the request is moderated.
+        :return: A :class:`BulkResult` keyed by token.  Requests which are
+            not pending any more fail with a 404 `HTTPError`.
+        """
+        tokens = list(tokens)
+        list_id = self.list_id
+
+        def moderate(token):
+            path = 'lists/{0}/requests/{1}'.format(list_id, token)
+            self._connection.call(path, {'action': action})
+
+        return bulk_apply(moderate, tokens, max_workers, progress=progress)
+
     def manage_request(self, token, action):
         """Alias for moderate_request, kept for compatibility"""
         warnings.warn(
@@ -316,6 +524,149 @@ class MailingList(RESTObject):
             raise ValueError('%s is not a member address of %s' %
                              (email, self.fqdn_listname))
 
+    def mass_subscribe(self, subscribers, pre_verified=False,
+                       pre_confirmed=False, pre_approved=False,
+                       max_workers=DEFAULT_MAX_CONCURRENCY):
+        """Subscribe many email addresses concurrently.
+
+        :param subscribers: The email addresses to subscribe.  An item can
+            also be a dictionary of the arguments of :meth:`subscribe`, with
+            an `address` key, to set the display name or the flags of this
+            subscriber.
+        :param pre_verified: The default `pre_verified` flag.
+        :param pre_confirmed: The default `pre_confirmed` flag.
+        :param pre_approved: The default `pre_approved` flag.
+        :param max_workers: The maximum number of simultaneous requests.
+        :return: A :class:`BulkResult` keyed by email address.  The result
+            of a subscription is a member proxy object, pending
+            subscriptions come with their request token.
+        """
+        defaults = dict(pre_verified=pre_verified,
+                        pre_confirmed=pre_confirmed,
+                        pre_approved=pre_approved)
+        subscribers = [
+            dict(defaults, address=subscriber)
+            if isinstance(subscriber, six.string_types)
+            else dict(defaults, **subscriber)
+            for subscriber in subscribers]
+        # Load the list id once, before the threads need it.
+        self.list_id
+
+        def subscribe(kwargs):
+            outcome = self.subscribe(**kwargs)
+            if isinstance(outcome, dict):
+                return Pending(outcome.get('token'))
+            return outcome
+
+        return bulk_apply(subscribe, subscribers, max_workers,
+                          key=itemgetter('address'))
+
+    def mass_unsubscribe(self, emails, max_workers=DEFAULT_MAX_CONCURRENCY):
+        """Unsubscribe many email addresses concurrently.
+
+        :param emails: The email addresses to unsubscribe.
+        :param max_workers: The maximum number of simultaneous requests.
+        :return: A :class:`BulkResult` keyed by email address.  Addresses
+            which are not members fail with a 404 `HTTPError`.
+        """
+        emails = list(emails)
+        list_id = self.list_id
+
+        def unsubscribe(email):
+            path = 'lists/{0}/member/{1}'.format(list_id, email)
+            self._connection.call(path, method='DELETE')
+
+        return bulk_apply(unsubscribe, emails, max_workers)
+
+    def sync_members(self, desired, dry_run=False, pre_verified=False,
+                     pre_confirmed=False, pre_approved=False,
+                     max_workers=DEFAULT_MAX_CONCURRENCY):
+        """Synchronize the members with a desired membership.
+
+        The current roster is streamed and indexed by email address, then
+        compared with `desired`: missing addresses are subscribed, members
+        which are not desired are unsubscribed, and the `delivery_mode` and
+        `moderation_action` of the others are updated where they differ.
+        Only these changes are sent, concurrently.
+
+        :param desired: The email addresses of the desired members.  An
+            item can also be a dictionary with an `address` key, the
+            `delivery_mode` and `moderation_action` of the member, and the
+            other arguments of :meth:`subscribe`.  Properties which are not
+            given are left alone.
+        :param dry_run: Only compute the changes, without applying them.
+        :type dry_run: bool
+        :param pre_verified: The default `pre_verified` flag of the new
+            subscriptions, see :meth:`mass_subscribe`.
+        :param pre_confirmed: The default `pre_confirmed` flag.
+        :param pre_approved: The default `pre_approved` flag.
+        :param max_workers: The maximum number of simultaneous requests.
+        :return: The :class:`SyncPlan`, with the results of the changes
+            unless this is a dry run.  The properties of the pending
+            subscriptions are not set, they are listed in its
+            `pending_properties` instead.
+        """
+        wanted = {}
+        for item in desired:
+            if isinstance(item, six.string_types):
+                item = {'address': item}
+            wanted[item['address'].lower()] = item
+        plan = SyncPlan()
+        for member in self.iter_members(page_size=None, compact=True):
+            email = member.email.lower()
+            item = wanted.pop(email, None)
+            if item is None:
+                plan.unsubscribe.append(member.email)
+                continue
+            changes = dict(
+                (name, item[name]) for name in SYNC_PROPERTIES
+                if item.get(name) is not None and
+                item[name] != getattr(member, name))
+            if changes:
+                plan.update.append((member.email, changes))
+                plan._links[member.email] = member.self_link
+        # The remaining addresses are not subscribed yet.
+        for email, item in wanted.items():
+            subscriber = dict(
+                (key, value) for key, value in item.items()
+                if key not in SYNC_PROPERTIES)
+            plan.subscribe.append(subscriber)
+            properties = dict(
+                (name, item[name]) for name in SYNC_PROPERTIES
+                if item.get(name) is not None)
+            if properties:
+                plan._new_properties[item['address']] = properties
+        if not dry_run:
+            self._apply_sync_plan(
+                plan, max_workers, pre_verified=pre_verified,
+                pre_confirmed=pre_confirmed, pre_approved=pre_approved)
+        return plan
+
+    def _apply_sync_plan(self, plan, max_workers, **flags):
+        plan.subscribed = self.mass_subscribe(
+            plan.subscribe, max_workers=max_workers, **flags)
+        plan.unsubscribed = self.mass_unsubscribe(
+            plan.unsubscribe, max_workers=max_workers)
+        updates = [(plan._links[email], email, changes)
+                   for email, changes in plan.update]
+        for address, member in plan.subscribed.succeeded:
+            if address in plan._new_properties:
+                updates.append(
+                    (member._url, address, plan._new_properties[address]))
+        for address, token in plan.subscribed.pending:
+            if address in plan._new_properties:
+                plan.pending_properties[address] = (
+                    plan._new_properties[address])
+
+        def update(args):
+            link, email, changes = args
+            # The connection encodes the data in place.
+            self._connection.call(link, dict(changes), method='PATCH')
+            return changes
+
+        plan.updated = bulk_apply(update, updates, max_workers,
+                                  key=itemgetter(1))
+
     @property
     def bans(self):
         from mailmanclient.restobjects.ban import Bans
@@ -27,6 +27,8 @@ class Member(RESTObject, PreferencesMixin):
     _properties = ('delivery_mode', 'email', 'list_id', 'moderation_action',
                    'role', 'self_link')
     _writable_properties = ('address', 'delivery_mode', 'moderation_action')
+    _categorical_properties = ('delivery_mode', 'list_id', 'moderation_action',
+                               'role')
 
     def __repr__(self):
         return '<Member "{0}" on "{1}">'.format(self.email, self.list_id)
@@ -34,15 +36,31 @@ class Member(RESTObject, PreferencesMixin):
     def __unicode__(self):
         return '<Member "{0}" on "{1}">'.format(self.email, self.list_id)
 
+    def __init__(self, connection, url, data=None):
+        super(Member, self).__init__(connection, url, data)
+        self._address = None
+        self._user = None
+
+    def _reset_cache(self):
+        super(Member, self)._reset_cache()
+        self._address = None
+        self._user = None
+
     @property
     def address(self):
+        # Keep the object so that its data is only fetched once.
         from mailmanclient.restobjects.address import Address
-        return Address(self._connection, self.rest_data['address'])
+        if self._address is None:
+            self._address = Address(
+                self._connection, self.rest_data['address'])
+        return self._address
 
     @property
     def user(self):
         from mailmanclient.restobjects.user import User
-        return User(self._connection, self.rest_data['user'])
+        if self._user is None:
+            self._user = User(self._connection, self.rest_data['user'])
+        return self._user
 
     def unsubscribe(self):
         """Unsubscribe the member from a mailing list.
@@ -14,10 +14,14 @@
 # You should have received a copy of the GNU Lesser General Public License
 # along with mailmanclient.  If not, see <http://www.gnu.org/licenses/>.
 
-from mailmanclient.restobjects.preferences import PreferencesMixin
+from six.moves.urllib_parse import urlencode
 
+from mailmanclient.constants import DEFAULT_PAGE_ITEM_COUNT
+from mailmanclient.restobjects.preferences import PreferencesMixin
 from mailmanclient.restobjects.address import Addresses, Address
 from mailmanclient.restbase.base import RESTObject
+from mailmanclient.restbase.bulk import run_concurrently
+from mailmanclient.restbase.page import iter_entries
 
 __metaclass__ = type
 __all__ = [
@@ -54,23 +58,52 @@ class User(RESTObject, PreferencesMixin):
         else:
             super(User, self).__setattr__(name, value)
 
+    def _reset_cache(self):
+        super(User, self)._reset_cache()
+        self._subscriptions = None
+        self._subscription_list_ids = None
+
     @property
     def subscriptions(self):
+        """The memberships of all the user's addresses.
+
+        The memberships of each address are requested concurrently, and
+        cached until the user's cache is reset.
+        """
         from mailmanclient.restobjects.member import Member
         if self._subscriptions is None:
-            subscriptions = []
-            for address in self.addresses:
+            def find(email):
                 response, content = self._connection.call(
-                    'members/find', data={'subscriber': address})
-                try:
-                    for entry in content['entries']:
-                        subscriptions.append(Member(
-                            self._connection, entry['self_link'], entry))
-                except KeyError:
-                    pass
+                    'members/find?{0}'.format(urlencode(
+                        {'subscriber': email})))
+                return content.get('entries', [])
+
+            emails = [address.email for address in self.addresses]
+            subscriptions = []
+            seen = set()
+            for entries in run_concurrently(find, emails):
+                for entry in entries:
+                    if entry['self_link'] in seen:
+                        continue
+                    seen.add(entry['self_link'])
+                    subscriptions.append(Member(
+                        self._connection, entry['self_link'], entry))
             self._subscriptions = subscriptions
         return self._subscriptions
 
+    def iter_subscriptions(self, page_size=DEFAULT_PAGE_ITEM_COUNT,
+                           read_ahead=0):
+        """Iterate over the memberships of all the user's addresses.
+
+        Mailman finds the memberships of a user from its id, so they are
+        paged through with a single query instead of one per address.
+        """
+        from mailmanclient.restobjects.member import Member
+        url = 'members/find?{0}'.format(urlencode(
+            {'subscriber': self.user_id}))
+        return iter_entries(self._connection, url, Member, page_size,
+                            read_ahead)
+
     @property
     def subscription_list_ids(self):
         if self._subscription_list_ids is None:
@@ -97,6 +130,7 @@ class User(RESTObject, PreferencesMixin):
         if absorb_existing:
             data['absorb_existing'] = 1
         response, content = self._connection.call(url, data)
+        self._reset_cache()
         address = {
             'email': email,
             'self_link': response['location'],
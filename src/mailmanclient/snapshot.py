@@ -0,0 +1,508 @@
+# Copyright (C) 2017 The Free Software Foundation, Inc.
+#
+# This file is part of mailmanclient.
+#
+# mailmanclient is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation, version 3 of the License.
+#
+# mailmanclient is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
+# or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public
+# License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with mailmanclient.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Local indexed snapshots of a Mailman site."""
+
+from __future__ import absolute_import, unicode_literals
+
+import json
+import sqlite3
+import threading
+import time
+
+import six
+from six.moves.urllib_error import HTTPError
+from six.moves.urllib_parse import urlencode
+
+from mailmanclient.constants import DEFAULT_MAX_CONCURRENCY
+from mailmanclient.restobjects.address import Address
+from mailmanclient.restobjects.ban import (
+    BannedAddress, compile_ban_patterns)
+from mailmanclient.restobjects.domain import Domain
+from mailmanclient.restobjects.mailinglist import MailingList
+from mailmanclient.restobjects.member import Member
+from mailmanclient.restobjects.user import User
+from mailmanclient.restbase.bulk import run_concurrently
+
+__metaclass__ = type
+__all__ = [
+    'Snapshot',
+]
+
+
+def _lower(value):
+    return value.lower() if value else value
+
+
+def _link_id(link):
+    # The id at the end of a link, such as the user id of a member.
+    return link.rstrip('/').rsplit('/', 1)[-1] if link else None
+
+
+def _user_key(entry):
+    return six.text_type(entry['user_id'])
+
+
+class _Table:
+    """The entries of a collection, by key and by indexed values."""
+
+    def __init__(self, model, key, indexes):
+        """
+        :param model: The `RESTObject` subclass of the entries.
+        :param key: A function returning the key of an entry.
+        :param indexes: A dictionary from index names to functions returning
+            the indexed value of an entry.
+        """
+        self.model = model
+        self.key = key
+        self.indexes = indexes
+        self.entries = {}
+        # Index name -> {value: set of keys}
+        self._index = dict((name, {}) for name in indexes)
+
+    def _add(self, key, entry):
+        self.entries[key] = entry
+        for name, func in self.indexes.items():
+            self._index[name].setdefault(func(entry), set()).add(key)
+
+    def _discard(self, key):
+        entry = self.entries.pop(key)
+        for name, func in self.indexes.items():
+            value = func(entry)
+            keys = self._index[name][value]
+            keys.discard(key)
+            if not keys:
+                del self._index[name][value]
+
+    def diff(self, entries, scope=None):
+        """Compare the table with the current entries of the collection.
+
+        :param entries: The current entries.
+        :param scope: The keys the entries replace, defaults to all of them.
+        :return: A `(changed, removed)` tuple, a dictionary of the new and
+            changed entries by key, and the list of keys to remove.
+        """
+        seen = set()
+        changed = {}
+        for entry in entries:
+            key = self.key(entry)
+            seen.add(key)
+            if self.entries.get(key) != entry:
+                changed[key] = entry
+        if scope is None:
+            scope = self.entries
+        removed = [key for key in scope if key not in seen]
+        return changed, removed
+
+    def apply(self, changed, removed):
+        """Update the entries and the indexes with a diff."""
+        for key in removed:
+            if key in self.entries:
+                self._discard(key)
+        for key, entry in changed.items():
+            if key in self.entries:
+                self._discard(key)
+            self._add(key, entry)
+
+    def keys(self, index, value):
+        return sorted(self._index[index].get(value, ()))
+
+    def lookup(self, index, value):
+        return [self.entries[key] for key in self.keys(index, value)]
+
+
+class Snapshot:
+    """A local copy of the domains, lists, users, addresses, members and
+    bans of a Mailman site.
+
+    The collections are downloaded by :meth:`refresh` and indexed by email
+    address, list id, user id and mail host.  The queries are answered
+    locally and return the usual REST objects, loaded with the data of the
+    snapshot.  Modifying these objects goes to the REST API, the snapshot is
+    only updated on the next refresh.
+
+    With a `path`, the snapshot is also stored in an SQLite database file,
+    so that other processes can load it without downloading the site.
+    """
+
+    # The collections, in the order they are refreshed.
+    COLLECTIONS = ('domains', 'lists', 'users', 'addresses', 'members',
+                   'bans')
+
+    def __init__(self, connection, path=None, timeout=5):
+        """
+        :param connection: An API connection object.
+        :type connection: Connection.
+        :param path: The path of an SQLite database file to store the
+            snapshot in.  The snapshot it contains, if any, is loaded.
+        :param timeout: Number of seconds to wait for a locked database.
+        """
+        self._connection = connection
+        self.path = path
+        self.refreshed = None
+        self._lock = threading.RLock()
+        self._tables = {
+            'domains': _Table(Domain, lambda entry: entry['mail_host'], {}),
+            'lists': _Table(
+                MailingList, lambda entry: entry['list_id'], {
+                    'fqdn_listname': lambda entry: _lower(
+                        entry.get('fqdn_listname')),
+                    'mail_host': lambda entry: entry.get('mail_host'),
+                }),
+            'users': _Table(User, _user_key, {}),
+            'addresses': _Table(
+                Address, lambda entry: entry['email'].lower(), {
+                    'user_id': lambda entry: _link_id(entry.get('user')),
+                }),
+            'members': _Table(
+                Member, lambda entry: entry['self_link'], {
+                    'email': lambda entry: _lower(entry.get('email')),
+                    'list_id': lambda entry: entry.get('list_id'),
+                    'user_id': lambda entry: _link_id(entry.get('user')),
+                }),
+            'bans': _Table(
+                BannedAddress, lambda entry: entry['self_link'], {
+                    'email': lambda entry: _lower(entry.get('email')),
+                    'list_id': lambda entry: entry.get('list_id'),
+                    'pattern': lambda entry: entry['email'].startswith('^'),
+                }),
+            }
+        # The compiled pattern bans, built on the first check.
+        self._ban_patterns = None
+        self._db = None
+        if path is not None:
+            self._db = sqlite3.connect(
+                path, timeout=timeout, check_same_thread=False)
+            with self._db:
+                self._db.execute(
+                    'CREATE TABLE IF NOT EXISTS snapshot ('
+                    'collection TEXT, key TEXT, data TEXT, '
+                    'PRIMARY KEY (collection, key))')
+                self._db.execute(
+                    'CREATE TABLE IF NOT EXISTS snapshot_info ('
+                    'name TEXT PRIMARY KEY, value REAL)')
+            self._load()
+
+    def __repr__(self):
+        return '<Snapshot of {0}: {1}>'.format(
+            self._connection.baseurl, ', '.join(
+                '{0} {1}'.format(len(self._tables[name].entries), name)
+                for name in self.COLLECTIONS))
+
+    def close(self):
+        """Close the database file, if any."""
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    # Storage.
+
+    def _load(self):
+        changes = dict((name, {}) for name in self.COLLECTIONS)
+        for collection, key, data in self._db.execute(
+                'SELECT collection, key, data FROM snapshot'):
+            if collection in changes:
+                changes[collection][key] = json.loads(data)
+        for name, changed in changes.items():
+            self._tables[name].apply(changed, [])
+        row = self._db.execute(
+            'SELECT value FROM snapshot_info WHERE name = ?',
+            ('refreshed',)).fetchone()
+        if row is not None:
+            self.refreshed = row[0]
+
+    def _update(self, name, entries, scope=None):
+        # Apply the differences with the current entries of a collection,
+        # and return their number.
+        with self._lock:
+            table = self._tables[name]
+            changed, removed = table.diff(entries, scope)
+            table.apply(changed, removed)
+            if name == 'bans' and (changed or removed):
+                self._ban_patterns = None
+            if self._db is not None:
+                with self._db:
+                    self._db.executemany(
+                        'DELETE FROM snapshot '
+                        'WHERE collection = ? AND key = ?',
+                        [(name, key) for key in removed])
+                    self._db.executemany(
+                        'INSERT OR REPLACE INTO snapshot '
+                        '(collection, key, data) VALUES (?, ?, ?)',
+                        [(name, key, json.dumps(entry))
+                         for key, entry in changed.items()])
+        return len(changed), len(removed)
+
+    def _set_refreshed(self):
+        self.refreshed = time.time()
+        if self._db is not None:
+            with self._db:
+                self._db.execute(
+                    'INSERT OR REPLACE INTO snapshot_info (name, value) '
+                    'VALUES (?, ?)', ('refreshed', self.refreshed))
+
+    # Refreshing.
+
+    def _fetch(self, path):
+        # Stream the collection, without going through the response cache.
+        response, entries = self._connection.stream(path)
+        return list(entries)
+
+    def _fetch_bans(self, list_ids, max_workers):
+        paths = ['bans'] + [
+            'lists/{0}/bans'.format(list_id) for list_id in list_ids]
+        bans = []
+        for entries in run_concurrently(self._fetch, paths, max_workers):
+            bans.extend(entries)
+        return bans
+
+    def refresh(self, collections=None, max_workers=DEFAULT_MAX_CONCURRENCY):
+        """Download the collections and update the snapshot.
+
+        Each collection is streamed in a single request, the collections
+        being requested concurrently, as are the bans of each list.  Only
+        the entries which changed are then re-indexed and stored.
+
+        :param collections: The names of the collections to refresh, among
+            `COLLECTIONS`.  Defaults to all of them.
+        :param max_workers: The maximum number of simultaneous requests.
+        :return: A dictionary from the names of the refreshed collections to
+            `(changed, removed)` tuples of numbers of entries.
+        """
+        if collections is None:
+            collections = self.COLLECTIONS
+        for name in collections:
+            if name not in self._tables:
+                raise ValueError('Unknown collection: {0}'.format(name))
+        names = [name for name in self.COLLECTIONS
+                 if name in collections and name != 'bans']
+        changes = {}
+        fetched = run_concurrently(self._fetch, names, max_workers)
+        for name, entries in zip(names, fetched):
+            changes[name] = self._update(name, entries)
+        if 'bans' in collections:
+            list_ids = sorted(self._tables['lists'].entries)
+            changes['bans'] = self._update(
+                'bans', self._fetch_bans(list_ids, max_workers))
+        if set(collections) == set(self.COLLECTIONS):
+            self._set_refreshed()
+        return changes
+
+    def refresh_list(self, fqdn_listname):
+        """Update a single mailing list, its members and its bans.
+
+        :param fqdn_listname: The fully qualified name or the id of the
+            list.  A list which does not exist any more is removed from the
+            snapshot with its members and bans.
+        :return: The same dictionary as :meth:`refresh`.
+        """
+        try:
+            entry = self._connection.call(
+                'lists/{0}'.format(fqdn_listname))[1]
+        except HTTPError as error:
+            if error.code != 404:
+                raise
+            list_id = self._find_list_id(fqdn_listname)
+            if list_id is None:
+                return {}
+            members, bans = [], []
+            lists = self._update('lists', [], [list_id])
+        else:
+            list_id = entry['list_id']
+            lists = self._update('lists', [entry], [list_id])
+            members = self._fetch('members/find?{0}'.format(
+                urlencode({'list_id': list_id})))
+            bans = self._fetch('lists/{0}/bans'.format(list_id))
+        with self._lock:
+            member_keys = self._tables['members'].keys('list_id', list_id)
+            ban_keys = self._tables['bans'].keys('list_id', list_id)
+        return {
+            'lists': lists,
+            'members': self._update('members', members, member_keys),
+            'bans': self._update('bans', bans, ban_keys),
+            }
+
+    # Queries.
+
+    def _object(self, name, entry):
+        return self._tables[name].model(
+            self._connection, entry['self_link'], dict(entry))
+
+    def _objects(self, name, entries):
+        return [self._object(name, entry) for entry in entries]
+
+    def _get(self, name, key):
+        with self._lock:
+            try:
+                entry = self._tables[name].entries[key]
+            except KeyError:
+                raise KeyError('{0} not in the snapshot: {1}'.format(
+                    name, key))
+        return self._object(name, entry)
+
+    def _all(self, name):
+        with self._lock:
+            table = self._tables[name]
+            entries = [table.entries[key] for key in sorted(table.entries)]
+        return self._objects(name, entries)
+
+    def _lookup(self, name, index, value):
+        with self._lock:
+            entries = self._tables[name].lookup(index, value)
+        return self._objects(name, entries)
+
+    def _find_list_id(self, fqdn_listname):
+        with self._lock:
+            table = self._tables['lists']
+            if fqdn_listname in table.entries:
+                return fqdn_listname
+            keys = table.keys('fqdn_listname', _lower(fqdn_listname))
+        return keys[0] if keys else None
+
+    @property
+    def domains(self):
+        return self._all('domains')
+
+    def get_domain(self, mail_host):
+        """Get a domain by its mail host.
+
+        :raises KeyError: if the domain is not in the snapshot.
+        """
+        return self._get('domains', mail_host)
+
+    @property
+    def lists(self):
+        return self._all('lists')
+
+    def get_lists(self, mail_host=None):
+        """Get the mailing lists, optionally only those of a domain."""
+        if mail_host is None:
+            return self.lists
+        return self._lookup('lists', 'mail_host', mail_host)
+
+    def get_list(self, fqdn_listname):
+        """Get a mailing list by its fully qualified name or its id.
+
+        :raises KeyError: if the list is not in the snapshot.
+        """
+        list_id = self._find_list_id(fqdn_listname)
+        return self._get('lists', list_id or fqdn_listname)
+
+    @property
+    def users(self):
+        return self._all('users')
+
+    def get_user(self, address):
+        """Get a user by its id or by one of its email addresses.
+
+        :raises KeyError: if the user is not in the snapshot.
+        """
+        address = six.text_type(address)
+        if '@' in address:
+            with self._lock:
+                entry = self._tables['addresses'].entries.get(
+                    address.lower())
+            if entry is None:
+                raise KeyError(
+                    'addresses not in the snapshot: {0}'.format(address))
+            address = _link_id(entry.get('user'))
+        return self._get('users', address)
+
+    def get_address(self, address):
+        """Get an address by its email.
+
+        :raises KeyError: if the address is not in the snapshot.
+        """
+        return self._get('addresses', address.lower())
+
+    def get_addresses(self, user_id):
+        """Get the addresses of a user."""
+        return self._lookup(
+            'addresses', 'user_id', six.text_type(user_id))
+
+    @property
+    def members(self):
+        return self._all('members')
+
+    def find_members(self, address=None, list_id=None, role=None,
+                     user_id=None):
+        """Find the memberships matching all the given criteria.
+
+        :param address: The email address of the members.
+        :param list_id: The id of the list of the members.
+        :param role: The role of the members.
+        :param user_id: The id of the user of the members.
+        """
+        criteria = []
+        if address is not None:
+            criteria.append(('email', address.lower()))
+        if list_id is not None:
+            criteria.append(('list_id', list_id))
+        if user_id is not None:
+            criteria.append(('user_id', six.text_type(user_id)))
+        with self._lock:
+            table = self._tables['members']
+            if criteria:
+                # Intersect the keys found with each index.
+                keys = None
+                for index, value in criteria:
+                    found = set(table.keys(index, value))
+                    keys = found if keys is None else keys & found
+                keys = sorted(keys)
+            else:
+                keys = sorted(table.entries)
+            entries = [table.entries[key] for key in keys]
+        if role is not None:
+            entries = [entry for entry in entries if entry.get('role') == role]
+        return self._objects('members', entries)
+
+    def get_member(self, fqdn_listname, address):
+        """Get the member of a list with an email address.
+
+        :raises KeyError: if the member is not in the snapshot.
+        """
+        list_id = self._find_list_id(fqdn_listname) or fqdn_listname
+        members = self.find_members(address, list_id, role='member')
+        if not members:
+            raise KeyError('members not in the snapshot: {0} on {1}'.format(
+                address, fqdn_listname))
+        return members[0]
+
+    def get_bans(self, list_id=None):
+        """Get the bans of a list, or the global bans."""
+        return self._lookup('bans', 'list_id', list_id)
+
+    def is_banned(self, email, list_id=None):
+        """Whether an email address is banned, globally or from a list.
+
+        Like `Bans`, this checks the pattern bans, which start with a caret
+        (^), as well as the exact addresses.
+
+        :param email: The email address.
+        :param list_id: The id of a list, to check the bans of this list in
+            addition to the global bans.
+        """
+        with self._lock:
+            table = self._tables['bans']
+            for entry in table.lookup('email', email.lower()):
+                if entry.get('list_id') in (None, list_id):
+                    return True
+            if self._ban_patterns is None:
+                self._ban_patterns = compile_ban_patterns(
+                    table.lookup('pattern', True))
+            patterns = self._ban_patterns
+        return any(regex.match(email) for entry, regex in patterns
+                   if entry.get('list_id') in (None, list_id))
@@ -0,0 +1,682 @@
+# Copyright (C) 2017 The Free Software Foundation, Inc.
+#
+# This file is part of mailmanclient.
+#
+# mailmanclient is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation, version 3 of the License.
+#
+# mailmanclient is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
+# or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public
+# License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with mailmanclient.  If not, see <http://www.gnu.org/licenses/>.
+
+"""An in-memory fake of the Mailman REST API, as a WSGI application.
+
+It implements a subset of the API close enough to Mailman's to test the
+client without a running Mailman, for instance::
+
+    app = FakeMailman()
+    client = Client('http://localhost:9001/3.1', 'restadmin', 'restpass',
+                    transport=WSGITransport(app))
+
+The tests can also derive from :class:`FakeMailmanTestCase`, which does it
+in `setUp()`.
+"""
+
+from __future__ import absolute_import, print_function, unicode_literals
+
+import hashlib
+import json
+import re
+import threading
+import unittest
+import uuid
+from collections import OrderedDict
+from six.moves.urllib_parse import parse_qsl, unquote
+
+import six
+
+from mailmanclient.client import Client
+from mailmanclient.restbase.transport import WSGITransport
+
+__metaclass__ = type
+__all__ = [
+    'FakeMailman',
+    'FakeMailmanTestCase',
+    ]
+
+
+class HTTPStatus(Exception):
+    """Raised by the handlers to return an error status."""
+
+    def __init__(self, status, message=''):
+        super(HTTPStatus, self).__init__(status)
+        self.status = status
+        self.message = message
+
+
+REASONS = {
+    200: 'OK',
+    201: 'Created',
+    202: 'Accepted',
+    204: 'No Content',
+    304: 'Not Modified',
+    400: 'Bad Request',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    409: 'Conflict',
+    412: 'Precondition Failed',
+    }
+
+
+def etag(resource):
+    data = json.dumps(resource, sort_keys=True).encode('utf-8')
+    return '"{0}"'.format(hashlib.sha1(data).hexdigest())
+
+
+class FakeMailman:
+    """A WSGI application faking the Mailman REST API.
+
+    The data is kept in memory.  Every request is recorded in `requests` as
+    a `(method, path)` tuple.  Unlike Mailman, conditional requests with the
+    `If-None-Match` and `If-Match` headers are supported.
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.requests = []
+        self.domains = OrderedDict()
+        self.lists = OrderedDict()
+        self.users = OrderedDict()
+        self.addresses = OrderedDict()
+        self.members = OrderedDict()
+        self.bans = []
+        self.held = {}
+        self.subscription_requests = {}
+        self.header_matches = {}
+        self._next_id = 1
+        self._routes = [
+            (re.compile(pattern), handler) for pattern, handler in (
+                (r'^system/versions$', self.system_versions),
+                (r'^domains$', self.domains_collection),
+                (r'^domains/([^/]+)$', self.domain),
+                (r'^domains/([^/]+)/lists$', self.domain_lists),
+                (r'^lists$', self.lists_collection),
+                (r'^lists/([^/]+)$', self.mailing_list),
+                (r'^lists/([^/]+)/config$', self.list_config),
+                (r'^lists/([^/]+)/roster/([^/]+)$', self.roster),
+                (r'^lists/([^/]+)/member/([^/]+)$', self.list_member),
+                (r'^lists/([^/]+)/held$', self.held_collection),
+                (r'^lists/([^/]+)/held/([^/]+)$', self.held_message),
+                (r'^lists/([^/]+)/requests$', self.requests_collection),
+                (r'^lists/([^/]+)/requests/([^/]+)$', self.request),
+                (r'^lists/([^/]+)/header-matches$', self.header_matches_col),
+                (r'^lists/([^/]+)/header-matches/(\d+)$', self.header_match),
+                (r'^lists/([^/]+)/bans$', self.bans_collection),
+                (r'^lists/([^/]+)/bans/([^/]+)$', self.ban),
+                (r'^bans$', self.bans_collection),
+                (r'^bans/([^/]+)$', self.ban),
+                (r'^members$', self.members_collection),
+                (r'^members/find$', self.members_find),
+                (r'^members/([^/]+)$', self.member),
+                (r'^users$', self.users_collection),
+                (r'^users/([^/]+)$', self.user),
+                (r'^users/([^/]+)/addresses$', self.user_addresses),
+                (r'^addresses$', self.addresses_collection),
+                (r'^addresses/([^/]+)$', self.address),
+                )]
+
+    # Helpers.
+
+    def new_id(self):
+        with self.lock:
+            next_id = self._next_id
+            self._next_id += 1
+            return next_id
+
+    def url(self, path):
+        return self.base_url + path
+
+    def collection(self, entries):
+        entries = list(entries)
+        count = self.query.get('count')
+        total_size = len(entries)
+        start = 0
+        if count is not None:
+            count = int(count)
+            start = (int(self.query.get('page', 1)) - 1) * count
+            entries = entries[start:start + count]
+        result = OrderedDict()
+        result['start'] = start
+        result['total_size'] = total_size
+        if entries:
+            result['entries'] = entries
+        return result
+
+    def get_list(self, list_ident):
+        list_id = list_ident.replace('@', '.')
+        try:
+            return self.lists[list_id]
+        except KeyError:
+            raise HTTPStatus(404)
+
+    def get_user(self, user_ident):
+        if '@' in user_ident:
+            try:
+                user_ident = self.addresses[user_ident.lower()]['user_id']
+            except KeyError:
+                raise HTTPStatus(404)
+        try:
+            return self.users[int(user_ident)]
+        except (KeyError, ValueError):
+            raise HTTPStatus(404)
+
+    def ensure_address(self, email, display_name=None):
+        """Get or create the address and its user."""
+        key = email.lower()
+        if key not in self.addresses:
+            user_id = self.new_id()
+            self.users[user_id] = dict(
+                user_id=user_id, display_name=display_name or '',
+                created_on='2017-01-01T00:00:00', is_server_owner=False)
+            self.addresses[key] = dict(
+                email=key, original_email=email,
+                display_name=display_name or '',
+                registered_on='2017-01-01T00:00:00', verified_on=None,
+                user_id=user_id)
+        return self.addresses[key]
+
+    def find_member(self, list_id, email, role='member'):
+        for member in self.members.values():
+            if (member['list_id'] == list_id and member['role'] == role
+                    and member['email'] == email.lower()):
+                return member
+        return None
+
+    def add_member(self, list_id, email, role='member', display_name=None):
+        address = self.ensure_address(email, display_name)
+        member_id = self.new_id()
+        self.members[member_id] = dict(
+            member_id=member_id, list_id=list_id, email=address['email'],
+            role=role, delivery_mode='regular', moderation_action='defer',
+            user_id=address['user_id'])
+        return self.members[member_id]
+
+    # Resources.
+
+    def domain_resource(self, domain):
+        resource = dict(domain)
+        resource['self_link'] = self.url('domains/' + domain['mail_host'])
+        return resource
+
+    def list_resource(self, mlist):
+        resource = dict(
+            (key, value) for key, value in mlist.items()
+            if key != 'settings')
+        resource['member_count'] = len([
+            member for member in self.members.values()
+            if member['list_id'] == mlist['list_id']
+            and member['role'] == 'member'])
+        resource['self_link'] = self.url('lists/' + mlist['list_id'])
+        return resource
+
+    def member_resource(self, member):
+        resource = dict(
+            (key, value) for key, value in member.items()
+            if key != 'user_id')
+        resource['address'] = self.url('addresses/' + member['email'])
+        resource['user'] = self.url('users/{0}'.format(member['user_id']))
+        resource['self_link'] = self.url(
+            'members/{0}'.format(member['member_id']))
+        return resource
+
+    def user_resource(self, user):
+        resource = dict(user)
+        resource['self_link'] = self.url('users/{0}'.format(user['user_id']))
+        return resource
+
+    def address_resource(self, address):
+        resource = dict(
+            (key, value) for key, value in address.items()
+            if key != 'user_id' and value is not None)
+        resource['user'] = self.url('users/{0}'.format(address['user_id']))
+        resource['self_link'] = self.url('addresses/' + address['email'])
+        return resource
+
+    def ban_resource(self, list_id, email):
+        resource = dict(email=email)
+        if list_id is None:
+            resource['self_link'] = self.url('bans/' + email)
+        else:
+            resource['list_id'] = list_id
+            resource['self_link'] = self.url(
+                'lists/{0}/bans/{1}'.format(list_id, email))
+        return resource
+
+    def held_resource(self, list_id, held):
+        resource = dict(held)
+        resource['self_link'] = self.url(
+            'lists/{0}/held/{1}'.format(list_id, held['request_id']))
+        return resource
+
+    def request_resource(self, list_id, request):
+        # Like Mailman's, the subscription requests have no self_link.
+        return dict(request)
+
+    def header_match_resource(self, list_id, position, header_match):
+        resource = dict(header_match)
+        resource['position'] = position
+        resource['self_link'] = self.url(
+            'lists/{0}/header-matches/{1}'.format(list_id, position))
+        return resource
+
+    # Handlers.  Each one returns (status, content, headers).
+
+    def system_versions(self, method, data):
+        return 200, dict(mailman_version='GNU Mailman 3.1 (fake)',
+                         python_version='3', api_version='3.1'), {}
+
+    def domains_collection(self, method, data):
+        if method == 'POST':
+            mail_host = data['mail_host']
+            if mail_host in self.domains:
+                raise HTTPStatus(400, 'Duplicate email host')
+            self.domains[mail_host] = dict(
+                mail_host=mail_host, description=data.get('description'))
+            return 201, None, {'Location': self.url('domains/' + mail_host)}
+        return 200, self.collection(
+            self.domain_resource(domain)
+            for domain in self.domains.values()), {}
+
+    def domain(self, method, data, mail_host):
+        if mail_host not in self.domains:
+            raise HTTPStatus(404)
+        if method == 'DELETE':
+            del self.domains[mail_host]
+            return 204, None, {}
+        return 200, self.domain_resource(self.domains[mail_host]), {}
+
+    def domain_lists(self, method, data, mail_host):
+        if mail_host not in self.domains:
+            raise HTTPStatus(404)
+        return 200, self.collection(
+            self.list_resource(mlist) for mlist in self.lists.values()
+            if mlist['mail_host'] == mail_host), {}
+
+    def lists_collection(self, method, data):
+        if method == 'POST':
+            list_name, mail_host = data['fqdn_listname'].split('@')
+            if mail_host not in self.domains:
+                raise HTTPStatus(400, 'Domain does not exist')
+            list_id = '{0}.{1}'.format(list_name, mail_host)
+            if list_id in self.lists:
+                raise HTTPStatus(400, 'Mailing list exists')
+            self.lists[list_id] = dict(
+                list_id=list_id, list_name=list_name, mail_host=mail_host,
+                fqdn_listname=data['fqdn_listname'],
+                display_name=list_name.capitalize(), volume=1,
+                settings=dict(
+                    description='', subject_prefix='[{0}] '.format(
+                        list_name.capitalize()),
+                    default_member_action='defer', advertised=True,
+                    list_id=list_id, fqdn_listname=data['fqdn_listname']))
+            return 201, None, {'Location': self.url('lists/' + list_id)}
+        return 200, self.collection(
+            self.list_resource(mlist) for mlist in self.lists.values()), {}
+
+    def mailing_list(self, method, data, list_ident):
+        mlist = self.get_list(list_ident)
+        if method == 'DELETE':
+            del self.lists[mlist['list_id']]
+            return 204, None, {}
+        return 200, self.list_resource(mlist), {}
+
+    def list_config(self, method, data, list_ident):
+        mlist = self.get_list(list_ident)
+        if method == 'PATCH':
+            mlist['settings'].update(data)
+            return 204, None, {}
+        resource = dict(mlist['settings'])
+        resource['self_link'] = self.url(
+            'lists/{0}/config'.format(mlist['list_id']))
+        return 200, resource, {}
+
+    def roster(self, method, data, list_ident, role):
+        mlist = self.get_list(list_ident)
+        return 200, self.collection(
+            self.member_resource(member)
+            for member in self.members.values()
+            if member['list_id'] == mlist['list_id']
+            and member['role'] == role), {}
+
+    def list_member(self, method, data, list_ident, email):
+        mlist = self.get_list(list_ident)
+        member = self.find_member(mlist['list_id'], email)
+        if member is None:
+            raise HTTPStatus(404)
+        if method == 'DELETE':
+            del self.members[member['member_id']]
+            return 204, None, {}
+        return 200, self.member_resource(member), {}
+
+    def members_collection(self, method, data):
+        if method == 'POST':
+            mlist = self.get_list(data['list_id'])
+            list_id = mlist['list_id']
+            email = data['subscriber']
+            role = data.get('role', 'member')
+            if self.find_member(list_id, email, role) is not None:
+                raise HTTPStatus(409, 'Member already subscribed')
+            flags = [data.get(flag) == 'True' for flag in (
+                'pre_verified', 'pre_confirmed', 'pre_approved')]
+            if role == 'member' and not all(flags):
+                token = uuid.uuid4().hex
+                token_owner = 'subscriber' if not all(flags[:2]) \
+                    else 'moderator'
+                self.subscription_requests.setdefault(list_id, OrderedDict())[
+                    token] = dict(
+                        token=token, token_owner=token_owner, email=email,
+                        list_id=list_id, display_name=data.get('display_name'),
+                        when='2017-01-01T00:00:00')
+                return 202, dict(token=token, token_owner=token_owner), {}
+            member = self.add_member(
+                list_id, email, role, data.get('display_name'))
+            return 201, None, {'Location': self.url(
+                'members/{0}'.format(member['member_id']))}
+        return 200, self.collection(
+            self.member_resource(member)
+            for member in self.members.values()), {}
+
+    def members_find(self, method, data):
+        criteria = dict(self.query)
+        criteria.update(data)
+        criteria.pop('count', None)
+        criteria.pop('page', None)
+        results = []
+        for member in self.members.values():
+            subscriber = criteria.get('subscriber')
+            if subscriber is not None and '@' not in subscriber:
+                # A user id: the memberships of all the user's addresses.
+                if str(member['user_id']) != subscriber:
+                    continue
+            elif subscriber is not None and (
+                    member['email'] != subscriber.lower()):
+                continue
+            if 'list_id' in criteria and (
+                    member['list_id'] != criteria['list_id']):
+                continue
+            if 'role' in criteria and member['role'] != criteria['role']:
+                continue
+            results.append(self.member_resource(member))
+        return 200, self.collection(results), {}
+
+    def member(self, method, data, member_id):
+        try:
+            member = self.members[int(member_id)]
+        except (KeyError, ValueError):
+            raise HTTPStatus(404)
+        if method == 'DELETE':
+            del self.members[member['member_id']]
+            return 204, None, {}
+        if method == 'PATCH':
+            for key in ('delivery_mode', 'moderation_action'):
+                if key in data:
+                    member[key] = data[key]
+            return 204, None, {}
+        return 200, self.member_resource(member), {}
+
+    def users_collection(self, method, data):
+        if method == 'POST':
+            if data['email'].lower() in self.addresses:
+                raise HTTPStatus(400, 'User already exists')
+            address = self.ensure_address(
+                data['email'], data.get('display_name'))
+            return 201, None, {'Location': self.url(
+                'users/{0}'.format(address['user_id']))}
+        return 200, self.collection(
+            self.user_resource(user) for user in self.users.values()), {}
+
+    def user(self, method, data, user_ident):
+        user = self.get_user(user_ident)
+        if method == 'DELETE':
+            del self.users[user['user_id']]
+            return 204, None, {}
+        if method == 'PATCH':
+            for key in ('display_name', 'is_server_owner'):
+                if key in data:
+                    user[key] = data[key]
+            return 204, None, {}
+        return 200, self.user_resource(user), {}
+
+    def user_addresses(self, method, data, user_ident):
+        user = self.get_user(user_ident)
+        if method == 'POST':
+            email = data['email'].lower()
+            if email in self.addresses:
+                raise HTTPStatus(400, 'Address already exists')
+            self.addresses[email] = dict(
+                email=email, original_email=data['email'], display_name='',
+                registered_on='2017-01-01T00:00:00', verified_on=None,
+                user_id=user['user_id'])
+            return 201, None, {'Location': self.url('addresses/' + email)}
+        return 200, self.collection(
+            self.address_resource(address)
+            for address in self.addresses.values()
+            if address['user_id'] == user['user_id']), {}
+
+    def addresses_collection(self, method, data):
+        return 200, self.collection(
+            self.address_resource(address)
+            for address in self.addresses.values()), {}
+
+    def address(self, method, data, email):
+        try:
+            address = self.addresses[email.lower()]
+        except KeyError:
+            raise HTTPStatus(404)
+        if method == 'DELETE':
+            del self.addresses[address['email']]
+            return 204, None, {}
+        return 200, self.address_resource(address), {}
+
+    def bans_collection(self, method, data, list_ident=None):
+        list_id = None
+        if list_ident is not None:
+            list_id = self.get_list(list_ident)['list_id']
+        if method == 'POST':
+            email = data['email']
+            if (list_id, email) in self.bans:
+                raise HTTPStatus(400, 'Address is already banned')
+            self.bans.append((list_id, email))
+            return 201, None, {
+                'Location': self.ban_resource(list_id, email)['self_link']}
+        return 200, self.collection(
+            self.ban_resource(ban_list_id, email)
+            for ban_list_id, email in self.bans
+            if ban_list_id == list_id), {}
+
+    def ban(self, method, data, *args):
+        list_id = None
+        if len(args) == 2:
+            list_id = self.get_list(args[0])['list_id']
+        email = args[-1]
+        if (list_id, email) not in self.bans:
+            raise HTTPStatus(404)
+        if method == 'DELETE':
+            self.bans.remove((list_id, email))
+            return 204, None, {}
+        return 200, self.ban_resource(list_id, email), {}
+
+    def hold_message(self, list_id, sender, subject, msg='', reason='test'):
+        """Add a held message to a list, for test setup."""
+        request_id = self.new_id()
+        self.held.setdefault(list_id, OrderedDict())[request_id] = dict(
+            request_id=request_id, sender=sender, subject=subject,
+            reason=reason, msg=msg, hold_date='2017-01-01T00:00:00',
+            message_id='<{0}@example.com>'.format(request_id), type='held')
+        return request_id
+
+    def held_collection(self, method, data, list_ident):
+        list_id = self.get_list(list_ident)['list_id']
+        return 200, self.collection(
+            self.held_resource(list_id, held)
+            for held in self.held.get(list_id, {}).values()), {}
+
+    def held_message(self, method, data, list_ident, request_id):
+        list_id = self.get_list(list_ident)['list_id']
+        held = self.held.get(list_id, {})
+        try:
+            message = held[int(request_id)]
+        except (KeyError, ValueError):
+            raise HTTPStatus(404)
+        if method == 'POST':
+            if data.get('action') not in (
+                    'accept', 'reject', 'discard', 'defer'):
+                raise HTTPStatus(400, 'Invalid action')
+            if data['action'] != 'defer':
+                del held[message['request_id']]
+            return 204, None, {}
+        return 200, self.held_resource(list_id, message), {}
+
+    def requests_collection(self, method, data, list_ident):
+        list_id = self.get_list(list_ident)['list_id']
+        return 200, self.collection(
+            self.request_resource(list_id, request) for request in
+            self.subscription_requests.get(list_id, {}).values()), {}
+
+    def request(self, method, data, list_ident, token):
+        list_id = self.get_list(list_ident)['list_id']
+        pending = self.subscription_requests.get(list_id, {})
+        if token not in pending:
+            raise HTTPStatus(404)
+        if method == 'POST':
+            action = data.get('action')
+            if action not in ('accept', 'reject', 'discard', 'defer'):
+                raise HTTPStatus(400, 'Invalid action')
+            if action != 'defer':
+                request = pending.pop(token)
+                if action == 'accept':
+                    self.add_member(list_id, request['email'])
+            return 204, None, {}
+        return 200, self.request_resource(list_id, pending[token]), {}
+
+    def header_matches_col(self, method, data, list_ident):
+        list_id = self.get_list(list_ident)['list_id']
+        rules = self.header_matches.setdefault(list_id, [])
+        if method == 'POST':
+            rule = dict(header=data['header'].lower(),
+                        pattern=data['pattern'])
+            for key in ('action', 'tag'):
+                if key in data:
+                    rule[key] = data[key]
+            rules.append(rule)
+            return 201, None, {'Location': self.url(
+                'lists/{0}/header-matches/{1}'.format(
+                    list_id, len(rules) - 1))}
+        if method == 'DELETE':
+            del rules[:]
+            return 204, None, {}
+        return 200, self.collection(
+            self.header_match_resource(list_id, position, rule)
+            for position, rule in enumerate(rules)), {}
+
+    def header_match(self, method, data, list_ident, position):
+        list_id = self.get_list(list_ident)['list_id']
+        rules = self.header_matches.setdefault(list_id, [])
+        position = int(position)
+        if position >= len(rules):
+            raise HTTPStatus(404)
+        if method == 'DELETE':
+            del rules[position]
+            return 204, None, {}
+        if method == 'PATCH':
+            rule = rules[position]
+            for key in ('header', 'pattern', 'action', 'tag'):
+                if key in data:
+                    rule[key] = data[key]
+            if 'position' in data:
+                rules.insert(int(data['position']), rules.pop(position))
+            return 204, None, {}
+        return 200, self.header_match_resource(
+            list_id, position, rules[position]), {}
+
+    # WSGI.
+
+    def dispatch(self, method, path, data):
+        for pattern, handler in self._routes:
+            match = pattern.match(path)
+            if match is not None:
+                return handler(method, data, *match.groups())
+        raise HTTPStatus(404)
+
+    def __call__(self, environ, start_response):
+        method = environ['REQUEST_METHOD']
+        # Strip the API version.
+        path = environ['PATH_INFO'].lstrip('/').split('/', 1)[1]
+        self.base_url = '{0}://{1}/{2}/'.format(
+            environ['wsgi.url_scheme'], environ['HTTP_HOST'],
+            environ['PATH_INFO'].lstrip('/').split('/', 1)[0])
+        length = int(environ.get('CONTENT_LENGTH') or 0)
+        body = environ['wsgi.input'].read(length).decode('utf-8')
+        data = dict(parse_qsl(body))
+        headers = {}
+        with self.lock:
+            self.requests.append((method, path))
+            self.query = dict(parse_qsl(environ.get('QUERY_STRING', '')))
+            try:
+                if_match = environ.get('HTTP_IF_MATCH')
+                if if_match is not None and method in ('PATCH', 'DELETE'):
+                    current = self.dispatch('GET', unquote(path), {})[1]
+                    if etag(current) != if_match:
+                        raise HTTPStatus(412)
+                status, content, headers = self.dispatch(
+                    method, unquote(path), data)
+            except HTTPStatus as error:
+                status, content = error.status, error.message
+            if isinstance(content, dict):
+                content = dict(content)
+                content['http_etag'] = etag(content)
+                if (method == 'GET' and content['http_etag'] ==
+                        environ.get('HTTP_IF_NONE_MATCH')):
+                    status, content = 304, None
+                else:
+                    content = json.dumps(content)
+            if content is None:
+                content = ''
+        headers = [(str(key), str(value)) for key, value in headers.items()]
+        if content:
+            headers.append((str('Content-Type'),
+                            str('application/json; charset=UTF-8')))
+        start_response(
+            str('{0} {1}'.format(status, REASONS.get(status, ''))), headers)
+        if isinstance(content, six.text_type):
+            content = content.encode('utf-8')
+        return [content]
+
+
+class FakeMailmanTestCase(unittest.TestCase):
+    """A test case with a new fake Mailman for each test.
+
+    :ivar app: The :class:`FakeMailman`.
+    :ivar client: A :class:`Client` sending its requests to `app`.
+    """
+
+    def setUp(self):
+        self.app = FakeMailman()
+        self.client = self.make_client()
+
+    def make_client(self, transport=None, **kwargs):
+        """Return a new client of the fake Mailman.
+
+        :param transport: The transport of the client.  Defaults to a
+            :class:`WSGITransport` of `app`.
+        :param kwargs: The other arguments of :class:`Client`.
+        """
+        if transport is None:
+            transport = WSGITransport(self.app)
+        return Client('http://localhost:9001/3.1', 'restadmin', 'restpass',
+                      transport=transport, **kwargs)
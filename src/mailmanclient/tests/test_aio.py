@@ -0,0 +1,174 @@
+# Copyright (C) 2017 The Free Software Foundation, Inc.
+#
+# This file is part of mailmanclient.
+#
+# mailmanclient is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation, version 3 of the License.
+#
+# mailmanclient is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
+# or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public
+# License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with mailmanclient.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Test the asyncio client."""
+
+from __future__ import absolute_import, print_function, unicode_literals
+
+import sys
+import threading
+import time
+import unittest
+
+import pytest
+from six.moves.urllib_error import HTTPError
+
+from mailmanclient.restbase.transport import WSGITransport
+from mailmanclient.testing.fake import FakeMailman
+
+# The package uses async/await, which older versions cannot even parse.
+if sys.version_info < (3, 5):
+    pytest.skip('The asyncio client requires Python 3.5 or later',
+                allow_module_level=True)
+
+import asyncio                                                    # noqa
+from mailmanclient.aio import (                                   # noqa
+    AsyncClient, AsyncMailingList, ThreadedTransport)
+
+__metaclass__ = type
+__all__ = [
+    'TestAsyncClient',
+    ]
+
+
+class TestAsyncClient(unittest.TestCase):
+
+    def setUp(self):
+        self.app = FakeMailman()
+        self.loop = asyncio.new_event_loop()
+        self.addCleanup(self.loop.close)
+        asyncio.set_event_loop(self.loop)
+        self.addCleanup(asyncio.set_event_loop, None)
+        self.client = AsyncClient(
+            'http://localhost:9001/3.1', 'restadmin', 'restpass',
+            transport=ThreadedTransport(WSGITransport(self.app), 10),
+            max_concurrency=3)
+        self.addCleanup(lambda: self.wait(self.client.close()))
+
+    def wait(self, coroutine):
+        return self.loop.run_until_complete(coroutine)
+
+    def test_lists(self):
+        domain = self.wait(self.client.create_domain('example.com'))
+        self.assertEqual(domain.mail_host, 'example.com')
+        self.wait(domain.create_list('ant'))
+        self.wait(domain.create_list('bee'))
+        lists = self.wait(self.client.get_lists())
+        self.assertEqual([mlist.fqdn_listname for mlist in lists],
+                         ['ant@example.com', 'bee@example.com'])
+        mlist = self.wait(self.client.get_list('bee@example.com'))
+        self.assertEqual(mlist.list_id, 'bee.example.com')
+        page = self.wait(self.client.get_list_page(count=1))
+        self.assertEqual(len(page), 1)
+        self.assertTrue(page.has_next)
+        page = self.wait(page.next())
+        self.assertEqual(page[0].list_id, 'bee.example.com')
+        self.assertFalse(page.has_next)
+
+    def test_members(self):
+        domain = self.wait(self.client.create_domain('example.com'))
+        mlist = self.wait(domain.create_list('ant'))
+        member = self.wait(mlist.subscribe(
+            'anna@example.com', pre_verified=True, pre_confirmed=True,
+            pre_approved=True))
+        self.assertEqual(member.email, 'anna@example.com')
+        result = self.wait(mlist.subscribe('bill@example.com'))
+        self.assertEqual(result['token_owner'], 'subscriber')
+        members = self.wait(mlist.get_members())
+        self.assertEqual([m.email for m in members], ['anna@example.com'])
+        user = self.wait(member.get_user())
+        subscriptions = self.wait(user.get_subscriptions())
+        self.assertEqual([m.list_id for m in subscriptions],
+                         ['ant.example.com'])
+        self.wait(mlist.unsubscribe('anna@example.com'))
+        self.assertEqual(self.wait(mlist.get_members()), [])
+
+    def test_settings(self):
+        domain = self.wait(self.client.create_domain('example.com'))
+        mlist = self.wait(domain.create_list('ant'))
+        settings = self.wait(mlist.get_settings())
+        self.assertEqual(settings['subject_prefix'], '[Ant] ')
+        settings['subject_prefix'] = '[ants] '
+        settings = self.wait(settings.save())
+        self.assertEqual(settings['subject_prefix'], '[ants] ')
+
+    def test_etag(self):
+        domain = self.wait(self.client.create_domain('example.com'))
+        mlist = self.wait(domain.create_list('ant'))
+        settings = self.wait(mlist.get_settings())
+        self.assertIsNotNone(settings._etag)
+        self.assertNotIn('http_etag', settings.rest_data)
+        # The unchanged data is revalidated and kept.
+        data = settings.rest_data
+        self.wait(settings.fetch())
+        self.assertIs(settings.rest_data, data)
+        # The ETag is renewed on each save.
+        settings['subject_prefix'] = '[ants] '
+        settings = self.wait(settings.save())
+        settings['subject_prefix'] = '[Ants] '
+        settings = self.wait(settings.save())
+        self.assertEqual(settings['subject_prefix'], '[Ants] ')
+        # A concurrent change is detected.
+        other = self.wait(mlist.get_settings())
+        other['subject_prefix'] = '[other] '
+        self.wait(other.save())
+        settings['subject_prefix'] = '[ants] '
+        with self.assertRaises(HTTPError) as cm:
+            self.wait(settings.save())
+        self.assertEqual(cm.exception.code, 412)
+
+    def test_stream(self):
+        with self.assertRaises(TypeError):
+            self.client._connection.stream('lists')
+
+    def test_not_fetched(self):
+        domain = self.wait(self.client.create_domain('example.com'))
+        mlist = self.wait(domain.create_list('ant'))
+        settings = mlist.get_settings()
+        self.assertTrue(asyncio.iscoroutine(settings))
+        self.wait(settings)
+        unfetched = AsyncMailingList(
+            self.client._connection, 'lists/ant.example.com')
+        with self.assertRaises(ValueError):
+            unfetched.list_id
+        self.wait(unfetched.fetch())
+        self.assertEqual(unfetched.list_id, 'ant.example.com')
+
+    def test_bounded_concurrency(self):
+        domain = self.wait(self.client.create_domain('example.com'))
+        lists = [self.wait(domain.create_list('list{0}'.format(i)))
+                 for i in range(10)]
+        running = [0]
+        peak = [0]
+        lock = threading.Lock()
+        app = self.app
+
+        def slow_app(environ, start_response):
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            time.sleep(0.01)
+            try:
+                return app(environ, start_response)
+            finally:
+                with lock:
+                    running[0] -= 1
+        self.client._connection.transport.transport.app = slow_app
+        settings = self.wait(asyncio.gather(
+            *[mlist.get_settings() for mlist in lists]))
+        self.assertEqual(len(settings), 10)
+        self.assertGreater(peak[0], 1)
+        self.assertLessEqual(peak[0], 3)
@@ -0,0 +1,174 @@
+# Copyright (C) 2017 The Free Software Foundation, Inc.
+#
+# This file is part of mailmanclient.
+#
+# mailmanclient is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation, version 3 of the License.
+#
+# mailmanclient is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
+# or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public
+# License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with mailmanclient.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Test the ban lists."""
+
+from __future__ import absolute_import, print_function, unicode_literals
+
+from six.moves.urllib_error import HTTPError
+
+from mailmanclient import BannedAddress
+from mailmanclient.testing.fake import FakeMailmanTestCase
+
+__metaclass__ = type
+__all__ = [
+    'TestBansIndex',
+    'TestBulkBans',
+    ]
+
+
+class TestBansIndex(FakeMailmanTestCase):
+
+    def setUp(self):
+        super(TestBansIndex, self).setUp()
+        self.bans = self.client.bans
+        for i in range(100):
+            self.bans.add('spammer{0}@example.net'.format(i))
+
+    def test_contains(self):
+        self.assertEqual(len(self.bans), 100)
+        del self.app.requests[:]
+        self.assertIn('spammer7@example.net', self.bans)
+        self.assertIn('SPAMMER7@example.net', self.bans)
+        self.assertNotIn('anna@example.com', self.bans)
+        self.assertEqual(self.app.requests, [])
+
+    def test_contains_many(self):
+        del self.app.requests[:]
+        banned = self.bans.contains_many([
+            'anna@example.com', 'Spammer1@example.net',
+            'spammer99@example.net', 'spammer100@example.net'])
+        self.assertEqual(banned, set([
+            'Spammer1@example.net', 'spammer99@example.net']))
+        # The ban list was loaded once.
+        self.assertEqual(self.app.requests, [('GET', 'bans')])
+        self.bans.contains_many(['anna@example.com'])
+        self.assertEqual(len(self.app.requests), 1)
+
+    def test_contains_pattern(self):
+        self.assertEqual(len(self.bans), 100)
+        self.assertNotIn('bob@spam.example.org', self.bans)
+        self.bans.add(r'^.*@spam\.example\.org$')
+        del self.app.requests[:]
+        self.assertIn('bob@spam.example.org', self.bans)
+        self.assertIn('Bob@SPAM.example.org', self.bans)
+        self.assertIn(r'^.*@spam\.example\.org$', self.bans)
+        self.assertNotIn('bob@example.org', self.bans)
+        banned = self.bans.contains_many([
+            'anna@example.com', 'anna@spam.example.org',
+            'spammer1@example.net'])
+        self.assertEqual(banned, set([
+            'anna@spam.example.org', 'spammer1@example.net']))
+        self.assertEqual(self.app.requests, [])
+        # Lifting the pattern ban unbans the addresses it matched.
+        self.bans.remove(r'^.*@spam\.example\.org$')
+        self.assertNotIn('bob@spam.example.org', self.bans)
+
+    def test_find_by_email(self):
+        ban = self.bans.find_by_email('Spammer3@Example.net')
+        self.assertIsInstance(ban, BannedAddress)
+        self.assertEqual(ban.email, 'spammer3@example.net')
+        self.assertIsNone(self.bans.find_by_email('anna@example.com'))
+
+    def test_index_reset(self):
+        self.assertNotIn('anna@example.com', self.bans)
+        self.bans.add('anna@example.com')
+        self.assertIn('anna@example.com', self.bans)
+        self.bans.remove('spammer0@example.net')
+        self.assertNotIn('spammer0@example.net', self.bans)
+        self.assertEqual(len(self.bans), 100)
+
+
+class TestBulkBans(FakeMailmanTestCase):
+
+    def setUp(self):
+        super(TestBulkBans, self).setUp()
+        self.mlist = self.client.create_domain('example.com').create_list(
+            'ant')
+        self.bans = self.mlist.bans
+        self.bans.add('anna@example.com')
+        self.emails = ['spammer{0}@example.net'.format(i) for i in range(20)]
+
+    def test_add_many(self):
+        self.assertEqual(len(self.bans), 1)
+        done = []
+        result = self.bans.add_many(
+            self.emails + ['anna@example.com'], max_workers=4,
+            progress=lambda email, location: done.append(email))
+        self.assertEqual(len(result.succeeded), 20)
+        self.assertIsInstance(result.succeeded[0][1], BannedAddress)
+        self.assertEqual(result.failure_codes, {'anna@example.com': 400})
+        self.assertEqual(len(done), 21)
+        # The cached data was updated instead of being reloaded.
+        del self.app.requests[:]
+        self.assertEqual(len(self.bans), 21)
+        self.assertIn('Spammer5@example.net', self.bans)
+        self.assertEqual(self.bans.find_by_email('spammer5@example.net')
+                         .list_id, 'ant.example.com')
+        self.assertEqual(self.app.requests, [])
+        # Which matches the server.
+        self.bans._reset_cache()
+        self.assertEqual(len(self.bans), 21)
+
+    def test_add_many_not_loaded(self):
+        result = self.bans.add_many(self.emails[:2])
+        self.assertTrue(result.ok)
+        self.assertIsNone(self.bans._rest_data)
+        self.assertEqual(len(self.bans), 3)
+
+    def test_add_keeps_cache(self):
+        self.assertEqual(len(self.bans), 1)
+        self.bans.add('bill@example.com')
+        del self.app.requests[:]
+        self.assertIn('bill@example.com', self.bans)
+        self.assertEqual(len(self.bans), 2)
+        self.assertEqual(self.app.requests, [])
+
+    def test_remove_many(self):
+        self.bans.add_many(self.emails)
+        result = self.bans.remove_many(
+            self.emails[:5] + ['bill@example.com'], max_workers=4)
+        self.assertEqual(len(result.succeeded), 5)
+        self.assertEqual(result.failure_codes, {'bill@example.com': 404})
+        self.assertIsInstance(result.failed[0][1], HTTPError)
+        self.assertEqual(len(self.bans), 16)
+        self.assertNotIn('spammer0@example.net', self.bans)
+        self.bans._reset_cache()
+        self.assertEqual(len(self.bans), 16)
+
+    def test_remove_many_pattern(self):
+        self.bans.add_many(self.emails)
+        result = self.bans.remove_many(
+            ['anna@example.com'], pattern=r'^spammer1\d@example\.NET$')
+        self.assertEqual(len(result.succeeded), 11)
+        self.assertEqual(
+            sorted(ban.email for ban in self.bans),
+            ['spammer{0}@example.net'.format(i) for i in range(10)])
+        self.bans._reset_cache()
+        self.assertEqual(len(self.bans), 10)
+
+    def test_remove_many_special_characters(self):
+        pattern = r'^spammer\d?@example\.com$'
+        self.bans.add(pattern)
+        # Check and remove the ban without loading the list.
+        bans = self.mlist.bans
+        self.assertIn(pattern, bans)
+        result = bans.remove_many([pattern])
+        self.assertTrue(result.ok)
+        self.assertIsNone(bans._rest_data)
+        self.assertNotIn(pattern, self.mlist.bans)
+        self.assertEqual(self.app.bans,
+                         [('ant.example.com', 'anna@example.com')])
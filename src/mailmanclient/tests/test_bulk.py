@@ -0,0 +1,357 @@
+# Copyright (C) 2017 The Free Software Foundation, Inc.
+#
+# This file is part of mailmanclient.
+#
+# mailmanclient is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation, version 3 of the License.
+#
+# mailmanclient is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
+# or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public
+# License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with mailmanclient.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Test the concurrent bulk operations."""
+
+from __future__ import absolute_import, print_function, unicode_literals
+
+import threading
+import time
+import unittest
+from operator import itemgetter
+
+from mailmanclient import WSGITransport
+from mailmanclient.restbase.bulk import (
+    Pending, bulk_apply, run_concurrently)
+from mailmanclient.testing.fake import FakeMailmanTestCase
+
+__metaclass__ = type
+__all__ = [
+    'TestBulkApply',
+    'TestMassSubscription',
+    'TestModerateMessages',
+    'TestModerateRequests',
+    'TestPrefetch',
+    'TestRunConcurrently',
+    'TestSyncMembers',
+    ]
+
+
+class SlowApp:
+    """Wrap a WSGI app to measure the number of simultaneous requests."""
+
+    def __init__(self, app, delay=0.01):
+        self.app = app
+        self.delay = delay
+        self.running = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, environ, start_response):
+        with self.lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        time.sleep(self.delay)
+        try:
+            return self.app(environ, start_response)
+        finally:
+            with self.lock:
+                self.running -= 1
+
+
+class TestRunConcurrently(unittest.TestCase):
+
+    def test_order(self):
+        self.assertEqual(
+            run_concurrently(lambda x: x * 2, range(20), max_workers=4),
+            [x * 2 for x in range(20)])
+
+    def test_exceptions(self):
+        def func(x):
+            if x == 3:
+                raise ValueError(x)
+            return x
+        with self.assertRaises(ValueError):
+            run_concurrently(func, range(5))
+        results = run_concurrently(func, range(5), return_exceptions=True)
+        self.assertEqual(results[:3], [0, 1, 2])
+        self.assertIsInstance(results[3], ValueError)
+        self.assertEqual(results[4], 4)
+
+    def test_empty(self):
+        self.assertEqual(run_concurrently(lambda x: x, []), [])
+
+    def test_progress(self):
+        def func(x):
+            if x == 3:
+                raise ValueError(x)
+            return x * 2
+        done = []
+        results = run_concurrently(
+            func, range(5), return_exceptions=True,
+            progress=lambda item, outcome: done.append((item, outcome)))
+        self.assertEqual(sorted(item for item, outcome in done),
+                         list(range(5)))
+        self.assertEqual(dict(done)[4], 8)
+        self.assertIs(dict(done)[3], results[3])
+
+
+class TestBulkApply(unittest.TestCase):
+
+    def test_outcomes(self):
+        def func(item):
+            name, x = item
+            if x == 1:
+                raise ValueError(x)
+            if x == 2:
+                return Pending('token-2')
+            return x * 2
+        done = []
+        items = [('a', 0), ('b', 1), ('c', 2), ('d', 3)]
+        result = bulk_apply(
+            func, items, max_workers=2, key=itemgetter(0),
+            progress=lambda item, outcome: done.append(item))
+        self.assertEqual(result.succeeded, [('a', 0), ('d', 6)])
+        self.assertEqual(result.pending, [('c', 'token-2')])
+        self.assertEqual([name for name, error in result.failed], ['b'])
+        self.assertIsInstance(result.failed[0][1], ValueError)
+        # The progress function gets the items, not their keys.
+        self.assertEqual(sorted(done), items)
+
+    def test_empty(self):
+        result = bulk_apply(lambda x: x, [])
+        self.assertTrue(result.ok)
+        self.assertEqual(result.succeeded, [])
+
+
+class TestPrefetch(FakeMailmanTestCase):
+
+    def setUp(self):
+        super(TestPrefetch, self).setUp()
+        self.slow_app = SlowApp(self.app)
+        self.client = self.make_client(WSGITransport(self.slow_app))
+        domain = self.client.create_domain('example.com')
+        for i in range(10):
+            domain.create_list('list{0}'.format(i))
+
+    def test_prefetch_settings(self):
+        lists = self.client.prefetch(
+            self.client.lists, attrs=['settings'], max_workers=4)
+        self.assertEqual(len(lists), 10)
+        self.assertGreater(self.slow_app.peak, 1)
+        self.assertLessEqual(self.slow_app.peak, 4)
+        del self.app.requests[:]
+        for mlist in lists:
+            self.assertEqual(mlist.settings['list_id'], mlist.list_id)
+        # Everything was already loaded.
+        self.assertEqual(self.app.requests, [])
+
+    def test_prefetch_lazy_objects(self):
+        domains = self.client.domains
+        self.assertIsNone(domains[0]._rest_data)
+        self.client.prefetch(domains)
+        self.assertEqual(domains[0]._rest_data['mail_host'], 'example.com')
+
+
+class TestMassSubscription(FakeMailmanTestCase):
+
+    def setUp(self):
+        super(TestMassSubscription, self).setUp()
+        self.slow_app = SlowApp(self.app)
+        self.client = self.make_client(WSGITransport(self.slow_app))
+        self.mlist = self.client.create_domain('example.com').create_list(
+            'ant')
+
+    def test_mass_subscribe(self):
+        self.app.add_member('ant.example.com', 'dave@example.com')
+        result = self.mlist.mass_subscribe([
+            'anna@example.com',
+            'bill@example.com',
+            {'address': 'cris@example.com', 'pre_approved': False},
+            'dave@example.com',
+            ], pre_verified=True, pre_confirmed=True, pre_approved=True,
+            max_workers=3)
+        self.assertEqual(
+            [(address, member.address.email)
+             for address, member in result.succeeded],
+            [('anna@example.com', 'anna@example.com'),
+             ('bill@example.com', 'bill@example.com')])
+        self.assertEqual(len(result.pending), 1)
+        address, token = result.pending[0]
+        self.assertEqual(address, 'cris@example.com')
+        self.assertIn(token, self.app.subscription_requests[
+            'ant.example.com'])
+        self.assertFalse(result.ok)
+        self.assertEqual(result.failure_codes, {'dave@example.com': 409})
+        self.assertLessEqual(self.slow_app.peak, 3)
+        self.assertEqual(
+            repr(result), '<BulkResult: 2 succeeded, 1 pending, 1 failed>')
+
+    def test_mass_unsubscribe(self):
+        for email in ('anna@example.com', 'bill@example.com'):
+            self.app.add_member('ant.example.com', email)
+        result = self.mlist.mass_unsubscribe([
+            'anna@example.com', 'bill@example.com', 'cris@example.com'])
+        self.assertEqual([email for email, none in result.succeeded],
+                         ['anna@example.com', 'bill@example.com'])
+        self.assertEqual(result.failure_codes, {'cris@example.com': 404})
+        self.assertEqual(self.mlist.members, [])
+
+
+class TestSyncMembers(FakeMailmanTestCase):
+
+    def setUp(self):
+        super(TestSyncMembers, self).setUp()
+        self.mlist = self.client.create_domain('example.com').create_list(
+            'ant')
+        for email in ('anna@example.com', 'bill@example.com',
+                      'cris@example.com'):
+            self.app.add_member('ant.example.com', email)
+        self.desired = [
+            'Anna@example.com',
+            {'address': 'bill@example.com', 'delivery_mode': 'mime_digests',
+             'moderation_action': 'defer'},
+            {'address': 'dave@example.com', 'display_name': 'Dave',
+             'moderation_action': 'hold'},
+            ]
+
+    def roster(self):
+        return sorted(
+            (member.email, member.delivery_mode, member.moderation_action)
+            for member in self.mlist.members)
+
+    def test_dry_run(self):
+        plan = self.mlist.sync_members(self.desired, dry_run=True)
+        self.assertEqual(plan.subscribe, [
+            {'address': 'dave@example.com', 'display_name': 'Dave'}])
+        self.assertEqual(plan.unsubscribe, ['cris@example.com'])
+        self.assertEqual(plan.update, [
+            ('bill@example.com', {'delivery_mode': 'mime_digests'})])
+        self.assertIsNone(plan.subscribed)
+        self.assertEqual(len(self.mlist.members), 3)
+
+    def test_sync(self):
+        plan = self.mlist.sync_members(
+            self.desired, pre_verified=True, pre_confirmed=True,
+            pre_approved=True)
+        self.assertTrue(plan.subscribed.ok)
+        self.assertTrue(plan.unsubscribed.ok)
+        self.assertEqual(len(plan.updated.succeeded), 2)
+        self.assertEqual(self.roster(), [
+            ('anna@example.com', 'regular', 'defer'),
+            ('bill@example.com', 'mime_digests', 'defer'),
+            ('dave@example.com', 'regular', 'hold'),
+            ])
+        # Nothing is left to do.
+        self.assertTrue(self.mlist.sync_members(
+            self.desired, dry_run=True).empty)
+
+    def test_pending_properties(self):
+        plan = self.mlist.sync_members(self.desired)
+        self.assertEqual(
+            [address for address, token in plan.subscribed.pending],
+            ['dave@example.com'])
+        # The properties of the pending member are reported, not lost.
+        self.assertEqual(plan.pending_properties, {
+            'dave@example.com': {'moderation_action': 'hold'}})
+        self.assertEqual([email for email, changes in plan.updated.succeeded],
+                         ['bill@example.com'])
+
+    def test_only_delta(self):
+        self.mlist.sync_members(self.desired, pre_verified=True,
+                                pre_confirmed=True, pre_approved=True)
+        del self.app.requests[:]
+        self.mlist.sync_members(self.desired)
+        # A single request to read the roster.
+        self.assertEqual(self.app.requests, [
+            ('GET', 'lists/ant@example.com/roster/member')])
+
+
+class TestModerateMessages(FakeMailmanTestCase):
+
+    def setUp(self):
+        super(TestModerateMessages, self).setUp()
+        self.slow_app = SlowApp(self.app)
+        self.client = self.make_client(WSGITransport(self.slow_app))
+        self.mlist = self.client.create_domain('example.com').create_list(
+            'ant')
+        self.spam = [
+            self.app.hold_message(
+                'ant.example.com', 'Spammer@example.net', 'Buy {0}'.format(i),
+                reason='The message is not from a list member')
+            for i in range(6)]
+        self.ham = self.app.hold_message(
+            'ant.example.com', 'anna@example.com', 'Hello',
+            reason='Message has implicit destination')
+
+    def held_ids(self):
+        return sorted(message.request_id for message in self.mlist.held)
+
+    def test_moderate_messages(self):
+        done = []
+        result = self.mlist.moderate_messages(
+            self.spam[:3] + [9999], 'discard', max_workers=4,
+            progress=lambda request_id, error: done.append(request_id))
+        self.assertEqual(sorted(request_id for request_id, none
+                                in result.succeeded), self.spam[:3])
+        self.assertEqual(result.failure_codes, {9999: 404})
+        self.assertEqual(sorted(done), self.spam[:3] + [9999])
+        self.assertGreater(self.slow_app.peak, 1)
+        self.assertEqual(self.held_ids(), self.spam[3:] + [self.ham])
+
+    def test_by_sender(self):
+        result = self.mlist.moderate_held_messages(
+            'discard', sender='spammer@example.net')
+        self.assertEqual(len(result.succeeded), 6)
+        self.assertEqual(self.held_ids(), [self.ham])
+
+    def test_by_reason_and_predicate(self):
+        result = self.mlist.moderate_held_messages(
+            'discard', reason='not from a list member',
+            predicate=lambda message: message.subject.endswith('1'))
+        self.assertEqual(result.succeeded, [(self.spam[1], None)])
+        result = self.mlist.moderate_held_messages(
+            'accept', reason='implicit destination')
+        self.assertEqual(result.succeeded, [(self.ham, None)])
+        self.assertEqual(self.held_ids(), self.spam[:1] + self.spam[2:])
+
+
+class TestModerateRequests(FakeMailmanTestCase):
+
+    def setUp(self):
+        super(TestModerateRequests, self).setUp()
+        self.slow_app = SlowApp(self.app)
+        self.client = self.make_client(WSGITransport(self.slow_app))
+        self.mlist = self.client.create_domain('example.com').create_list(
+            'ant')
+        result = self.mlist.mass_subscribe(
+            ['user{0}@example.com'.format(i) for i in range(5)],
+            pre_verified=True, pre_confirmed=True)
+        self.tokens = [token for email, token in result.pending]
+
+    def test_iter_requests(self):
+        for page_size in (2, None):
+            requests = list(self.mlist.iter_requests(page_size=page_size))
+            self.assertEqual(requests, self.mlist.requests)
+            self.assertEqual(
+                sorted(request['token'] for request in requests),
+                sorted(self.tokens))
+            self.assertEqual(requests[0]['list_id'], 'ant.example.com')
+
+    def test_moderate_requests(self):
+        done = []
+        result = self.mlist.moderate_requests(
+            self.tokens[:3] + ['unknown'], 'accept', max_workers=4,
+            progress=lambda token, error: done.append(token))
+        self.assertEqual(sorted(token for token, none in result.succeeded),
+                         sorted(self.tokens[:3]))
+        self.assertEqual(result.failure_codes, {'unknown': 404})
+        self.assertEqual(len(done), 4)
+        self.assertGreater(self.slow_app.peak, 1)
+        self.assertEqual(len(self.mlist.members), 3)
+        self.assertEqual(
+            sorted(request['token'] for request in self.mlist.requests),
+            sorted(self.tokens[3:]))
@@ -0,0 +1,253 @@
+# Copyright (C) 2017 The Free Software Foundation, Inc.
+#
+# This file is part of mailmanclient.
+#
+# mailmanclient is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation, version 3 of the License.
+#
+# mailmanclient is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
+# or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public
+# License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with mailmanclient.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Test the response cache."""
+
+from __future__ import absolute_import, print_function, unicode_literals
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from mock import patch
+
+from mailmanclient import (
+    Client, MemoryBackend, ResponseCache, SQLiteBackend, WSGITransport)
+from mailmanclient.testing.fake import FakeMailman, FakeMailmanTestCase
+
+__metaclass__ = type
+__all__ = [
+    'TestMemoryBackend',
+    'TestResponseCache',
+    'TestSQLiteBackend',
+    ]
+
+
+class TestResponseCache(FakeMailmanTestCase):
+
+    def setUp(self):
+        super(TestResponseCache, self).setUp()
+        self.cache = ResponseCache(ttl=60, ttls={'users': 0})
+        self.client = self.make_client(cache=self.cache)
+        domain = self.client.create_domain('example.com')
+        domain.create_list('ant')
+        domain.create_list('bee')
+        del self.app.requests[:]
+
+    def test_hit(self):
+        stats = self.cache.stats
+        self.client.get_list('ant@example.com')
+        mlist = self.client.get_list('ant@example.com')
+        self.assertEqual(mlist.list_id, 'ant.example.com')
+        self.assertEqual(self.app.requests,
+                         [('GET', 'lists/ant@example.com')])
+        self.assertEqual(self.cache.stats['hits'] - stats['hits'], 1)
+        self.assertEqual(self.cache.stats['misses'] - stats['misses'], 1)
+
+    def test_credentials(self):
+        self.client.get_list('ant@example.com')
+        other = Client(
+            'http://localhost:9001/3.1', 'otheradmin', 'otherpass',
+            transport=WSGITransport(self.app), cache=self.cache)
+        other.get_list('ant@example.com')
+        self.assertEqual(len(self.app.requests), 2)
+
+    def test_invalidation(self):
+        invalidations = self.cache.stats['invalidations']
+        mlist = self.client.get_list('ant@example.com')
+        self.assertEqual(mlist.member_count, 0)
+        mlist.subscribe('anna@example.com', pre_verified=True,
+                        pre_confirmed=True, pre_approved=True)
+        mlist = self.client.get_list('ant@example.com')
+        self.assertEqual(mlist.member_count, 1)
+        self.assertEqual(
+            self.cache.stats['invalidations'] - invalidations, 1)
+
+    def test_unrelated_invalidation(self):
+        self.client.get_domain('example.com')
+        self.client.bans.add('spam@example.com')
+        self.client.get_domain('example.com')
+        self.assertEqual(self.app.requests.count(
+            ('GET', 'domains/example.com')), 1)
+
+    def test_find_members(self):
+        mlist = self.client.get_list('ant@example.com')
+        mlist.subscribe('anna@example.com', pre_verified=True,
+                        pre_confirmed=True, pre_approved=True)
+        self.client.get_list('ant@example.com')
+        stats = self.cache.stats
+        # Searching the members is a POST which changes nothing.
+        members = mlist.find_members('anna@example.com')
+        self.assertEqual(len(members), 1)
+        self.assertEqual(mlist.nonmembers, [])
+        self.client.get_list('ant@example.com')
+        self.assertEqual(
+            self.cache.stats['invalidations'], stats['invalidations'])
+        self.assertEqual(self.cache.stats['misses'], stats['misses'])
+        self.assertEqual(self.cache.stats['hits'] - stats['hits'], 1)
+
+    def test_ttl(self):
+        with patch('mailmanclient.restbase.cache.time') as mock_time:
+            mock_time.time.return_value = 1000
+            self.client.get_list('ant@example.com')
+            mock_time.time.return_value = 1061
+            self.client.get_list('ant@example.com')
+        self.assertEqual(len(self.app.requests), 2)
+
+    def test_disabled_resource(self):
+        self.client.create_user('anna@example.com', 'secret')
+        del self.app.requests[:]
+        self.client.get_user('anna@example.com')
+        self.client.get_user('anna@example.com')
+        self.assertEqual(len(self.app.requests), 2)
+
+    def test_shared_backend(self):
+        # Two clients, e.g. in different processes, sharing the storage.
+        backend = MemoryBackend()
+        clients = [self.make_client(cache=ResponseCache(backend=backend))
+                   for i in range(2)]
+        self.assertEqual(clients[0].get_list('ant@example.com').member_count,
+                         0)
+        self.assertEqual(clients[1].get_list('ant@example.com').member_count,
+                         0)
+        self.assertEqual(len(self.app.requests), 1)
+        clients[0].get_list('ant@example.com').subscribe(
+            'anna@example.com', pre_verified=True, pre_confirmed=True,
+            pre_approved=True)
+        # The subscription invalidated the response cached by the other one.
+        self.assertEqual(clients[1].get_list('ant@example.com').member_count,
+                         1)
+
+    def test_write_during_read(self):
+        client = self.client
+
+        class RacingTransport(WSGITransport):
+            # Another thread creates a domain while the GET is in flight.
+            raced = False
+
+            def request(self, url, method='GET', body=None, headers=None):
+                result = super(RacingTransport, self).request(
+                    url, method, body, headers)
+                if method == 'GET' and not self.raced:
+                    self.raced = True
+                    client.create_domain('example.org')
+                return result
+
+        client._connection.transport = RacingTransport(self.app)
+        self.assertEqual(len(client.domains), 1)
+        # The response read before the write was not cached.
+        self.assertEqual(len(client.domains), 2)
+        self.assertEqual(len(client.domains), 2)
+        self.assertEqual(self.app.requests.count(('GET', 'domains')), 2)
+
+
+class TestMemoryBackend(unittest.TestCase):
+
+    def setUp(self):
+        self.backend = MemoryBackend(max_size=3)
+
+    def test_get_set_delete(self):
+        self.assertIsNone(self.backend.get('a'))
+        self.backend.set('a', b'1')
+        self.assertEqual(self.backend.get('a'), b'1')
+        self.backend.delete('a')
+        self.assertIsNone(self.backend.get('a'))
+        # Deleting a missing key is not an error.
+        self.backend.delete('a')
+
+    def test_ttl(self):
+        with patch('mailmanclient.restbase.cache.time') as mock_time:
+            mock_time.time.return_value = 1000
+            self.backend.set('a', b'1', 60)
+            self.backend.set('b', b'2')
+            mock_time.time.return_value = 1061
+            self.assertIsNone(self.backend.get('a'))
+            self.assertEqual(self.backend.get('b'), b'2')
+
+    def test_lru(self):
+        self.backend.set('a', b'1')
+        self.backend.set('b', b'2')
+        self.backend.set('c', b'3')
+        self.backend.get('a')
+        # This evicts b, the least recently used.
+        self.backend.set('d', b'4')
+        self.assertEqual(self.backend.evictions, 1)
+        self.assertEqual(len(self.backend), 3)
+        self.assertIsNone(self.backend.get('b'))
+        self.assertEqual(self.backend.get('a'), b'1')
+
+
+class TestSQLiteBackend(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'cache.sqlite')
+        self.backend = SQLiteBackend(self.path, max_size=3)
+
+    def tearDown(self):
+        self.backend.close()
+        shutil.rmtree(self.tmpdir)
+
+    def test_get_set_delete(self):
+        self.assertIsNone(self.backend.get('a'))
+        self.backend.set('a', b'1')
+        self.assertEqual(self.backend.get('a'), b'1')
+        self.backend.set('a', b'2')
+        self.assertEqual(self.backend.get('a'), b'2')
+        self.backend.delete('a')
+        self.assertIsNone(self.backend.get('a'))
+
+    def test_persistent(self):
+        self.backend.set('a', b'1', 60)
+        other = SQLiteBackend(self.path)
+        try:
+            self.assertEqual(other.get('a'), b'1')
+        finally:
+            other.close()
+
+    def test_ttl(self):
+        with patch('mailmanclient.restbase.cache.time') as mock_time:
+            mock_time.time.return_value = 1000
+            self.backend.set('a', b'1', 60)
+            mock_time.time.return_value = 1061
+            self.assertIsNone(self.backend.get('a'))
+
+    def test_eviction(self):
+        with patch('mailmanclient.restbase.cache.time') as mock_time:
+            mock_time.time.return_value = 1000
+            self.backend.set('gen', b'0')
+            self.backend.set('a', b'1', 10)
+            self.backend.set('b', b'2', 20)
+            # This evicts a, the closest to expiry.
+            self.backend.set('c', b'3', 30)
+        self.assertEqual(self.backend.evictions, 1)
+        self.assertEqual(len(self.backend), 3)
+        self.assertIsNone(self.backend.get('a'))
+        self.assertEqual(self.backend.get('gen'), b'0')
+
+    def test_response_cache(self):
+        app = FakeMailman()
+        client = Client(
+            'http://localhost:9001/3.1', 'restadmin', 'restpass',
+            transport=WSGITransport(app),
+            cache=ResponseCache(backend=self.backend))
+        client.create_domain('example.com')
+        del app.requests[:]
+        client.get_domain('example.com')
+        domain = client.get_domain('example.com')
+        self.assertEqual(domain.mail_host, 'example.com')
+        self.assertEqual(app.requests, [('GET', 'domains/example.com')])
@@ -0,0 +1,136 @@
+# Copyright (C) 2017 The Free Software Foundation, Inc.
+#
+# This file is part of mailmanclient.
+#
+# mailmanclient is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation, version 3 of the License.
+#
+# mailmanclient is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
+# or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public
+# License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with mailmanclient.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Test the column-oriented tables."""
+
+from __future__ import absolute_import, print_function, unicode_literals
+
+import unittest
+
+from mock import patch
+
+from mailmanclient.restbase import columns as columns_module
+from mailmanclient.restbase.columns import Columns
+from mailmanclient.testing.fake import FakeMailmanTestCase
+
+__metaclass__ = type
+__all__ = [
+    'TestColumns',
+    'TestMemberColumns',
+    ]
+
+
+class TestColumns(unittest.TestCase):
+
+    def setUp(self):
+        self.columns = Columns(('email', 'role', 'list_id'),
+                               categorical=('role', 'list_id'))
+        self.columns.extend([
+            {'email': 'anna@example.com', 'role': 'member',
+             'list_id': 'ant.example.com'},
+            {'email': 'bill@example.com', 'role': 'owner',
+             'list_id': 'ant.example.com'},
+            {'email': 'cris@example.com', 'role': 'member',
+             'list_id': 'bee.example.com'},
+            {'email': 'anna@example.com', 'role': 'member',
+             'list_id': 'bee.example.com'},
+            {'email': 'dave@example.com', 'list_id': 'bee.example.com'},
+            ])
+
+    def test_columns(self):
+        self.assertEqual(len(self.columns), 5)
+        self.assertEqual(self.columns.categories('role'),
+                         ['member', 'owner', None])
+        self.assertEqual(list(self.columns.codes('role')), [0, 1, 0, 0, 2])
+        self.assertEqual(self.columns.column('role'),
+                         ['member', 'owner', 'member', 'member', None])
+        self.assertEqual(self.columns.column('email')[1], 'bill@example.com')
+        self.assertEqual(sorted(self.columns.to_dict()),
+                         ['email', 'list_id', 'role'])
+
+    def test_count(self):
+        self.assertEqual(self.columns.count('list_id'), {
+            'ant.example.com': 2, 'bee.example.com': 3})
+
+    def test_count_several(self):
+        self.assertEqual(self.columns.count('list_id', 'role'), {
+            ('ant.example.com', 'member'): 1,
+            ('ant.example.com', 'owner'): 1,
+            ('bee.example.com', 'member'): 2,
+            ('bee.example.com', None): 1,
+            })
+
+    def test_count_not_categorical(self):
+        with self.assertRaises(ValueError):
+            self.columns.count('email')
+
+    def test_empty(self):
+        columns = Columns(('role',), categorical=('role',))
+        self.assertEqual(columns.count('role'), {})
+
+    @unittest.skipIf(columns_module.numpy is None, 'NumPy is not installed')
+    def test_numpy(self):
+        arrays = self.columns.to_numpy()
+        self.assertEqual(arrays['role'].tolist(), [0, 1, 0, 0, 2])
+        self.assertEqual(arrays['email'][2], 'cris@example.com')
+
+    @unittest.skipIf(columns_module.numpy is None, 'NumPy is not installed')
+    def test_numpy_append(self):
+        codes = self.columns.to_numpy_codes('role')
+        self.columns.append({'email': 'dave@example.com', 'role': 'admin'})
+        self.assertEqual(codes.tolist(), [0, 1, 0, 0, 2])
+        self.assertEqual(self.columns.to_numpy_codes('role').tolist(),
+                         [0, 1, 0, 0, 2, 3])
+        self.assertEqual(len(self.columns.column('role')), 6)
+
+    def test_no_numpy(self):
+        with patch.object(columns_module, 'numpy', None):
+            with self.assertRaises(ImportError):
+                self.columns.to_numpy()
+            # Counting falls back to pure Python.
+            self.assertEqual(self.columns.count('role')['member'], 3)
+
+
+class TestMemberColumns(FakeMailmanTestCase):
+
+    def setUp(self):
+        super(TestMemberColumns, self).setUp()
+        domain = self.client.create_domain('example.com')
+        self.ant = domain.create_list('ant')
+        domain.create_list('bee')
+        for i in range(3):
+            self.app.add_member(
+                'ant.example.com', 'anna{0}@example.com'.format(i))
+        self.app.add_member('bee.example.com', 'anna0@example.com')
+        self.app.add_member('bee.example.com', 'bill@example.com',
+                            role='owner')
+
+    def test_client(self):
+        for page_size in (None, 2):
+            columns = self.client.get_member_columns(page_size=page_size)
+            self.assertEqual(len(columns), 5)
+            self.assertEqual(columns.count('list_id', 'role'), {
+                ('ant.example.com', 'member'): 3,
+                ('bee.example.com', 'member'): 1,
+                ('bee.example.com', 'owner'): 1,
+                })
+
+    def test_list(self):
+        columns = self.ant.get_member_columns(fields=('email', 'role'))
+        self.assertEqual(columns.fields, ('email', 'role'))
+        self.assertEqual(columns.categorical, frozenset(['role']))
+        self.assertEqual(columns.column('email'), [
+            'anna0@example.com', 'anna1@example.com', 'anna2@example.com'])
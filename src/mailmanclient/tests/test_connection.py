@@ -0,0 +1,74 @@
+# Copyright (C) 2017 The Free Software Foundation, Inc.
+#
+# This file is part of mailmanclient.
+#
+# mailmanclient is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation, version 3 of the License.
+#
+# mailmanclient is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
+# or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public
+# License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with mailmanclient.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Test the connection."""
+
+from __future__ import absolute_import, print_function, unicode_literals
+
+import unittest
+
+from httplib2 import Response
+from mock import Mock, patch
+
+from mailmanclient.restbase.connection import (
+    Connection, MailmanConnectionError)
+from mailmanclient.restbase.transport import WSGITransport
+
+__metaclass__ = type
+__all__ = [
+    'TestConnection',
+    ]
+
+
+def make_http(*args, **kwargs):
+    http = Mock()
+    http.connections = {}
+    http.request.return_value = (Response({'status': 200}), b'{}')
+    return http
+
+
+@patch('mailmanclient.restbase.transport.Http', side_effect=make_http)
+class TestConnection(unittest.TestCase):
+
+    def test_keep_alive(self, http_class):
+        connection = Connection('http://localhost:9001/3.1')
+        connection.call('lists')
+        connection.call('domains')
+        self.assertEqual(http_class.call_count, 1)
+
+    def test_connection_error(self, http_class):
+        connection = Connection('http://localhost:9001/3.1')
+        http_class.side_effect = None
+        http_class.return_value.request.side_effect = IOError
+        with self.assertRaises(MailmanConnectionError):
+            connection.call('lists')
+
+    def test_transport(self, http_class):
+        def app(environ, start_response):
+            start_response('201 Created', [
+                ('Location', 'http://localhost:9001/3.1/domains/example.com'),
+                ])
+            return [b'']
+        connection = Connection(
+            'http://localhost:9001/3.1', transport=WSGITransport(app))
+        response, content = connection.call(
+            'domains', dict(mail_host='example.com'))
+        self.assertEqual(response.status, 201)
+        self.assertEqual(
+            response['location'],
+            'http://localhost:9001/3.1/domains/example.com')
+        self.assertIsNone(content)
+        self.assertEqual(http_class.call_count, 0)
@@ -0,0 +1,177 @@
+# Copyright (C) 2017 The Free Software Foundation, Inc.
+#
+# This file is part of mailmanclient.
+#
+# mailmanclient is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation, version 3 of the License.
+#
+# mailmanclient is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
+# or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public
+# License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with mailmanclient.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Test the bulk management of header matches."""
+
+from __future__ import absolute_import, print_function, unicode_literals
+
+from six.moves.urllib_error import HTTPError
+
+from mailmanclient import WSGITransport
+from mailmanclient.testing.fake import FakeMailmanTestCase
+
+__metaclass__ = type
+__all__ = [
+    'TestHeaderMatchesSync',
+    ]
+
+
+class TestHeaderMatchesSync(FakeMailmanTestCase):
+
+    def setUp(self):
+        super(TestHeaderMatchesSync, self).setUp()
+        self.mlist = self.client.create_domain('example.com').create_list(
+            'ant')
+        self.header_matches = self.mlist.header_matches
+        self.header_matches.add('Subject', 'viagra', 'discard')
+        self.header_matches.add('From', 'spammer', 'discard')
+        self.header_matches.add('X-Spam', 'yes')
+
+    def rules(self):
+        return [(match.header, match.pattern, match.rest_data.get('action'))
+                for match in self.mlist.header_matches]
+
+    def methods(self):
+        return sorted(method for method, path in self.app.requests)
+
+    def test_sync(self):
+        del self.app.requests[:]
+        plan = self.header_matches.sync([
+            ('Subject', 'viagra', 'discard'),
+            ('From', 'spammer', 'hold'),
+            ('X-Spam', 'yes'),
+            {'header': 'To', 'pattern': 'undisclosed', 'action': 'hold'},
+            ])
+        # The changed rule is created again, and a single rule is moved.
+        self.assertEqual(plan.delete, [1])
+        self.assertEqual([rule['pattern'] for rule in plan.create],
+                         ['spammer', 'undisclosed'])
+        self.assertEqual(len(plan.move), 1)
+        self.assertTrue(plan.ok)
+        self.assertEqual(self.methods(),
+                         ['DELETE', 'GET', 'PATCH', 'POST', 'POST'])
+        self.assertEqual(self.rules(), [
+            ('subject', 'viagra', 'discard'),
+            ('from', 'spammer', 'hold'),
+            ('x-spam', 'yes', None),
+            ('to', 'undisclosed', 'hold'),
+            ])
+        # Nothing is left to do, and the cache was refreshed.
+        self.assertTrue(self.header_matches.sync(self.rules()).empty)
+
+    def test_sync_shorter(self):
+        plan = self.header_matches.sync([('Subject', 'cialis', 'discard')])
+        self.assertEqual(plan.delete, [2, 1, 0])
+        self.assertEqual(len(plan.create), 1)
+        self.assertEqual(self.rules(), [('subject', 'cialis', 'discard')])
+        self.assertEqual(len(plan.deleted.succeeded), 3)
+
+    def test_sync_prepend(self):
+        rules = [('X-Rule-{0}'.format(i), 'spam') for i in range(20)]
+        self.header_matches.replace_all(rules)
+        del self.app.requests[:]
+        plan = self.header_matches.sync([('Subject', 'viagra')] + rules)
+        # One creation and one move, whatever the number of rules.
+        self.assertEqual(plan.move, [(20, 0)])
+        self.assertEqual(self.methods(), ['GET', 'PATCH', 'POST'])
+        self.assertEqual(self.rules()[:2], [
+            ('subject', 'viagra', None), ('x-rule-0', 'spam', None)])
+        self.assertEqual(len(self.rules()), 21)
+
+    def test_sync_remove_middle(self):
+        del self.app.requests[:]
+        self.header_matches.sync([
+            ('Subject', 'viagra', 'discard'), ('X-Spam', 'yes')])
+        self.assertEqual(self.methods(), ['DELETE', 'GET'])
+        self.assertEqual(self.rules(), [
+            ('subject', 'viagra', 'discard'), ('x-spam', 'yes', None)])
+
+    def test_sync_reorder(self):
+        del self.app.requests[:]
+        plan = self.header_matches.sync([
+            ('X-Spam', 'yes'),
+            ('Subject', 'viagra', 'discard'),
+            ('From', 'spammer', 'discard'),
+            ])
+        self.assertEqual(plan.delete, [])
+        self.assertEqual(plan.create, [])
+        self.assertEqual(plan.move, [(2, 0)])
+        self.assertEqual(self.methods(), ['GET', 'PATCH'])
+        self.assertEqual(self.rules(), [
+            ('x-spam', 'yes', None),
+            ('subject', 'viagra', 'discard'),
+            ('from', 'spammer', 'discard'),
+            ])
+
+    def test_sync_tag(self):
+        self.header_matches.sync([
+            ('Subject', 'viagra', 'discard', 'pills'),
+            ('From', 'spammer', 'discard'),
+            ('X-Spam', 'yes'),
+            ])
+        self.assertEqual(
+            [match.tag for match in self.mlist.header_matches],
+            ['pills', None, None])
+
+    def test_sync_failure(self):
+        # The sync is not atomic: it stops at the first failure, and is
+        # resumed by the next one.
+        rules = [('To', 'undisclosed'), ('Subject', 'cialis')]
+
+        class FailingTransport(WSGITransport):
+            def request(self, url, method='GET', body=None, headers=None):
+                if method == 'POST' and 'cialis' in body:
+                    raise HTTPError(url, 400, 'Bad Request', None, None)
+                return super(FailingTransport, self).request(
+                    url, method, body, headers)
+
+        client = self.make_client(FailingTransport(self.app))
+        mlist = client.get_list('ant.example.com')
+        plan = mlist.header_matches.sync(rules)
+        self.assertFalse(plan.ok)
+        self.assertEqual(plan.created.failure_codes, {1: 400})
+        self.assertEqual(plan.moved.succeeded, [])
+        self.assertEqual(self.rules(), [('to', 'undisclosed', None)])
+        self.assertTrue(self.header_matches.sync(rules).ok)
+        self.assertEqual(self.rules(), [
+            ('to', 'undisclosed', None), ('subject', 'cialis', None)])
+
+    def test_dry_run(self):
+        del self.app.requests[:]
+        plan = self.header_matches.sync([], dry_run=True)
+        self.assertEqual(plan.delete, [2, 1, 0])
+        self.assertIsNone(plan.deleted)
+        self.assertEqual(self.methods(), ['GET'])
+
+    def test_invalid_patterns(self):
+        del self.app.requests[:]
+        with self.assertRaises(ValueError) as cm:
+            self.header_matches.sync([
+                ('Subject', 'viagra'), ('From', '(spammer'),
+                ('To', '[a-')])
+        self.assertIn('(spammer', str(cm.exception))
+        self.assertIn('[a-', str(cm.exception))
+        with self.assertRaises(ValueError):
+            self.header_matches.replace_all([('From', '*')])
+        # Nothing was sent.
+        self.assertEqual(self.app.requests, [])
+
+    def test_replace_all(self):
+        result = self.header_matches.replace_all([
+            ('To', 'undisclosed', 'hold'), ('Subject', 'cialis')])
+        self.assertEqual(len(result.succeeded), 2)
+        self.assertEqual(self.rules(), [
+            ('to', 'undisclosed', 'hold'), ('subject', 'cialis', None)])
@@ -0,0 +1,114 @@
+# Copyright (C) 2017 The Free Software Foundation, Inc.
+#
+# This file is part of mailmanclient.
+#
+# mailmanclient is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation, version 3 of the License.
+#
+# mailmanclient is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
+# or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public
+# License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with mailmanclient.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Test the held message summaries."""
+
+from __future__ import absolute_import, print_function, unicode_literals
+
+import gc
+
+from mailmanclient import (
+    Client, HeldMessage, HeldMessageSummary, WSGITransport)
+from mailmanclient.restbase.cache import MemoryBackend
+from mailmanclient.restobjects import held_message
+from mailmanclient.testing.fake import FakeMailmanTestCase
+
+__metaclass__ = type
+__all__ = [
+    'TestHeldMessageSummary',
+    ]
+
+
+class TestHeldMessageSummary(FakeMailmanTestCase):
+
+    def setUp(self):
+        super(TestHeldMessageSummary, self).setUp()
+        self.mlist = self.client.create_domain('example.com').create_list(
+            'ant')
+        self.ids = [
+            self.app.hold_message(
+                'ant.example.com', 'anna@example.com', 'Post {0}'.format(i),
+                msg='Subject: Post {0}\n\n{1}'.format(i, 'x' * 1000))
+            for i in range(3)]
+        held_message._body_caches[self.client._connection] = MemoryBackend(2)
+
+    def held_gets(self):
+        return [request for request in self.app.requests
+                if '/held/' in request[1]]
+
+    def test_summaries(self):
+        summaries = self.mlist.held_summaries
+        self.assertEqual([summary.subject for summary in summaries],
+                         ['Post 0', 'Post 1', 'Post 2'])
+        self.assertIsInstance(summaries[0], HeldMessage)
+        self.assertNotIn('msg', summaries[0].rest_data)
+        self.assertEqual(summaries[0].request_id, self.ids[0])
+
+    def test_lazy_body(self):
+        summary = self.mlist.held_summaries[1]
+        del self.app.requests[:]
+        self.assertTrue(summary.msg.startswith('Subject: Post 1\n'))
+        self.assertEqual(len(self.held_gets()), 1)
+        # The body is cached.
+        self.assertTrue(summary.msg.startswith('Subject: Post 1\n'))
+        self.assertEqual(len(self.held_gets()), 1)
+        self.assertNotIn('msg', summary.rest_data)
+
+    def test_lru(self):
+        summaries = list(self.mlist.iter_held(page_size=2, summary=True))
+        for summary in summaries:
+            summary.msg
+        del self.app.requests[:]
+        summaries[2].msg
+        self.assertEqual(self.held_gets(), [])
+        # The first body was evicted.
+        summaries[0].msg
+        self.assertEqual(len(self.held_gets()), 1)
+
+    def test_page(self):
+        page = self.mlist.get_held_page(count=2, summary=True)
+        self.assertEqual(len(page), 2)
+        self.assertIsInstance(page[0], HeldMessageSummary)
+        self.assertIsInstance(self.mlist.get_held_page()[0], HeldMessage)
+
+    def test_lazy_summary(self):
+        summary = HeldMessageSummary(
+            self.client._connection,
+            'lists/ant@example.com/held/{0}'.format(self.ids[0]))
+        self.assertEqual(summary.subject, 'Post 0')
+        self.assertNotIn('msg', summary.rest_data)
+        # The body came with the data.
+        del self.app.requests[:]
+        self.assertTrue(summary.msg.startswith('Subject: Post 0\n'))
+        self.assertEqual(self.app.requests, [])
+
+    def test_cache_per_connection(self):
+        other = Client(
+            'http://localhost:9001/3.1', 'moderator', 'secret',
+            transport=WSGITransport(self.app))
+        self.mlist.held_summaries[0].msg
+        del self.app.requests[:]
+        # The body cached for another user is not used.
+        summary = other.get_list('ant.example.com').held_summaries[0]
+        self.assertTrue(summary.msg.startswith('Subject: Post 0\n'))
+        self.assertEqual(len(self.held_gets()), 1)
+        self.assertIsNot(summary.body_cache,
+                         self.mlist.held_summaries[0].body_cache)
+        # The cache goes away with its connection.
+        caches = len(held_message._body_caches)
+        del other, summary
+        gc.collect()
+        self.assertEqual(len(held_message._body_caches), caches - 1)
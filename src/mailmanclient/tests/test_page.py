@@ -18,6 +18,7 @@
 
 from __future__ import absolute_import, print_function, unicode_literals
 
+import time
 import unittest
 
 import pytest
@@ -26,9 +27,11 @@ from six.moves.urllib_parse import urlsplit, parse_qs
 
 from mailmanclient.constants import DEFAULT_PAGE_ITEM_COUNT
 from mailmanclient.restbase.page import Page
+from mailmanclient.testing.fake import FakeMailmanTestCase
 
 __metaclass__ = type
 __all__ = [
+    'TestIterEntries',
     'TestPage',
     ]
 
@@ -56,3 +59,76 @@ class TestPage(unittest.TestCase):
             "count": [str(DEFAULT_PAGE_ITEM_COUNT)],
             "page": ["1"],
             })
+
+
+class TestIterEntries(FakeMailmanTestCase):
+
+    def setUp(self):
+        super(TestIterEntries, self).setUp()
+        self.mlist = self.client.create_domain('example.com').create_list(
+            'ant')
+        for i in range(5):
+            self.app.add_member(
+                'ant.example.com', 'anna{0}@example.com'.format(i))
+        # Load the list data.
+        self.mlist.list_id
+        del self.app.requests[:]
+
+    def test_lazy(self):
+        members = self.mlist.iter_members(page_size=2)
+        self.assertEqual(self.app.requests, [])
+        self.assertEqual(next(members).email, 'anna0@example.com')
+        self.assertEqual(len(self.app.requests), 1)
+        self.assertEqual([member.email for member in members], [
+            'anna1@example.com', 'anna2@example.com', 'anna3@example.com',
+            'anna4@example.com'])
+        self.assertEqual(len(self.app.requests), 3)
+
+    def test_read_ahead(self):
+        members = self.mlist.iter_members(page_size=1, read_ahead=2)
+        self.assertEqual(next(members).email, 'anna0@example.com')
+        # The next two pages are requested in the background.
+        deadline = time.time() + 5
+        while len(self.app.requests) < 3 and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(len(self.app.requests), 3)
+        self.assertEqual([member.email for member in members], [
+            'anna1@example.com', 'anna2@example.com', 'anna3@example.com',
+            'anna4@example.com'])
+        # Nothing is requested past the last page.
+        self.assertEqual(len(self.app.requests), 5)
+
+    def test_read_ahead_close(self):
+        members = self.mlist.iter_members(page_size=2, read_ahead=1)
+        next(members)
+        members.close()
+        self.assertLessEqual(len(self.app.requests), 2)
+
+    def test_exact_pages(self):
+        self.app.add_member('ant.example.com', 'anna5@example.com')
+        self.assertEqual(len(list(self.client.iter_members(page_size=3))), 6)
+        self.assertEqual(len(self.app.requests), 2)
+
+    def test_empty(self):
+        self.assertEqual(list(self.mlist.iter_held()), [])
+
+    def test_nonmembers(self):
+        self.app.add_member(
+            'ant.example.com', 'bill@example.com', role='nonmember')
+        self.assertEqual(
+            [member.email for member in self.mlist.iter_nonmembers()],
+            ['bill@example.com'])
+
+    def test_held(self):
+        for i in range(3):
+            self.app.hold_message(
+                'ant.example.com', 'bill@example.com', 'Spam {0}'.format(i))
+        self.assertEqual(
+            [held.subject for held in self.mlist.iter_held(page_size=2)],
+            ['Spam 0', 'Spam 1', 'Spam 2'])
+
+    def test_lists(self):
+        self.client.get_domain('example.com').create_list('bee')
+        self.assertEqual(
+            [mlist.list_id for mlist in self.client.iter_lists(page_size=1)],
+            ['ant.example.com', 'bee.example.com'])
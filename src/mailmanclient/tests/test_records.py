@@ -0,0 +1,100 @@
+# Copyright (C) 2017 The Free Software Foundation, Inc.
+#
+# This file is part of mailmanclient.
+#
+# mailmanclient is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation, version 3 of the License.
+#
+# mailmanclient is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
+# or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public
+# License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with mailmanclient.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Test the compact records."""
+
+from __future__ import absolute_import, print_function, unicode_literals
+
+import pickle
+import unittest
+
+from mailmanclient import Client, Member, WSGITransport
+from mailmanclient.restbase.records import iter_records, record_type
+from mailmanclient.testing.fake import FakeMailman
+
+__metaclass__ = type
+__all__ = [
+    'TestRecords',
+    ]
+
+
+def member_entry(i):
+    return {
+        'delivery_mode': 'regular',
+        'email': 'anna{0}@example.com'.format(i),
+        'list_id': 'ant.example.com',
+        'moderation_action': 'defer',
+        'role': 'member',
+        'self_link': 'http://localhost:9001/3.1/members/{0}'.format(i),
+        'address': 'http://localhost:9001/3.1/addresses/anna{0}'.format(i),
+        'http_etag': '"1234"',
+        }
+
+
+class TestRecords(unittest.TestCase):
+
+    def test_record_type(self):
+        cls = record_type(Member)
+        self.assertIs(record_type(Member), cls)
+        self.assertEqual(cls.__name__, 'MemberRecord')
+        self.assertEqual(cls._fields, Member._properties)
+
+    def test_slots(self):
+        record = next(iter_records(Member, [member_entry(1)]))
+        self.assertEqual(record.email, 'anna1@example.com')
+        self.assertEqual(record.role, 'member')
+        self.assertFalse(hasattr(record, '__dict__'))
+        # Only the properties are kept.
+        self.assertFalse(hasattr(record, 'address'))
+        with self.assertRaises(AttributeError):
+            record.role = 'owner'
+
+    def test_missing_property(self):
+        entry = member_entry(1)
+        del entry['moderation_action']
+        record = next(iter_records(Member, [entry]))
+        self.assertIsNone(record.moderation_action)
+
+    def test_shared_strings(self):
+        first, second = iter_records(Member, [
+            member_entry(1), member_entry(2)])
+        self.assertIs(first.list_id, second.list_id)
+        self.assertIs(first.role, second.role)
+
+    def test_equality_and_pickle(self):
+        record = next(iter_records(Member, [member_entry(1)]))
+        same = next(iter_records(Member, [member_entry(1)]))
+        self.assertEqual(record, same)
+        self.assertEqual(hash(record), hash(same))
+        self.assertNotEqual(
+            record, next(iter_records(Member, [member_entry(2)])))
+        self.assertEqual(pickle.loads(pickle.dumps(record)), record)
+        self.assertEqual(record._asdict()['email'], 'anna1@example.com')
+
+    def test_iter_members(self):
+        app = FakeMailman()
+        client = Client(
+            'http://localhost:9001/3.1', 'restadmin', 'restpass',
+            transport=WSGITransport(app))
+        mlist = client.create_domain('example.com').create_list('ant')
+        for i in range(3):
+            app.add_member('ant.example.com', 'anna{0}@example.com'.format(i))
+        records = list(mlist.iter_members(page_size=2, compact=True))
+        self.assertEqual([record.email for record in records], [
+            'anna0@example.com', 'anna1@example.com', 'anna2@example.com'])
+        member = records[0].to_object(client._connection)
+        self.assertIsInstance(member, Member)
+        self.assertEqual(member.address.email, 'anna0@example.com')
@@ -0,0 +1,310 @@
+# Copyright (C) 2017 The Free Software Foundation, Inc.
+#
+# This file is part of mailmanclient.
+#
+# mailmanclient is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation, version 3 of the License.
+#
+# mailmanclient is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
+# or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public
+# License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with mailmanclient.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Test the REST base classes."""
+
+from __future__ import absolute_import, print_function, unicode_literals
+
+import unittest
+
+from mock import patch
+from six.moves.urllib_error import HTTPError
+
+from mailmanclient import Member, User, WSGITransport
+from mailmanclient.restbase.base import RESTObject, RESTProperty
+from mailmanclient.testing.fake import FakeMailmanTestCase
+
+__metaclass__ = type
+__all__ = [
+    'TestEtags',
+    'TestIncrementalCache',
+    'TestPropertyAttributes',
+    ]
+
+
+class RecordingTransport(WSGITransport):
+    """Record the headers of each request."""
+
+    def __init__(self, app):
+        super(RecordingTransport, self).__init__(app)
+        self.sent = []
+        self.statuses = []
+
+    def request(self, url, method='GET', body=None, headers=None):
+        self.sent.append((method, url, headers))
+        response, content = super(RecordingTransport, self).request(
+            url, method, body, headers)
+        self.statuses.append(response.status)
+        return response, content
+
+
+class TestEtags(FakeMailmanTestCase):
+
+    def setUp(self):
+        super(TestEtags, self).setUp()
+        self.transport = RecordingTransport(self.app)
+        self.client = self.make_client(self.transport)
+        self.mlist = self.client.create_domain('example.com').create_list(
+            'ant')
+
+    def test_revalidation(self):
+        settings = self.mlist.settings
+        data = settings.rest_data
+        self.assertNotIn('http_etag', data)
+        self.assertIsNotNone(settings._etag)
+        settings._reset_cache()
+        self.transport.statuses = []
+        self.assertIs(settings.rest_data, data)
+        self.assertEqual(self.transport.statuses, [304])
+        self.assertEqual(self.transport.sent[-1][2]['If-None-Match'],
+                         settings._etag)
+
+    def test_revalidation_changed(self):
+        settings = self.mlist.settings
+        self.assertEqual(settings['description'], '')
+        self.app.lists['ant.example.com']['settings']['description'] = 'Ants'
+        settings._reset_cache()
+        self.assertEqual(settings['description'], 'Ants')
+        self.assertEqual(self.transport.statuses[-1], 200)
+
+    def test_list_revalidation(self):
+        bans = self.mlist.bans
+        bans.add('bill@example.com')
+        self.assertEqual(len(bans), 1)
+        bans._reset_cache()
+        self.transport.statuses = []
+        self.assertEqual(len(bans), 1)
+        self.assertEqual(self.transport.statuses, [304])
+
+    def test_save_if_match(self):
+        settings = self.mlist.settings
+        settings['description'] = 'Ants'
+        settings.save()
+        method, url, headers = self.transport.sent[-1]
+        self.assertEqual(method, 'PATCH')
+        self.assertIn('If-Match', headers)
+        self.assertEqual(settings['description'], 'Ants')
+
+    def test_save_twice(self):
+        settings = self.mlist.settings
+        settings['description'] = 'Ants'
+        settings.save()
+        settings['display_name'] = 'Ant'
+        settings.save()
+        self.assertEqual(settings['description'], 'Ants')
+        self.assertEqual(settings['display_name'], 'Ant')
+
+    def test_save_twice_user(self):
+        user = self.client.create_user('anna@example.com', 'secret')
+        user.display_name
+        user.display_name = 'Anna'
+        user.save()
+        user.password = 'other secret'
+        user.save()
+        self.assertEqual(user.display_name, 'Anna')
+
+    def test_save_conflict(self):
+        settings = self.mlist.settings
+        settings['description'] = 'Ants'
+        # Someone else changes the settings in the meantime.
+        self.app.lists['ant.example.com']['settings']['description'] = 'Bees'
+        with self.assertRaises(HTTPError) as cm:
+            settings.save()
+        self.assertEqual(cm.exception.code, 412)
+
+
+class TestIncrementalCache(FakeMailmanTestCase):
+
+    def setUp(self):
+        super(TestIncrementalCache, self).setUp()
+        self.mlist = self.client.create_domain('example.com').create_list(
+            'ant')
+
+    def gets(self):
+        return [request for request in self.app.requests
+                if request[0] == 'GET']
+
+    def test_header_matches(self):
+        header_matches = self.mlist.header_matches
+        header_matches.add('Subject', 'spam')
+        self.assertEqual(len(header_matches), 1)
+        del self.app.requests[:]
+        header_matches.add('X-Spam', 'yes', 'discard')
+        self.assertEqual(
+            [(match.header, match.pattern, match.position)
+             for match in header_matches],
+            [('subject', 'spam', 0), ('x-spam', 'yes', 1)])
+        self.assertEqual(header_matches[1].action, 'discard')
+        self.assertEqual(self.gets(), [])
+        # The local entries match the server's.
+        data = header_matches.rest_data
+        header_matches._reset_cache()
+        self.assertEqual(
+            [dict(entry, self_link=None) for entry in data],
+            [dict(entry, self_link=None)
+             for entry in header_matches.rest_data])
+
+    def test_delitem_and_clear(self):
+        header_matches = self.mlist.header_matches
+        for header in ('Subject', 'From', 'To'):
+            header_matches.add(header, 'spam')
+        self.assertEqual(len(header_matches), 3)
+        del self.app.requests[:]
+        del header_matches[2]
+        self.assertEqual([match.header for match in header_matches],
+                         ['subject', 'from'])
+        header_matches.clear()
+        self.assertEqual(len(header_matches), 0)
+        self.assertEqual(self.gets(), [])
+
+    def test_delitem_twice(self):
+        header_matches = self.mlist.header_matches
+        for header in ('X-A', 'X-B', 'X-C'):
+            header_matches.add(header, 'spam')
+        self.assertEqual(len(header_matches), 3)
+        del header_matches[0]
+        del header_matches[0]
+        self.assertEqual([match.header for match in header_matches],
+                         ['x-c'])
+        self.assertEqual(
+            [(match.position, match.self_link) for match in header_matches],
+            [(0, 'http://localhost:9001/3.1/lists/ant.example.com/'
+              'header-matches/0')])
+        # The server agrees.
+        self.assertEqual(
+            [match.header for match in self.mlist.header_matches],
+            ['x-c'])
+
+    def test_addresses(self):
+        user = self.client.create_user('anna@example.com', 'secret')
+        user.add_address('anna@example.org')
+        addresses = user.addresses
+        self.assertEqual(len(addresses), 2)
+        address = addresses.find_by_email('Anna@Example.org')
+        self.assertEqual(address.email, 'anna@example.org')
+        self.assertIsNone(addresses.find_by_email('bill@example.com'))
+        del self.app.requests[:]
+        addresses.remove('ANNA@example.org')
+        self.assertEqual([address.email for address in addresses],
+                         ['anna@example.com'])
+        self.assertIsNone(addresses.find_by_email('anna@example.org'))
+        self.assertEqual(self.gets(), [])
+        with self.assertRaises(ValueError):
+            addresses.remove('anna@example.org')
+
+    def test_background_revalidation(self):
+        bans = self.mlist.bans
+        bans.revalidate = True
+        self.assertEqual(len(bans), 0)
+        # Someone else bans an address in the meantime.
+        self.app.bans.append(('ant.example.com', 'bill@example.com'))
+        bans.add('anna@example.com')
+        self.assertIn('anna@example.com', bans)
+        bans._revalidation.join()
+        self.assertEqual(sorted(ban.email for ban in bans),
+                         ['anna@example.com', 'bill@example.com'])
+        self.assertIn('bill@example.com', bans)
+
+    def test_index(self):
+        user = self.client.create_user('anna@example.com', 'secret')
+        addresses = user.addresses
+        with patch.object(addresses, '_factory') as factory:
+            addresses.find_by_email('anna@example.com')
+        # Only the matching address is instantiated.
+        self.assertEqual(factory.call_count, 1)
+        self.assertIsNotNone(addresses._key_index)
+        addresses._reset_cache()
+        self.assertIsNone(addresses._key_index)
+
+    def test_lock_per_instance(self):
+        # The lists of different users or mailing lists don't contend.
+        self.assertIsNot(self.mlist.bans._cache_lock,
+                         self.client.bans._cache_lock)
+        self.assertIsNot(self.mlist.bans._cache_lock,
+                         self.mlist.bans._cache_lock)
+
+    def test_index_reset_while_building(self):
+        user = self.client.create_user('anna@example.com', 'secret')
+        addresses = user.addresses
+        self.assertEqual(len(addresses), 1)
+        lock = addresses._cache_lock
+
+        class ResettingLock:
+            # The cached entries are reset just before the index is built.
+            def __enter__(self):
+                addresses._cache_lock = lock
+                addresses._reset_cache()
+                lock.acquire()
+
+            def __exit__(self, *exc_info):
+                lock.release()
+
+        addresses._cache_lock = ResettingLock()
+        address = addresses.find_by_email('anna@example.com')
+        self.assertEqual(address.email, 'anna@example.com')
+        # The index of the old entries is not published.
+        self.assertIsNone(addresses._key_index)
+
+    def test_stale_revalidation(self):
+        bans = self.mlist.bans
+        self.assertEqual(len(bans), 0)
+        version = bans._cache_version
+        bans.add('anna@example.com')
+        self.app.bans.remove(('ant.example.com', 'anna@example.com'))
+        # A revalidation started before the last change is ignored.
+        bans._revalidate(version)
+        self.assertIn('anna@example.com', bans)
+        bans._revalidate(bans._cache_version)
+        self.assertNotIn('anna@example.com', bans)
+
+
+class TestPropertyAttributes(unittest.TestCase):
+
+    def setUp(self):
+        self.member = Member(None, 'members/1', {
+            'email': 'anna@example.com', 'role': 'member',
+            'self_link': 'members/1'})
+
+    def test_descriptors(self):
+        self.assertIsInstance(Member.__dict__['email'], RESTProperty)
+        self.assertEqual(Member._property_set, frozenset(Member._properties))
+        # Properties are read without going through __getattr__.
+        with patch.object(RESTObject, '__getattr__') as getattr_:
+            self.assertEqual(self.member.email, 'anna@example.com')
+        self.assertFalse(getattr_.called)
+
+    def test_missing_value(self):
+        self.assertIsNone(self.member.moderation_action)
+
+    def test_unknown_attribute(self):
+        with self.assertRaises(AttributeError):
+            self.member.spam
+
+    def test_write(self):
+        self.member.moderation_action = 'hold'
+        self.assertEqual(self.member._changed_rest_data,
+                         {'moderation_action': 'hold'})
+        with self.assertRaises(ValueError):
+            self.member.email = 'bill@example.com'
+        # Other attributes are plain instance attributes.
+        self.member.spam = 'eggs'
+        self.assertEqual(self.member.__dict__['spam'], 'eggs')
+
+    def test_user_password(self):
+        user = User(None, 'users/1', {'self_link': 'users/1'})
+        user.password = 'secret'
+        self.assertEqual(user._changed_rest_data,
+                         {'cleartext_password': 'secret'})
@@ -0,0 +1,190 @@
+# Copyright (C) 2017 The Free Software Foundation, Inc.
+#
+# This file is part of mailmanclient.
+#
+# mailmanclient is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation, version 3 of the License.
+#
+# mailmanclient is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
+# or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public
+# License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with mailmanclient.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Test the local snapshots of a site."""
+
+from __future__ import absolute_import, print_function, unicode_literals
+
+import os
+import shutil
+import tempfile
+
+from mailmanclient import Address, MailingList, Member, Snapshot, User
+from mailmanclient.testing.fake import FakeMailmanTestCase
+
+__metaclass__ = type
+__all__ = [
+    'TestSnapshot',
+    ]
+
+
+class TestSnapshot(FakeMailmanTestCase):
+
+    def setUp(self):
+        super(TestSnapshot, self).setUp()
+        example = self.client.create_domain('example.com')
+        self.ant = example.create_list('ant')
+        example.create_list('bee')
+        self.client.create_domain('example.org').create_list('cat')
+        self.app.add_member('ant.example.com', 'anna@example.com')
+        self.app.add_member('bee.example.com', 'anna@example.com',
+                            role='owner')
+        self.app.add_member('cat.example.org', 'bill@example.com')
+        self.ant.bans.add('spam@example.net')
+        self.client.bans.add('troll@example.net')
+        self.snapshot = self.client.snapshot()
+
+    def test_queries(self):
+        del self.app.requests[:]
+        self.assertEqual([domain.mail_host
+                          for domain in self.snapshot.domains],
+                         ['example.com', 'example.org'])
+        self.assertEqual(
+            [mlist.list_id for mlist in self.snapshot.get_lists(
+                mail_host='example.com')],
+            ['ant.example.com', 'bee.example.com'])
+        mlist = self.snapshot.get_list('Ant@example.com')
+        self.assertIsInstance(mlist, MailingList)
+        self.assertEqual(mlist.list_id, 'ant.example.com')
+        self.assertEqual(self.snapshot.get_list('ant.example.com').list_id,
+                         'ant.example.com')
+        user = self.snapshot.get_user('anna@example.com')
+        self.assertIsInstance(user, User)
+        self.assertEqual(self.snapshot.get_user(user.user_id).user_id,
+                         user.user_id)
+        address = self.snapshot.get_address('ANNA@example.com')
+        self.assertIsInstance(address, Address)
+        self.assertEqual(
+            [address.email for address in self.snapshot.get_addresses(
+                user.user_id)], ['anna@example.com'])
+        self.assertEqual(self.app.requests, [])
+
+    def test_members(self):
+        del self.app.requests[:]
+        members = self.snapshot.find_members(address='anna@example.com')
+        self.assertEqual(sorted(member.list_id for member in members),
+                         ['ant.example.com', 'bee.example.com'])
+        self.assertIsInstance(members[0], Member)
+        self.assertEqual(
+            len(self.snapshot.find_members(
+                address='anna@example.com', role='owner')), 1)
+        user = self.snapshot.get_user('bill@example.com')
+        self.assertEqual(
+            [member.list_id for member in self.snapshot.find_members(
+                user_id=user.user_id)], ['cat.example.org'])
+        member = self.snapshot.get_member('ant@example.com',
+                                          'anna@example.com')
+        self.assertEqual(member.role, 'member')
+        with self.assertRaises(KeyError):
+            self.snapshot.get_member('bee@example.com', 'anna@example.com')
+        self.assertEqual(len(self.snapshot.members), 3)
+        self.assertEqual(self.app.requests, [])
+
+    def test_bans(self):
+        self.assertTrue(self.snapshot.is_banned('spam@example.net',
+                                                'ant.example.com'))
+        self.assertFalse(self.snapshot.is_banned('spam@example.net',
+                                                 'bee.example.com'))
+        self.assertTrue(self.snapshot.is_banned('Troll@example.net'))
+        self.assertEqual(
+            [ban.email for ban in self.snapshot.get_bans()],
+            ['troll@example.net'])
+
+    def test_pattern_bans(self):
+        self.client.bans.add(r'^.*@spam\.example$')
+        self.ant.bans.add(r'^bot\d+@')
+        self.assertFalse(self.snapshot.is_banned('joe@spam.example'))
+        self.snapshot.refresh(['bans'])
+        del self.app.requests[:]
+        self.assertTrue(self.snapshot.is_banned('joe@spam.example'))
+        self.assertTrue(self.snapshot.is_banned('Joe@SPAM.example',
+                                                'ant.example.com'))
+        self.assertFalse(self.snapshot.is_banned('joe@spam.example.com'))
+        self.assertTrue(self.snapshot.is_banned('bot12@example.com',
+                                                'ant.example.com'))
+        self.assertFalse(self.snapshot.is_banned('bot12@example.com'))
+        self.assertEqual(self.app.requests, [])
+        # Lifting the ban is seen on the next refresh.
+        self.client.bans.remove(r'^.*@spam\.example$')
+        self.snapshot.refresh(['bans'])
+        self.assertFalse(self.snapshot.is_banned('joe@spam.example'))
+
+    def test_missing(self):
+        with self.assertRaises(KeyError):
+            self.snapshot.get_list('ant@example.net')
+        with self.assertRaises(KeyError):
+            self.snapshot.get_user('cris@example.com')
+
+    def test_incremental_refresh(self):
+        self.assertEqual(self.snapshot.refresh(), {
+            'domains': (0, 0), 'lists': (0, 0), 'users': (0, 0),
+            'addresses': (0, 0), 'members': (0, 0), 'bans': (0, 0)})
+        self.app.add_member('cat.example.org', 'cris@example.com')
+        self.ant.unsubscribe('anna@example.com')
+        changes = self.snapshot.refresh(collections=['members', 'users'])
+        self.assertEqual(changes, {'members': (1, 1), 'users': (1, 0)})
+        self.assertEqual(
+            [member.list_id for member in self.snapshot.find_members(
+                address='anna@example.com')], ['bee.example.com'])
+        self.assertEqual(
+            len(self.snapshot.find_members(list_id='cat.example.org')), 2)
+        with self.assertRaises(ValueError):
+            self.snapshot.refresh(collections=['queues'])
+
+    def test_refresh_list(self):
+        self.app.add_member('ant.example.com', 'cris@example.com')
+        self.app.add_member('cat.example.org', 'dave@example.com')
+        self.ant.bans.remove('spam@example.net')
+        del self.app.requests[:]
+        changes = self.snapshot.refresh_list('ant@example.com')
+        self.assertEqual(changes['members'], (1, 0))
+        self.assertEqual(changes['bans'], (0, 1))
+        self.assertEqual(len(self.app.requests), 3)
+        self.assertFalse(self.snapshot.is_banned('spam@example.net',
+                                                 'ant.example.com'))
+        # The other lists are left alone.
+        self.assertEqual(
+            len(self.snapshot.find_members(list_id='cat.example.org')), 1)
+        # A deleted list is removed with its members.
+        self.client.delete_list('ant@example.com')
+        self.snapshot.refresh_list('ant@example.com')
+        with self.assertRaises(KeyError):
+            self.snapshot.get_list('ant@example.com')
+        self.assertEqual(
+            self.snapshot.find_members(list_id='ant.example.com'), [])
+
+    def test_sqlite(self):
+        tempdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tempdir)
+        path = os.path.join(tempdir, 'snapshot.db')
+        snapshot = self.client.snapshot(path)
+        self.assertIsNotNone(snapshot.refreshed)
+        snapshot.close()
+        del self.app.requests[:]
+        loaded = Snapshot(self.client._connection, path)
+        self.assertEqual(loaded.refreshed, snapshot.refreshed)
+        self.assertEqual(loaded.get_list('ant@example.com').list_id,
+                         'ant.example.com')
+        self.assertEqual(len(loaded.find_members(
+            address='anna@example.com')), 2)
+        self.assertEqual(self.app.requests, [])
+        # Changes are stored incrementally.
+        self.app.add_member('ant.example.com', 'cris@example.com')
+        self.assertEqual(loaded.refresh(['members'])['members'], (1, 0))
+        loaded.close()
+        reloaded = Snapshot(self.client._connection, path)
+        self.assertEqual(len(reloaded.members), 4)
+        reloaded.close()
@@ -0,0 +1,206 @@
+# Copyright (C) 2017 The Free Software Foundation, Inc.
+#
+# This file is part of mailmanclient.
+#
+# mailmanclient is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation, version 3 of the License.
+#
+# mailmanclient is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
+# or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public
+# License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with mailmanclient.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Test the streaming of collections."""
+
+from __future__ import absolute_import, print_function, unicode_literals
+
+import io
+import json
+import unittest
+
+from mock import patch
+from six.moves.urllib_error import HTTPError
+
+from mailmanclient import HttpTransport, WSGITransport
+from mailmanclient.restbase.stream import EntriesStream
+from mailmanclient.testing.fake import FakeMailmanTestCase
+
+__metaclass__ = type
+__all__ = [
+    'TestEntriesStream',
+    'TestHttpTransportStream',
+    'TestStreaming',
+    ]
+
+
+def split(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+class TestEntriesStream(unittest.TestCase):
+
+    def setUp(self):
+        self.entries = [
+            {'email': 'anna@example.com', 'display_name': 'Åsa',
+             'count': 12345},
+            {'email': 'bill@example.com', 'roles': ['member', 'owner'],
+             'moderation_action': None},
+            ]
+        self.data = json.dumps({
+            'start': 0,
+            'total_size': 2,
+            'entries': self.entries,
+            'http_etag': '"abc"',
+            }).encode('utf-8')
+
+    def test_chunk_sizes(self):
+        # Chunks split the numbers, strings and multibyte characters.
+        for size in (1, 2, 3, 5, 8, len(self.data)):
+            stream = EntriesStream(split(self.data, size))
+            self.assertEqual(list(stream), self.entries)
+            self.assertEqual(stream.fields, {
+                'start': 0, 'total_size': 2, 'http_etag': '"abc"'})
+
+    def test_lazy(self):
+        chunks = iter(split(self.data, 4))
+        stream = iter(EntriesStream(chunks))
+        next(stream)
+        # The second entry has not been read yet.
+        self.assertIn(b'bill', b''.join(chunks))
+
+    def test_no_entries(self):
+        stream = EntriesStream([b'{"start": 0, "total_size": 0}'])
+        self.assertEqual(list(stream), [])
+        self.assertEqual(stream.fields['total_size'], 0)
+
+    def test_empty_entries(self):
+        stream = EntriesStream([b' { "entries" : [ ] } '])
+        self.assertEqual(list(stream), [])
+
+    def test_truncated(self):
+        stream = EntriesStream([self.data[:-10]])
+        with self.assertRaises(ValueError):
+            list(stream)
+
+    def test_not_an_object(self):
+        with self.assertRaises(ValueError):
+            list(EntriesStream([b'[1, 2]']))
+
+    def test_once(self):
+        stream = EntriesStream([self.data])
+        list(stream)
+        with self.assertRaises(RuntimeError):
+            list(stream)
+
+
+class TestStreaming(FakeMailmanTestCase):
+
+    def setUp(self):
+        super(TestStreaming, self).setUp()
+        self.mlist = self.client.create_domain('example.com').create_list(
+            'ant')
+        for i in range(3):
+            self.app.add_member(
+                'ant.example.com', 'anna{0}@example.com'.format(i))
+
+    def test_iter_members(self):
+        self.assertEqual(
+            [member.email for member in self.mlist.iter_members(
+                page_size=None)],
+            ['anna0@example.com', 'anna1@example.com', 'anna2@example.com'])
+
+    def test_rest_list(self):
+        self.mlist.bans.add('bill@example.com')
+        bans = self.mlist.bans
+        self.assertEqual([ban.email for ban in bans.stream()],
+                         ['bill@example.com'])
+        # Streaming does not load the list.
+        self.assertIsNone(bans._rest_data)
+
+    def test_fields(self):
+        response, entries = self.client._connection.stream('members')
+        self.assertEqual(len(list(entries)), 3)
+        self.assertEqual(entries.fields['total_size'], 3)
+
+    def test_error(self):
+        with self.assertRaises(HTTPError) as cm:
+            self.client._connection.stream('lists/missing@example.com')
+        self.assertEqual(cm.exception.code, 404)
+
+
+class WSGIConnection:
+    """Stand in for `HTTPConnection`, answering from a WSGI application.
+
+    The tests stay hermetic: no socket is opened.
+    """
+
+    def __init__(self, app, netloc, timeout=None):
+        self.transport = WSGITransport(app)
+        self.netloc = netloc
+
+    def request(self, method, path, body=None, headers=None):
+        self.response, chunks = self.transport.stream(
+            'http://{0}{1}'.format(self.netloc, path), method, body,
+            headers)
+        self.body = io.BytesIO(b''.join(chunks))
+        self.reads = 0
+
+    def getresponse(self):
+        return self
+
+    @property
+    def status(self):
+        return int(self.response.status)
+
+    @property
+    def reason(self):
+        return self.response.reason
+
+    def getheaders(self):
+        return [(key, value) for key, value in self.response.items()
+                if key != 'status']
+
+    def read(self, size):
+        self.reads += 1
+        return self.body.read(size)
+
+    def close(self):
+        pass
+
+
+class TestHttpTransportStream(FakeMailmanTestCase):
+
+    def setUp(self):
+        super(TestHttpTransportStream, self).setUp()
+        self.client.create_domain('example.com').create_list('ant')
+        self.client.create_domain('example.org')
+        self.connections = []
+
+        def connect(netloc, timeout=None):
+            connection = WSGIConnection(self.app, netloc, timeout)
+            self.connections.append(connection)
+            return connection
+
+        patcher = patch('mailmanclient.restbase.transport.http_client')
+        http_client = patcher.start()
+        self.addCleanup(patcher.stop)
+        http_client.HTTPConnection.side_effect = connect
+        patcher = patch(
+            'mailmanclient.restbase.transport.DEFAULT_STREAM_CHUNK_SIZE', 64)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client = self.make_client(HttpTransport())
+
+    def test_stream(self):
+        response, domains = self.client._connection.stream('domains')
+        self.assertEqual(response.status, 200)
+        self.assertEqual(sorted(domain['mail_host'] for domain in domains),
+                         ['example.com', 'example.org'])
+        connection = self.connections[0]
+        self.assertEqual(connection.netloc, 'localhost:9001')
+        # The body was read from the connection in small chunks.
+        self.assertGreater(connection.reads, 2)
@@ -0,0 +1,186 @@
+# Copyright (C) 2017 The Free Software Foundation, Inc.
+#
+# This file is part of mailmanclient.
+#
+# mailmanclient is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation, version 3 of the License.
+#
+# mailmanclient is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
+# or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public
+# License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with mailmanclient.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Test the HTTP transports."""
+
+from __future__ import absolute_import, print_function, unicode_literals
+
+import json
+import threading
+import unittest
+
+from httplib2 import Response
+from mock import Mock, patch
+
+from mailmanclient.restbase.transport import (
+    HttpPool, RequestsTransport, WSGITransport)
+
+__metaclass__ = type
+__all__ = [
+    'TestHttpPool',
+    'TestRequestsTransport',
+    'TestWSGITransport',
+    ]
+
+
+def make_http(*args, **kwargs):
+    http = Mock()
+    http.connections = {}
+    http.request.return_value = (Response({'status': 200}), b'{}')
+    return http
+
+
+@patch('mailmanclient.restbase.transport.Http', side_effect=make_http)
+class TestHttpPool(unittest.TestCase):
+
+    def test_reuse(self, http_class):
+        pool = HttpPool(max_size=2)
+        first = pool.checkout('http://localhost:9001/3.1/lists')
+        pool.checkin('http://localhost:9001/3.1/lists', first)
+        second = pool.checkout('http://localhost:9001/3.1/domains')
+        self.assertIs(first, second)
+        self.assertEqual(http_class.call_count, 1)
+
+    def test_per_host(self, http_class):
+        pool = HttpPool(max_size=1)
+        first = pool.checkout('http://localhost:9001/3.1/lists')
+        second = pool.checkout('http://example.com:9001/3.1/lists')
+        self.assertIsNot(first, second)
+
+    def test_max_size_blocks(self, http_class):
+        pool = HttpPool(max_size=1)
+        url = 'http://localhost:9001/3.1/lists'
+        first = pool.checkout(url)
+        checked_out = []
+        thread = threading.Thread(
+            target=lambda: checked_out.append(pool.checkout(url)))
+        thread.start()
+        thread.join(0.1)
+        # The second checkout waits for the connection to be returned.
+        self.assertEqual(checked_out, [])
+        pool.checkin(url, first)
+        thread.join(5)
+        self.assertEqual(checked_out, [first])
+        self.assertEqual(http_class.call_count, 1)
+
+    def test_idle_eviction(self, http_class):
+        pool = HttpPool(idle_timeout=10)
+        url = 'http://localhost:9001/3.1/lists'
+        with patch('mailmanclient.restbase.transport.time') as mock_time:
+            mock_time.time.return_value = 1000
+            first = pool.checkout(url)
+            socket = Mock()
+            first.connections['http:localhost:9001'] = socket
+            pool.checkin(url, first)
+            mock_time.time.return_value = 1011
+            second = pool.checkout(url)
+        self.assertIsNot(first, second)
+        socket.close.assert_called_once_with()
+
+    def test_discard_on_error(self, http_class):
+        pool = HttpPool()
+        url = 'http://localhost:9001/3.1/lists'
+        with self.assertRaises(IOError):
+            with pool.connection(url) as http:
+                raise IOError
+        self.assertIsNot(pool.checkout(url), http)
+
+    def test_release_on_base_exception(self, http_class):
+        pool = HttpPool(max_size=1)
+        url = 'http://localhost:9001/3.1/lists'
+        for i in range(2):
+            with self.assertRaises(KeyboardInterrupt):
+                with pool.connection(url):
+                    raise KeyboardInterrupt
+        self.assertEqual(pool._in_use['http://localhost:9001'], 0)
+        # The slot is free: this does not block.
+        pool.checkout(url)
+
+    def test_wake_waiter_of_host(self, http_class):
+        pool = HttpPool(max_size=1)
+        urls = ['http://localhost:9001/3.1/lists',
+                'http://example.com:9001/3.1/lists']
+        held = [pool.checkout(url) for url in urls]
+        checked_out = []
+        threads = [
+            threading.Thread(
+                target=lambda url=url: checked_out.append(
+                    pool.checkout(url)))
+            for url in urls]
+        for thread in threads:
+            thread.start()
+        threads[1].join(0.1)
+        # Returning the connection of one host wakes its waiter, whatever
+        # the waiters of the other host.
+        pool.checkin(urls[1], held[1])
+        threads[1].join(5)
+        self.assertEqual(checked_out, [held[1]])
+        pool.checkin(urls[0], held[0])
+        threads[0].join(5)
+        self.assertEqual(len(checked_out), 2)
+
+
+class TestWSGITransport(unittest.TestCase):
+
+    def setUp(self):
+        self.environ = None
+
+        def app(environ, start_response):
+            self.environ = environ
+            body = environ['wsgi.input'].read(
+                int(environ['CONTENT_LENGTH']))
+            start_response('200 OK', [('Content-Type', 'application/json')])
+            return [json.dumps({'body': body.decode('utf-8')}).encode()]
+        self.transport = WSGITransport(app)
+
+    def test_request(self):
+        response, content = self.transport.request(
+            'http://localhost:9001/3.1/lists/ant%40example.com?count=2',
+            'POST', 'action=accept', {
+                'Content-Type': 'application/x-www-form-urlencoded',
+                'Authorization': 'Basic xyz',
+                })
+        self.assertEqual(response.status, 200)
+        self.assertEqual(response.reason, 'OK')
+        self.assertEqual(response['content-type'], 'application/json')
+        self.assertEqual(json.loads(content.decode()),
+                         {'body': 'action=accept'})
+        self.assertEqual(self.environ['REQUEST_METHOD'], 'POST')
+        self.assertEqual(self.environ['PATH_INFO'],
+                         '/3.1/lists/ant@example.com')
+        self.assertEqual(self.environ['QUERY_STRING'], 'count=2')
+        self.assertEqual(self.environ['SERVER_PORT'], '9001')
+        self.assertEqual(self.environ['CONTENT_TYPE'],
+                         'application/x-www-form-urlencoded')
+        self.assertEqual(self.environ['HTTP_AUTHORIZATION'], 'Basic xyz')
+
+
+class TestRequestsTransport(unittest.TestCase):
+
+    def test_request(self):
+        session = Mock()
+        result = session.request.return_value
+        result.status_code = 201
+        result.reason = 'Created'
+        result.headers = {'Location': 'http://localhost:9001/3.1/users/1'}
+        result.content = b''
+        transport = RequestsTransport(session=session)
+        response, content = transport.request(
+            'http://localhost:9001/3.1/users', 'POST', 'email=a%40example.com')
+        self.assertEqual(response.status, 201)
+        self.assertEqual(response['location'],
+                         'http://localhost:9001/3.1/users/1')
+        self.assertEqual(content, b'')
@@ -0,0 +1,98 @@
+# Copyright (C) 2017 The Free Software Foundation, Inc.
+#
+# This file is part of mailmanclient.
+#
+# mailmanclient is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation, version 3 of the License.
+#
+# mailmanclient is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
+# or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public
+# License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with mailmanclient.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Test the subscriptions of users."""
+
+from __future__ import absolute_import, print_function, unicode_literals
+
+from mailmanclient.testing.fake import FakeMailmanTestCase
+
+__metaclass__ = type
+__all__ = [
+    'TestSubscriptions',
+    ]
+
+
+class TestSubscriptions(FakeMailmanTestCase):
+
+    def setUp(self):
+        super(TestSubscriptions, self).setUp()
+        domain = self.client.create_domain('example.com')
+        domain.create_list('ant')
+        domain.create_list('bee')
+        self.app.add_member('ant.example.com', 'anna@example.com')
+        self.app.add_member('bee.example.com', 'anna@example.com',
+                            role='owner')
+        self.user = self.client.get_user('anna@example.com')
+        self.user.add_address('anna@example.org')
+        self.app.add_member('bee.example.com', 'anna@example.org')
+        self.app.add_member('ant.example.com', 'bill@example.com')
+
+    def finds(self):
+        return [request for request in self.app.requests
+                if request[1] == 'members/find']
+
+    def test_subscriptions(self):
+        del self.app.requests[:]
+        subscriptions = self.user.subscriptions
+        self.assertEqual(
+            sorted((member.email, member.list_id, member.role)
+                   for member in subscriptions), [
+                ('anna@example.com', 'ant.example.com', 'member'),
+                ('anna@example.com', 'bee.example.com', 'owner'),
+                ('anna@example.org', 'bee.example.com', 'member'),
+                ])
+        # One GET per address, which does not invalidate anything.
+        self.assertEqual(self.finds(), [('GET', 'members/find')] * 2)
+        self.assertEqual(sorted(self.user.subscription_list_ids), [
+            'ant.example.com', 'bee.example.com', 'bee.example.com'])
+        # Cached.
+        self.assertIs(self.user.subscriptions, subscriptions)
+        self.assertEqual(len(self.finds()), 2)
+
+    def test_invalidation(self):
+        self.assertEqual(len(self.user.subscriptions), 3)
+        self.user.add_address('anna@example.net')
+        self.app.add_member('ant.example.com', 'anna@example.net')
+        self.assertEqual(len(self.user.subscriptions), 4)
+        self.assertEqual(len(self.user.subscription_list_ids), 4)
+
+    def test_no_subscriptions(self):
+        user = self.client.create_user('cris@example.com', 'secret')
+        self.assertEqual(user.subscriptions, [])
+
+    def test_iter_subscriptions(self):
+        del self.app.requests[:]
+        subscriptions = self.user.iter_subscriptions(page_size=2)
+        self.assertEqual(self.finds(), [])
+        self.assertEqual(
+            sorted((member.email, member.list_id)
+                   for member in subscriptions), [
+                ('anna@example.com', 'ant.example.com'),
+                ('anna@example.com', 'bee.example.com'),
+                ('anna@example.org', 'bee.example.com'),
+                ])
+        # A single query paged through, whatever the number of addresses.
+        self.assertEqual(self.finds(), [('GET', 'members/find')] * 2)
+
+    def test_member_links(self):
+        member = self.user.subscriptions[0]
+        self.assertIs(member.user, member.user)
+        self.assertIs(member.address, member.address)
+        self.assertEqual(member.address.email, member.email)
+        del self.app.requests[:]
+        self.assertEqual(member.address.email, member.email)
+        self.assertEqual(self.app.requests, [])